@@ -0,0 +1,180 @@
+# backfill.py
+
+import sys
+import json
+import logging
+import multiprocessing
+import os
+from datetime import datetime, timedelta
+
+from config import (
+    DIAS_POR_SHARD_BACKFILL, PROCESSOS_BACKFILL, TAXA_BACKFILL,
+    ARQUIVO_MANIFESTO_BACKFILL, MAX_DIAS_INTERVALO_PESQUISA, ORGAO_ORIGEM,
+)
+from utils.taxa import configurar_taxa
+
+# ─── LOGGING ─────────────────────────────────────────────────────────
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(processName)s - %(levelname)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+
+FORMATO_DATA = "%d/%m/%Y"
+
+
+# ─── FATIAS E MANIFESTO ──────────────────────────────────────────────
+def dividir_intervalo(data_inicial, data_final, dias_por_shard=DIAS_POR_SHARD_BACKFILL):
+    """
+    Divide o intervalo em fatias consecutivas de até dias_por_shard dias
+    (limitadas ao máximo aceito pelo formulário do STJ).
+
+    Returns:
+        list: Tuplas (data_inicial, data_final) no formato DD/MM/AAAA.
+    """
+    dias_por_shard = max(1, min(dias_por_shard, MAX_DIAS_INTERVALO_PESQUISA))
+    inicio = datetime.strptime(data_inicial, FORMATO_DATA)
+    fim = datetime.strptime(data_final, FORMATO_DATA)
+
+    shards = []
+    while inicio <= fim:
+        fim_shard = min(inicio + timedelta(days=dias_por_shard - 1), fim)
+        shards.append((inicio.strftime(FORMATO_DATA), fim_shard.strftime(FORMATO_DATA)))
+        inicio = fim_shard + timedelta(days=1)
+    return shards
+
+
+def chave_shard(data_inicial, data_final, orgao):
+    """Chave da fatia no manifesto; inclui o órgão, para um backfill de outro órgão não pular fatias."""
+    return f"{orgao} {data_inicial} a {data_final}"
+
+
+def carregar_manifesto():
+    try:
+        with open(ARQUIVO_MANIFESTO_BACKFILL, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"shards": {}}
+
+
+def salvar_manifesto(manifesto):
+    os.makedirs(os.path.dirname(ARQUIVO_MANIFESTO_BACKFILL) or ".", exist_ok=True)
+    temporario = ARQUIVO_MANIFESTO_BACKFILL + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, ensure_ascii=False, indent=2)
+    os.replace(temporario, ARQUIVO_MANIFESTO_BACKFILL)
+
+
+# ─── EXECUÇÃO DE UMA FATIA (PROCESSO FILHO) ──────────────────────────
+def _iniciar_processo(taxa, proximo_compartilhado):
+    configurar_taxa(taxa, proximo_compartilhado)
+
+
+def executar_shard(shard):
+    """
+    Busca uma fatia do intervalo em um processo próprio (com seu navegador ou
+    sessão HTTP) e grava os arquivos por dia, como no modo intervalo do main.py.
+
+    Returns:
+        tuple: (shard, registro para o manifesto)
+    """
+    from checkpoint import abrir_checkpoint
+    from motores import executar_busca
+    from main import salvar_resultados_por_dia
+
+    data_inicial, data_final, orgao = shard
+    inicio = datetime.now()
+    try:
+        logging.info(f"🚀 Fatia {chave_shard(*shard)} iniciada")
+        checkpoint = abrir_checkpoint(data_inicial, data_final, orgao)
+        resultados, _, total_resultados_site, _, paginas_processadas = executar_busca(
+            data_inicial, data_final, checkpoint=checkpoint, orgao=orgao
+        )
+        arquivo = salvar_resultados_por_dia(resultados, data_inicial, data_final, orgao) if resultados else None
+        checkpoint.concluir()
+        registro = {
+            "status": "concluido",
+            "hcs": len(resultados),
+            "total_site": total_resultados_site,
+            "paginas": paginas_processadas,
+            "arquivo": arquivo,
+        }
+    except (Exception, SystemExit) as e:  # inclui o sys.exit de preencher_formulario
+        logging.error(f"❌ Fatia {chave_shard(*shard)} falhou: {e}", exc_info=True)
+        registro = {"status": "erro", "erro": str(e) or type(e).__name__}
+
+    registro["duracao_segundos"] = round((datetime.now() - inicio).total_seconds(), 1)
+    registro["atualizado_em"] = datetime.now().isoformat(timespec="seconds")
+    return shard, registro
+
+
+# ─── ORQUESTRAÇÃO ────────────────────────────────────────────────────
+def backfill(data_inicial, data_final, processos=PROCESSOS_BACKFILL, taxa=TAXA_BACKFILL, orgao=ORGAO_ORIGEM):
+    """
+    Executa o backfill histórico de data_inicial a data_final, para o órgão de origem
+    orgao, dividido em fatias, cada uma em um processo, respeitando uma taxa global de
+    requisições. Fatias já concluídas no manifesto (para o mesmo órgão) são puladas;
+    as que falharam são refeitas.
+
+    Returns:
+        int: 0 se todas as fatias foram concluídas, 1 caso contrário.
+    """
+    manifesto = carregar_manifesto()
+    shards = [(inicio, fim, orgao) for inicio, fim in dividir_intervalo(data_inicial, data_final)]
+    pendentes = [
+        shard for shard in shards
+        if manifesto["shards"].get(chave_shard(*shard), {}).get("status") != "concluido"
+    ]
+    logging.info(
+        f"🗃️ Backfill {data_inicial} a {data_final} (origem {orgao}): {len(shards)} fatias, "
+        f"{len(shards) - len(pendentes)} já concluídas, {len(pendentes)} pendentes "
+        f"({processos} processos, até {taxa} req/s)"
+    )
+
+    if pendentes:
+        proximo_compartilhado = multiprocessing.Value("d", 0.0)
+        # Um processo novo por fatia: cada busca começa com navegador e estado limpos
+        with multiprocessing.Pool(
+            processes=max(1, min(processos, len(pendentes))),
+            initializer=_iniciar_processo,
+            initargs=(taxa, proximo_compartilhado),
+            maxtasksperchild=1,
+        ) as pool:
+            for shard, registro in pool.imap_unordered(executar_shard, pendentes):
+                manifesto["shards"][chave_shard(*shard)] = registro
+                salvar_manifesto(manifesto)
+                if registro["status"] == "concluido":
+                    logging.info(f"✅ Fatia {chave_shard(*shard)}: {registro['hcs']} HCs em {registro['duracao_segundos']}s")
+                else:
+                    logging.warning(f"⚠️ Fatia {chave_shard(*shard)} com erro: {registro['erro']}")
+
+    falhas = [
+        chave_shard(*shard) for shard in shards
+        if manifesto["shards"].get(chave_shard(*shard), {}).get("status") != "concluido"
+    ]
+    total_hcs = sum(manifesto["shards"][chave_shard(*shard)].get("hcs", 0) for shard in shards
+                    if chave_shard(*shard) in manifesto["shards"])
+    logging.info(f"📊 Backfill finalizado: {total_hcs} HCs, {len(shards) - len(falhas)}/{len(shards)} fatias concluídas.")
+    if falhas:
+        logging.warning(f"⚠️ Fatias com erro (rode de novo para refazê-las): {', '.join(falhas)}")
+        return 1
+    return 0
+
+
+# ─── CLI ─────────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("🚫 Erro: Intervalo não informado")
+        print("Uso: python backfill.py <data inicial DD/MM/AAAA> <data final DD/MM/AAAA> [processos]")
+        sys.exit(1)
+
+    try:
+        if datetime.strptime(sys.argv[2], FORMATO_DATA) < datetime.strptime(sys.argv[1], FORMATO_DATA):
+            print("🚫 Erro: A data final é anterior à data inicial")
+            sys.exit(1)
+    except ValueError:
+        print("🚫 Erro: Datas devem estar no formato DD/MM/AAAA")
+        sys.exit(1)
+
+    processos = int(sys.argv[3]) if len(sys.argv) > 3 else PROCESSOS_BACKFILL
+    sys.exit(backfill(sys.argv[1], sys.argv[2], processos=processos))
@@ -0,0 +1,176 @@
+# benchmark.py
+#
+# Mede, fase a fase, o fluxo completo do main.main contra o servidor_stj_local.py
+# (sem rede), em vários tamanhos de resultado e com repetições, e grava um JSON com
+# medianas e p95 de cada fase para comparar o desempenho entre commits.
+
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import metricas
+from config import MOTOR_BUSCA
+from servidor_stj_local import iniciar_servidor
+
+# Data pesquisada em todas as rodadas (o servidor local gera sempre os mesmos HCs para ela)
+DATA_BENCHMARK = "02/06/2025"
+TAMANHOS_PADRAO = [10, 100, 1000, 5000]
+REPETICOES_PADRAO = 3
+ARQUIVO_SAIDA_PADRAO = "benchmark.json"
+
+
+def processos_por_dia(hcs):
+    """Processos por dia para o servidor local devolver exatamente `hcs` HCs (um em cada cinco é RHC)."""
+    return hcs + (hcs - 1) // 4 if hcs > 0 else 0
+
+
+def _commit_atual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def executar_rodada(arquivo_saida, data):
+    """
+    Executa main.main uma vez neste processo (chamado pelo próprio benchmark em um
+    subprocesso com pasta de trabalho e cache vazios) e grava as medições em arquivo_saida.
+    """
+    import main
+
+    metricas.zerar()
+    inicio = time.perf_counter()
+    codigo = main.main(data)
+    duracao = time.perf_counter() - inicio
+
+    caminho_csv = os.path.join("dados_diarios", f"resultados_{data.replace('/', '-')}.csv")
+    hcs = 0
+    if os.path.exists(caminho_csv):
+        with open(caminho_csv, encoding="utf-8") as f:
+            hcs = max(0, sum(1 for _ in f) - 1)
+
+    with open(arquivo_saida, "w", encoding="utf-8") as f:
+        json.dump({"codigo_saida": codigo, "duracao_total": duracao, "hcs": hcs, "fases": metricas.duracoes()}, f)
+
+
+def medir_tamanho(hcs, repeticoes, latencia=0.0):
+    """
+    Roda o pipeline `repeticoes` vezes contra um servidor local com `hcs` HCs na data
+    do benchmark, cada vez em um subprocesso novo (sem cache de detalhes, checkpoint
+    ou sessão de rodadas anteriores).
+
+    Returns:
+        dict com as rodadas e o resumo (mediana, p95) do total e de cada fase.
+    """
+    servidor = iniciar_servidor(latencia=latencia, processos_por_dia=processos_por_dia(hcs))
+    rodadas = []
+    try:
+        for repeticao in range(1, repeticoes + 1):
+            with tempfile.TemporaryDirectory(prefix="benchmark_stj_") as pasta:
+                arquivo_rodada = os.path.join(pasta, "rodada.json")
+                env = dict(os.environ, STJ_URL_BASE=servidor.url_base, DIRETORIO_CACHE=os.path.join(pasta, "cache"))
+                processo = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--rodada", arquivo_rodada, DATA_BENCHMARK],
+                    cwd=pasta, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+                )
+                if processo.returncode != 0 or not os.path.exists(arquivo_rodada):
+                    logging.error(f"❌ Rodada {repeticao} ({hcs} HCs) falhou:\n{processo.stderr[-2000:]}")
+                    continue
+                with open(arquivo_rodada, encoding="utf-8") as f:
+                    rodada = json.load(f)
+            rodadas.append(rodada)
+            logging.info(f"⏱️ {hcs} HCs, rodada {repeticao}/{repeticoes}: {rodada['duracao_total']:.2f}s ({rodada['hcs']} HCs extraídos)")
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+
+    fases = sorted({fase for rodada in rodadas for fase in rodada["fases"]})
+    resumo_fases = {}
+    for fase in fases:
+        # Amostras individuais (ex.: cada página, cada HC) de todas as rodadas...
+        resumo = metricas.resumir([valor for rodada in rodadas for valor in rodada["fases"].get(fase, [])])
+        # ...e o tempo somado da fase em cada rodada
+        por_rodada = metricas.resumir([sum(rodada["fases"].get(fase, [])) for rodada in rodadas])
+        resumo["total_por_rodada"] = {"mediana": por_rodada["mediana"], "p95": por_rodada["p95"]}
+        resumo_fases[fase] = resumo
+
+    return {
+        "hcs_esperados": hcs,
+        "hcs_extraidos": [rodada["hcs"] for rodada in rodadas],
+        "rodadas_com_erro": repeticoes - len(rodadas),
+        "total": metricas.resumir([rodada["duracao_total"] for rodada in rodadas]),
+        "fases": resumo_fases,
+    }
+
+
+def executar_benchmark(tamanhos=TAMANHOS_PADRAO, repeticoes=REPETICOES_PADRAO, latencia=0.0):
+    return {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit_atual(),
+        "motor": MOTOR_BUSCA,
+        "repeticoes": repeticoes,
+        "latencia_servidor": latencia,
+        "tamanhos": {str(hcs): medir_tamanho(hcs, repeticoes, latencia) for hcs in tamanhos},
+    }
+
+
+def comparar(arquivo_antes, arquivo_depois):
+    """Imprime a variação das medianas (total e por fase) entre dois resultados do benchmark."""
+    with open(arquivo_antes, encoding="utf-8") as f:
+        antes = json.load(f)
+    with open(arquivo_depois, encoding="utf-8") as f:
+        depois = json.load(f)
+
+    def linha(nome, a, b):
+        if a and b:
+            print(f"   {nome:<24} {a:>10.4f}s -> {b:>10.4f}s  ({(b - a) / a * 100:+.1f}%)")
+
+    print(f"📊 {antes.get('commit')} -> {depois.get('commit')}")
+    for tamanho, medido_depois in depois["tamanhos"].items():
+        medido_antes = antes["tamanhos"].get(tamanho)
+        if not medido_antes:
+            continue
+        print(f"🔢 {tamanho} HCs")
+        linha("total", medido_antes["total"]["mediana"], medido_depois["total"]["mediana"])
+        for fase, resumo in medido_depois["fases"].items():
+            anterior = medido_antes["fases"].get(fase)
+            if anterior:
+                linha(fase, anterior["total_por_rodada"]["mediana"], resumo["total_por_rodada"]["mediana"])
+
+
+# ─── CLI ─────────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--rodada":
+        executar_rodada(sys.argv[2], sys.argv[3])
+        sys.exit(0)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    if len(sys.argv) > 1 and sys.argv[1] == "--comparar":
+        if len(sys.argv) < 4:
+            print("Uso: python benchmark.py --comparar antes.json depois.json")
+            sys.exit(1)
+        comparar(sys.argv[2], sys.argv[3])
+        sys.exit(0)
+    if len(sys.argv) > 1 and sys.argv[1] in ("-h", "--help"):
+        print("Uso: python benchmark.py [tamanhos separados por vírgula] [repetições] [arquivo de saída] [latência em segundos]")
+        print("     python benchmark.py --comparar antes.json depois.json")
+        sys.exit(0)
+
+    tamanhos = [int(t) for t in sys.argv[1].split(",")] if len(sys.argv) > 1 else TAMANHOS_PADRAO
+    repeticoes = int(sys.argv[2]) if len(sys.argv) > 2 else REPETICOES_PADRAO
+    arquivo_saida = sys.argv[3] if len(sys.argv) > 3 else ARQUIVO_SAIDA_PADRAO
+    latencia = float(sys.argv[4]) if len(sys.argv) > 4 else 0.0
+
+    resultado = executar_benchmark(tamanhos, repeticoes, latencia)
+    with open(arquivo_saida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    logging.info(f"💾 Resultado do benchmark salvo em: {arquivo_saida}")
+    sys.exit(1 if any(medido["rodadas_com_erro"] for medido in resultado["tamanhos"].values()) else 0)
@@ -0,0 +1,181 @@
+# cache_detalhes.py
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from extrator import RE_ESPACOS, _normalizar
+from metricas import contar
+from config import ARQUIVO_CACHE_DETALHES, VALIDADE_CACHE_DETALHES, MAX_REGISTROS_CACHE_DETALHES
+
+# Gravações entre duas podas do cache (a poda também roda ao abri-lo)
+GRAVACOES_ENTRE_PODAS = 500
+
+
+def assinatura_bloco(texto_bloco):
+    """
+    Resumo do texto de um bloco da lista de resultados. Se o site alterar algo do HC
+    que aparece na lista (fase, situação etc.), a assinatura muda e o registro em
+    cache deixa de valer.
+
+    Os espaços em branco são descartados antes do resumo: o innerText do navegador e
+    o texto juntado pelo motor HTTP quebram o mesmo bloco em lugares diferentes, e a
+    assinatura precisa ser a mesma nos dois motores.
+    """
+    return hashlib.sha1(RE_ESPACOS.sub("", texto_bloco or "").encode("utf-8")).hexdigest()
+
+
+def chave_processo(texto):
+    """Chave do cache: número do processo como aparece no link da lista (ex.: "HC 123456")."""
+    return _normalizar(texto).upper()
+
+
+class CacheDetalhes:
+    """
+    Cache em SQLite dos detalhes de HC já extraídos, compartilhado entre execuções
+    (ex.: a rechecagem de D-2 reaproveita o que foi lido no dia anterior). Um registro
+    é reaproveitado enquanto estiver dentro da validade e a assinatura do seu bloco
+    na lista de resultados for a mesma; caso contrário a página de detalhe é lida de
+    novo e o registro, substituído. Acima de max_registros, os registros usados há
+    mais tempo são descartados.
+
+    Falhas no SQLite só desativam o cache: a busca continua lendo os detalhes do site.
+    `relogio` (time.time por padrão) dá o instante usado na validade e na ordem de uso.
+    """
+
+    def __init__(self, caminho=ARQUIVO_CACHE_DETALHES, validade=VALIDADE_CACHE_DETALHES,
+                 max_registros=MAX_REGISTROS_CACHE_DETALHES, relogio=time.time):
+        self.validade = validade
+        self.max_registros = max_registros
+        self._relogio = relogio
+        self._assinaturas = {}  # href -> (chave, assinatura) dos itens vistos nesta execução
+        self._gravacoes = 0
+        self._lock = threading.Lock()
+        self._conexao = None
+        if validade > 0:
+            try:
+                self._conexao = self._abrir(caminho)
+                self._podar()
+            except sqlite3.Error as e:
+                logging.warning(f"⚠️ Cache de detalhes indisponível ({e}).")
+                self._conexao = None
+
+    @staticmethod
+    def _abrir(caminho):
+        os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+        conexao = sqlite3.connect(caminho, timeout=30, check_same_thread=False)
+        conexao.execute("PRAGMA journal_mode=WAL")
+        conexao.execute(
+            "CREATE TABLE IF NOT EXISTS detalhes ("
+            " chave TEXT PRIMARY KEY, assinatura TEXT, resultado TEXT NOT NULL,"
+            " gravado_em REAL NOT NULL, usado_em REAL NOT NULL)"
+        )
+        conexao.execute("CREATE INDEX IF NOT EXISTS idx_detalhes_usado_em ON detalhes (usado_em)")
+        conexao.commit()
+        return conexao
+
+    def _podar(self):
+        """Remove registros vencidos e, acima de max_registros, os usados há mais tempo."""
+        self._conexao.execute("DELETE FROM detalhes WHERE gravado_em < ?", (self._relogio() - self.validade,))
+        self._conexao.execute(
+            "DELETE FROM detalhes WHERE chave IN ("
+            " SELECT chave FROM detalhes ORDER BY usado_em DESC LIMIT -1 OFFSET ?)",
+            (self.max_registros,),
+        )
+        self._conexao.commit()
+
+    def _desativar(self, erro):
+        logging.warning(f"⚠️ Erro no cache de detalhes ({erro}); seguindo sem cache.")
+        try:
+            self._conexao.close()
+        except sqlite3.Error:
+            pass
+        self._conexao = None
+
+    def aproveitar(self, checkpoint, pagina, itens, assinaturas, data_autuacao):
+        """
+        Registra no checkpoint, como já extraídos, os itens da página com registro
+        válido no cache. Os demais ficam anotados para guardar() gravar seus
+        detalhes quando forem extraídos.
+
+        Args:
+            itens: Lista de tuplas (texto, href) da página (já informada ao checkpoint).
+            assinaturas: Dicionário href -> assinatura_bloco (itens sem assinatura
+                valem só pela validade).
+
+        Returns:
+            int: Quantos itens vieram do cache.
+        """
+        if self._conexao is None:
+            return 0
+        agora = self._relogio()
+        reaproveitados = 0
+        with self._lock:
+            try:
+                for texto, href in itens:
+                    chave = chave_processo(texto)
+                    assinatura = assinaturas.get(href)
+                    self._assinaturas[href] = (chave, assinatura)
+                    if checkpoint.resultado(href) is not None:
+                        continue
+                    linha = self._conexao.execute(
+                        "SELECT assinatura, resultado, gravado_em FROM detalhes WHERE chave = ?", (chave,)
+                    ).fetchone()
+                    if linha is None or agora - linha[2] > self.validade:
+                        continue
+                    if assinatura and linha[0] and linha[0] != assinatura:
+                        continue
+                    self._conexao.execute("UPDATE detalhes SET usado_em = ? WHERE chave = ?", (agora, chave))
+                    resultado = json.loads(linha[1])
+                    if data_autuacao:
+                        resultado["data_autuacao"] = data_autuacao
+                    checkpoint.registrar_hc(pagina, href, resultado)
+                    reaproveitados += 1
+                self._conexao.commit()
+            except (sqlite3.Error, ValueError) as e:
+                self._desativar(e)
+        contar("hcs_recuperados_cache", reaproveitados)
+        return reaproveitados
+
+    def guardar(self, href, resultado):
+        """Grava (ou substitui) no cache o resultado extraído para href."""
+        if self._conexao is None or not resultado:
+            return
+        chave, assinatura = self._assinaturas.get(href, (None, None))
+        chave = chave or chave_processo(resultado.get("numero_processo") or "")
+        if not chave:
+            return
+        agora = self._relogio()
+        with self._lock:
+            try:
+                self._conexao.execute(
+                    "INSERT OR REPLACE INTO detalhes (chave, assinatura, resultado, gravado_em, usado_em)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (chave, assinatura, json.dumps(resultado, ensure_ascii=False), agora, agora),
+                )
+                self._conexao.commit()
+                self._gravacoes += 1
+                if self._gravacoes % GRAVACOES_ENTRE_PODAS == 0:
+                    self._podar()
+            except sqlite3.Error as e:
+                self._desativar(e)
+
+
+_cache = None
+_pid_cache = None
+
+
+def obter_cache_detalhes():
+    """
+    Cache de detalhes deste processo, aberto na primeira chamada. Processos filhos
+    (subconsultas, backfill) abrem sua própria conexão com o mesmo arquivo.
+    """
+    global _cache, _pid_cache
+    if _cache is None or _pid_cache != os.getpid():
+        _cache = CacheDetalhes()
+        _pid_cache = os.getpid()
+    return _cache
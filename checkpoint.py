@@ -0,0 +1,136 @@
+# checkpoint.py
+
+import json
+import logging
+import os
+import threading
+import time
+
+from config import DIRETORIO_CACHE, ORGAO_ORIGEM, VALIDADE_CHECKPOINT
+
+
+class Checkpoint:
+    """
+    Diário (JSONL, uma linha por evento) de uma busca em andamento, identificado por
+    (datas, órgão de origem). Cada HC extraído e cada página concluída são gravados
+    e sincronizados em disco na hora, então uma execução interrompida pode ser
+    retomada: HCs já extraídos não são abertos de novo e páginas concluídas são puladas.
+
+    Uma página só é dada como concluída quando todos os seus HCs foram extraídos.
+    Sem caminho, o checkpoint funciona só em memória.
+    """
+
+    def __init__(self, caminho=None):
+        self.caminho = caminho
+        self.extraidos = {}  # href -> resultado
+        self.paginas = {}  # número da página -> [(texto, href)] da página concluída
+        self._pendentes = {}  # número da página -> [(texto, href)] ainda não concluída
+        self._lock = threading.Lock()
+        if caminho:
+            self._carregar()
+
+    def _carregar(self):
+        try:
+            if time.time() - os.path.getmtime(self.caminho) > VALIDADE_CHECKPOINT:
+                logging.info(f"⌛ Checkpoint antigo descartado: {self.caminho}")
+                os.remove(self.caminho)
+                return
+            with open(self.caminho, encoding="utf-8") as f:
+                linhas = f.readlines()
+        except FileNotFoundError:
+            return
+
+        # Uma interrupção no meio da escrita deixa a última linha cortada: descarta
+        # antes de voltar a acrescentar eventos ao arquivo
+        if linhas and not linhas[-1].endswith("\n"):
+            linhas.pop()
+            with open(self.caminho, "w", encoding="utf-8") as f:
+                f.writelines(linhas)
+
+        for linha in linhas:
+            try:
+                evento = json.loads(linha)
+            except ValueError:
+                continue
+            if evento.get("tipo") == "hc":
+                self.extraidos[evento["href"]] = evento["resultado"]
+            elif evento.get("tipo") == "pagina":
+                self.paginas[evento["pagina"]] = [tuple(item) for item in evento["itens"]]
+
+    def _gravar(self, evento):
+        if not self.caminho:
+            return
+        os.makedirs(os.path.dirname(self.caminho) or ".", exist_ok=True)
+        with open(self.caminho, "a", encoding="utf-8") as f:
+            f.write(json.dumps(evento, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    @property
+    def retomado(self):
+        return bool(self.extraidos or self.paginas)
+
+    def pagina_concluida(self, pagina):
+        return pagina in self.paginas
+
+    def itens_pagina(self, pagina):
+        """Itens (texto, href) de uma página concluída, na ordem em que apareceram."""
+        return self.paginas.get(pagina, [])
+
+    def resultado(self, href):
+        """Resultado já extraído para href, ou None."""
+        return self.extraidos.get(href)
+
+    def pendentes(self, itens):
+        """Filtra os itens (texto, href) que ainda não foram extraídos."""
+        return [(texto, href) for texto, href in itens if href not in self.extraidos]
+
+    def resultados_itens(self, itens):
+        """Resultados já extraídos dos itens (texto, href), na ordem dos itens."""
+        return [self.extraidos[href] for _, href in itens if href in self.extraidos]
+
+    def resultados_pagina(self, pagina):
+        return self.resultados_itens(self.itens_pagina(pagina))
+
+    def iniciar_pagina(self, pagina, itens):
+        """Informa os itens (texto, href) encontrados em uma página ainda não concluída."""
+        with self._lock:
+            self._pendentes[pagina] = list(itens)
+            self._verificar_pagina(pagina)
+
+    def registrar_hc(self, pagina, href, resultado):
+        with self._lock:
+            self.extraidos[href] = resultado
+            self._gravar({"tipo": "hc", "pagina": pagina, "href": href, "resultado": resultado})
+            self._verificar_pagina(pagina)
+
+    def _verificar_pagina(self, pagina):
+        itens = self._pendentes.get(pagina)
+        if itens is not None and all(href in self.extraidos for _, href in itens):
+            del self._pendentes[pagina]
+            self.paginas[pagina] = itens
+            self._gravar({"tipo": "pagina", "pagina": pagina, "itens": itens})
+
+    def concluir(self):
+        """Remove o diário depois que a busca terminou e os resultados foram salvos."""
+        if self.caminho:
+            try:
+                os.remove(self.caminho)
+            except FileNotFoundError:
+                pass
+
+
+def caminho_checkpoint(data_inicial, data_final, orgao=ORGAO_ORIGEM):
+    nome = f"checkpoint_{orgao.lower()}_{data_inicial.replace('/', '-')}_{data_final.replace('/', '-')}.jsonl"
+    return os.path.join(DIRETORIO_CACHE, "checkpoints", nome)
+
+
+def abrir_checkpoint(data_inicial, data_final, orgao=ORGAO_ORIGEM):
+    """Abre (ou cria) o checkpoint da busca por (datas, órgão de origem)."""
+    checkpoint = Checkpoint(caminho_checkpoint(data_inicial, data_final, orgao))
+    if checkpoint.retomado:
+        logging.info(
+            f"♻️ Retomando execução anterior: {len(checkpoint.extraidos)} HCs já extraídos, "
+            f"{len(checkpoint.paginas)} páginas concluídas."
+        )
+    return checkpoint
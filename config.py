@@ -1,15 +1,137 @@
 # config.py
 
+import os
 from datetime import date, timedelta
 
 # 📅 Data padrão (ontem) — usada quando o usuário não fornece input
 ONTEM = (date.today() - timedelta(days=1)).strftime("%d/%m/%Y")
 
-# 🌐 URL de pesquisa do STJ
-URL_PESQUISA = "https://processo.stj.jus.br/processo/pesquisa/?aplicacao=processos.ea"
+# 🌐 Endereço do sistema de processos do STJ (STJ_URL_BASE aponta o scraper para outro
+# servidor, ex.: o servidor_stj_local.py em testes e benchmarks) e URL de pesquisa
+STJ_URL_BASE_PADRAO = "https://processo.stj.jus.br"
+STJ_URL_BASE = os.environ.get("STJ_URL_BASE", STJ_URL_BASE_PADRAO).rstrip("/")
+URL_PESQUISA = f"{STJ_URL_BASE}/processo/pesquisa/?aplicacao=processos.ea"
 
-# 🏛️ Tribunal de origem fixado
-ORGAO_ORIGEM = "TJGO"
+# 🔀 Outro endereço visitado antes de voltar à pesquisa quando o desafio do Cloudflare
+# não passa (o portal do STJ; com STJ_URL_BASE apontando para outro servidor, o próprio)
+STJ_URL_ALTERNATIVA = os.environ.get(
+    "STJ_URL_ALTERNATIVA", "https://www.stj.jus.br" if STJ_URL_BASE == STJ_URL_BASE_PADRAO else STJ_URL_BASE
+).rstrip("/")
 
-# ⏱️ Tempo de pausa entre trocas de páginas (em segundos)
-TEMPO_PAUSA_CURTO_ENTRE_PAGINAS = 3
+# 🏛️ Tribunais de origem pesquisados (siglas da tabela idOrgaosOrigemValores do STJ),
+# separados por vírgula, ex.: ORGAO_ORIGEM="TJGO,TJDF". O primeiro é o principal:
+# seus arquivos mantêm os nomes usados pela rechecagem
+ORGAOS_ORIGEM = [sigla.strip().upper() for sigla in os.environ.get("ORGAO_ORIGEM", "TJGO").split(",") if sigla.strip()]
+ORGAO_ORIGEM = ORGAOS_ORIGEM[0]
+
+# 📆 Maior intervalo entre as datas de autuação inicial e final aceito pelo formulário do STJ
+MAX_DIAS_INTERVALO_PESQUISA = 100
+
+# ✂️ Acima deste total de resultados, uma busca por intervalo é dividida ao meio
+# (recursivamente) em subconsultas executadas em paralelo por PROCESSOS_SUBCONSULTAS processos
+LIMITE_RESULTADOS_POR_CONSULTA = int(os.environ.get("LIMITE_RESULTADOS_POR_CONSULTA", "300"))
+PROCESSOS_SUBCONSULTAS = int(os.environ.get("PROCESSOS_SUBCONSULTAS", min(4, os.cpu_count() or 1)))
+
+# ⏱️ Tempo máximo de espera pela troca de página após clicar em "Próximo" (em segundos)
+TEMPO_MAXIMO_TROCA_PAGINA = int(os.environ.get("TEMPO_MAXIMO_TROCA_PAGINA", "30"))
+
+# ⚙️ Motor de busca:
+#   "http"     — submete o formulário direto, sem navegador
+#   "hibrido"  — Chrome só para o desafio e a pesquisa; detalhes via HTTP em paralelo
+#   "pool"     — navegador principal pagina; um pool de navegadores extrai os detalhes
+#   "selenium" — tudo pelo navegador
+# Se o motor escolhido falhar (ex.: bloqueio do Cloudflare), MOTOR_FALLBACK é usado.
+# O padrão continua sendo o Selenium enquanto a submissão direta não for validada no site real.
+MOTOR_BUSCA = os.environ.get("MOTOR_BUSCA", "selenium").lower()
+MOTOR_FALLBACK = os.environ.get("MOTOR_FALLBACK", "selenium").lower()
+
+# 🔌 Tamanho do pool de conexões HTTP e timeout das requisições (em segundos)
+MAX_CONEXOES_HTTP = 8
+TIMEOUT_HTTP = 30
+
+# 🧵 Número de navegadores no pool do motor "pool" (padrão: um por núcleo, até 4)
+NUM_NAVEGADORES_POOL = int(os.environ.get("NUM_NAVEGADORES_POOL", min(4, os.cpu_count() or 1)))
+
+# 🗂️ Abas de detalhe carregando ao mesmo tempo no navegador (1 = uma por vez)
+MAX_ABAS_SIMULTANEAS = int(os.environ.get("MAX_ABAS_SIMULTANEAS", "3"))
+
+# ⚡ page_load_strategy do Chrome: "eager" devolve o controle assim que o HTML foi
+# interpretado, sem esperar imagens, CSS e scripts externos; a prontidão de cada
+# página é conferida pelos elementos de utils/prontidao.py ("normal" volta ao padrão)
+ESTRATEGIA_CARREGAMENTO = os.environ.get("ESTRATEGIA_CARREGAMENTO", "eager")
+
+# 🚫 Requisições bloqueadas no Chrome via CDP (Network.setBlockedURLs), em todas as abas
+# e navegadores: padrões de URL com curinga *, separados por vírgula (vazio = nada bloqueado).
+# O CSS do site não entra no padrão; para bloqueá-lo também, inclua "*.css"
+URLS_BLOQUEADAS_PADRAO = ",".join([
+    # Analytics
+    "*googletagmanager.com*", "*google-analytics.com*", "*doubleclick.net*",
+    # Fontes
+    "*fonts.googleapis.com*", "*fonts.gstatic.com*", "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    # Imagens
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.ico", "*.webp",
+])
+URLS_BLOQUEADAS = [url.strip() for url in os.environ.get("URLS_BLOQUEADAS", URLS_BLOQUEADAS_PADRAO).split(",") if url.strip()]
+
+# 📥 Limite da fila entre a paginação (produtor) e a extração de detalhes (consumidores)
+TAMANHO_FILA_TRABALHO = 50
+
+# 💾 Diretório de cache entre execuções (sessão do Cloudflare etc.)
+DIRETORIO_CACHE = os.environ.get("DIRETORIO_CACHE", ".cache_scraper")
+
+# 🍪 Sessão do Cloudflare reaproveitada entre execuções. Vale até o cf_clearance
+# expirar, limitada a VALIDADE_SESSAO_CLOUDFLARE segundos
+ARQUIVO_SESSAO_CLOUDFLARE = os.path.join(DIRETORIO_CACHE, "sessao_cloudflare.json")
+VALIDADE_SESSAO_CLOUDFLARE = 6 * 3600
+
+# 🧭 Caminho do ChromeDriver e versão do Chrome já resolvidos, para não consultar
+# a rede nem executar o Chrome a cada inicialização (refeito quando o Chrome muda)
+ARQUIVO_MANIFESTO_CHROMEDRIVER = os.path.join(DIRETORIO_CACHE, "chromedriver.json")
+
+# 🗄️ Perfil persistente do Chrome (opcional, PERFIL_CHROME_PERSISTENTE=1): cache HTTP,
+# DNS e armazenamento do site continuam de uma execução para outra. Cada navegador
+# aberto ao mesmo tempo reserva um perfil próprio; acima de TAMANHO_MAXIMO_PERFIL_MB
+# os caches do perfil são apagados
+PERFIL_CHROME_PERSISTENTE = os.environ.get("PERFIL_CHROME_PERSISTENTE", "0").lower() in ("1", "true", "sim")
+DIRETORIO_PERFIS_CHROME = os.path.join(DIRETORIO_CACHE, "perfis_chrome")
+TAMANHO_MAXIMO_PERFIL_MB = int(os.environ.get("TAMANHO_MAXIMO_PERFIL_MB", "300"))
+MAX_PERFIS_CHROME = 16
+
+# 🔬 Instrumentação dos comandos do WebDriver (opcional, INSTRUMENTAR_WEBDRIVER=1): conta
+# e cronometra cada comando por tipo e por local de chamada; o resumo vai para o log e
+# para info_execucao.json ao final da execução
+INSTRUMENTAR_WEBDRIVER = os.environ.get("INSTRUMENTAR_WEBDRIVER", "0").lower() in ("1", "true", "sim")
+
+# ⏳ Perfil das esperas (opcional, PERFILAR_ESPERAS=1): registra cada WebDriverWait,
+# aguardar_ate e pausa fixa por local de chamada (duração, sucesso ou timeout); o
+# ranking vai para o log e para info_execucao.json ao final da execução
+PERFILAR_ESPERAS = os.environ.get("PERFILAR_ESPERAS", "0").lower() in ("1", "true", "sim")
+
+# 🗂️ Tabela sigla -> código dos órgãos de origem, lida uma vez da página de pesquisa
+ARQUIVO_TABELA_ORGAOS = os.path.join(DIRETORIO_CACHE, "orgaos_origem.json")
+
+# 📚 Cache (SQLite) dos detalhes de HC já extraídos, reaproveitado entre execuções
+# (ex.: rechecagem de D-2). Um registro vale por VALIDADE_CACHE_DETALHES segundos
+# (0 desativa o cache) e só enquanto o bloco do HC na lista de resultados não mudar;
+# além de MAX_REGISTROS_CACHE_DETALHES, os menos usados recentemente são descartados
+ARQUIVO_CACHE_DETALHES = os.path.join(DIRETORIO_CACHE, "detalhes.sqlite3")
+VALIDADE_CACHE_DETALHES = int(os.environ.get("VALIDADE_CACHE_DETALHES", 3 * 24 * 3600))
+MAX_REGISTROS_CACHE_DETALHES = int(os.environ.get("MAX_REGISTROS_CACHE_DETALHES", "20000"))
+
+# ♻️ Idade máxima (em segundos) de um checkpoint de busca interrompida para ainda ser retomado
+VALIDADE_CHECKPOINT = 12 * 3600
+
+# 🐢 Taxa máxima de requisições ao STJ (por segundo, somando todos os navegadores,
+# threads e processos); 0 = sem limite
+TAXA_MAXIMA_REQUISICOES = float(os.environ.get("TAXA_MAXIMA_REQUISICOES", "0"))
+
+# 🗃️ Backfill histórico (backfill.py): tamanho de cada fatia do intervalo, em dias
+# (no máximo MAX_DIAS_INTERVALO_PESQUISA), processos em paralelo e taxa global padrão
+DIAS_POR_SHARD_BACKFILL = int(os.environ.get("DIAS_POR_SHARD_BACKFILL", "30"))
+PROCESSOS_BACKFILL = int(os.environ.get("PROCESSOS_BACKFILL", min(4, os.cpu_count() or 1)))
+TAXA_BACKFILL = float(os.environ.get("TAXA_BACKFILL", "2"))
+ARQUIVO_MANIFESTO_BACKFILL = os.path.join("dados_diarios", "backfill_manifesto.json")
+
+# 📊 Resumo e métricas da execução (durações por fase, histogramas, retentativas,
+# comandos do WebDriver, bytes transferidos), gravados ao final do main.py
+ARQUIVO_INFO_EXECUCAO = "info_execucao.json"
@@ -4,10 +4,23 @@ from openpyxl.utils import get_column_letter
 from openpyxl.styles import PatternFill, Font, Alignment, Border, Side, NamedStyle
 from pathlib import Path
 from datetime import datetime
+from config import ORGAO_ORIGEM
+from metricas import medido, contar
 
-def exportar_resultados(resultados, data_inicial, data_final):
+def pasta_saida(orgao=ORGAO_ORIGEM):
+    """
+    Pasta dos arquivos de um órgão de origem: dados_diarios para o principal (onde a
+    rechecagem procura) e dados_diarios/<sigla> para os demais.
+    """
+    pasta = Path("dados_diarios") if orgao == ORGAO_ORIGEM else Path("dados_diarios") / orgao.lower()
+    pasta.mkdir(parents=True, exist_ok=True)
+    return pasta
+
+@medido("exportar_resultados")
+def exportar_resultados(resultados, data_inicial, data_final, orgao=ORGAO_ORIGEM):
     """
     Exporta os resultados extraídos para uma planilha .xlsx com formatação elegante.
+    O nome do arquivo leva a sigla do órgão de origem (hc_tjgo_..., hc_tjdf_...).
     """
     if not resultados:
         logging.warning("⚠️ Nenhum dado a exportar. Nenhum arquivo será gerado.")
@@ -15,7 +28,7 @@ def exportar_resultados(resultados, data_inicial, data_final):
 
     wb = Workbook()
     ws = wb.active
-    ws.title = "HC TJGO"
+    ws.title = f"HC {orgao}"
 
     # Estilos
     # Estilo para cabeçalho
@@ -115,17 +128,18 @@ def exportar_resultados(resultados, data_inicial, data_final):
     def formatar(data):
         return data.replace("/", "-")
 
+    prefixo = f"hc_{orgao.lower()}"
     if data_inicial == data_final:
-        nome_arquivo = f"hc_tjgo_{formatar(data_inicial)}.xlsx"
+        nome_arquivo = f"{prefixo}_{formatar(data_inicial)}.xlsx"
     else:
-        nome_arquivo = f"hc_tjgo_{formatar(data_inicial)}_a_{formatar(data_final)}.xlsx"
+        nome_arquivo = f"{prefixo}_{formatar(data_inicial)}_a_{formatar(data_final)}.xlsx"
 
-    # Salva arquivo na pasta dados_diarios
-    caminho = Path("dados_diarios") / nome_arquivo
-    Path("dados_diarios").mkdir(exist_ok=True)
+    # Salva arquivo na pasta do órgão (dados_diarios para o principal)
+    caminho = pasta_saida(orgao) / nome_arquivo
     
     try:
         wb.save(caminho)
+        contar("bytes_planilhas", caminho.stat().st_size)
         logging.info(f"📁 Resultado salvo em: {caminho.resolve()}")
         return str(caminho)
     except Exception as e:
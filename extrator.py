@@ -1,46 +1,137 @@
 # extrator.py
 
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+import re
+from html.parser import HTMLParser
+from utils import prontidao
+from metricas import medido, contar
 
-def extrair_detalhes_processo(driver, wait, titulo="Processo", data_autuacao=""):
+# Palavras que identificam o texto da situação atual do processo
+RE_SITUACAO = re.compile(r"CONCLUSOS|AGUARDANDO|VISTA|JULGAMENTO|PROFERIDA")
+RE_PREFIXO_HC = re.compile(r"^HC nº\s*")
+RE_LINK_CNJ = re.compile(r"tipoPesquisaNumeroUnico")
+RE_ESPACOS = re.compile(r"\s+")
+RE_DATA = re.compile(r"\d{2}/\d{2}/\d{4}")
+
+RELATOR_PADRAO = "Aguardando distribuição"
+SITUACAO_PADRAO = "Aguardando andamento inicial"
+CNJ_PADRAO = "Não localizado"
+
+
+def _classes(attrs):
+    return (dict(attrs).get("class") or "").split()
+
+
+def _normalizar(texto):
+    return RE_ESPACOS.sub(" ", texto).strip()
+
+
+class _ParserDetalhes(HTMLParser):
+    """Coleta classe/número, pares rótulo/texto e o link do número CNJ de um HC."""
+
+    def __init__(self):
+        super().__init__()
+        self.classe = []
+        self.spans = []  # [(tipo, texto)] na ordem do documento
+        self.links_cnj = []
+        self._pilha_spans = []
+        self._link_cnj = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "span":
+            a = dict(attrs)
+            classes = _classes(attrs)
+            if a.get("id") == "idSpanClasseDescricao":
+                tipo = "classe"
+            elif "classSpanDetalhesLabel" in classes:
+                tipo = "label"
+            elif "classSpanDetalhesTexto" in classes:
+                tipo = "texto"
+            else:
+                tipo = None
+            self._pilha_spans.append([tipo, []])
+        elif tag == "a" and RE_LINK_CNJ.search(dict(attrs).get("href") or ""):
+            self._link_cnj = []
+
+    def handle_endtag(self, tag):
+        if tag == "span" and self._pilha_spans:
+            tipo, partes = self._pilha_spans.pop()
+            if tipo == "classe":
+                self.classe.append(_normalizar("".join(partes)))
+            elif tipo:
+                self.spans.append((tipo, _normalizar("".join(partes))))
+        elif tag == "a" and self._link_cnj is not None:
+            self.links_cnj.append(_normalizar("".join(self._link_cnj)))
+            self._link_cnj = None
+
+    def handle_data(self, data):
+        for _, partes in self._pilha_spans:
+            partes.append(data)
+        if self._link_cnj is not None:
+            self._link_cnj.append(data)
+
+
+def interpretar_detalhes(html):
+    """
+    Lê a página de detalhes de um HC em uma única passada, sem navegador e sem esperas.
+    Campos ausentes voltam como None.
+
+    Args:
+        html: HTML da página de detalhes (page_source do Selenium ou corpo HTTP).
+
+    Returns:
+        dict com numero_processo, relator, situacao, numero_cnj e data_autuacao.
+    """
+    parser = _ParserDetalhes()
+    parser.feed(html)
+    parser.close()
+
+    numero_processo = RE_PREFIXO_HC.sub("", parser.classe[0]) if parser.classe else None
+
+    relator = None
+    for i, (tipo, texto) in enumerate(parser.spans):
+        if tipo == "label" and "RELATOR" in texto.upper():
+            relator = next((t for tp, t in parser.spans[i + 1:] if tp == "texto"), "Erro ao localizar")
+
+    situacao = next((t for tp, t in parser.spans if tp == "texto" and RE_SITUACAO.search(t)), None)
+
+    # Data de autuação: primeiro texto com data após o rótulo "AUTUAÇÃO"
+    data_autuacao = None
+    for i, (tipo, texto) in enumerate(parser.spans):
+        if tipo == "label" and "AUTUA" in texto.upper():
+            seguinte = next((t for tp, t in parser.spans[i + 1:] if tp == "texto"), "")
+            match = RE_DATA.search(seguinte)
+            data_autuacao = match.group(0) if match else None
+            break
+
+    return {
+        "numero_processo": numero_processo,
+        "relator": relator,
+        "situacao": situacao,
+        "numero_cnj": parser.links_cnj[0] if parser.links_cnj else None,
+        "data_autuacao": data_autuacao,
+    }
+
+
+def extrair_detalhes_html(html, titulo="Processo", data_autuacao=""):
+    """
+    Extrai os dados do HC a partir do HTML da página de detalhes, aplicando os
+    valores padrão para campos ausentes. Se data_autuacao não for informada (busca
+    por intervalo), usa a data de autuação que consta na própria página.
+
+    Returns:
+        dict com numero_cnj, numero_processo, relator, situacao e data_autuacao,
+        ou None se a página não for de detalhes.
+    """
     try:
-        # Classe e número do processo
-        classe_span = wait.until(EC.presence_of_element_located((By.ID, "idSpanClasseDescricao")))
-        classe_texto = classe_span.text.strip()
-        numero_processo = classe_texto.replace("HC nº", "").strip() if classe_texto.startswith("HC nº") else classe_texto
-
-        # Relator(a)
-        spans = driver.find_elements(By.CLASS_NAME, "classSpanDetalhesLabel")
-        relator = "Aguardando distribuição"
-        situacao = "Aguardando andamento inicial"
-
-        for i, span in enumerate(spans):
-            texto_label = span.text.upper().strip()
-            if "RELATOR" in texto_label:
-                try:
-                    relator_span = spans[i].find_element(By.XPATH, "following-sibling::span[@class='classSpanDetalhesTexto']")
-                    relator = relator_span.text.strip()
-                except:
-                    relator = "Erro ao localizar"
-
-        # Situação atual
-        situacao_spans = driver.find_elements(By.CLASS_NAME, "classSpanDetalhesTexto")
-        for span in situacao_spans:
-            texto = span.text.strip()
-            if any(palavra in texto for palavra in ["CONCLUSOS", "AGUARDANDO", "VISTA", "JULGAMENTO", "PROFERIDA"]):
-                situacao = texto
-                break
-
-        # Número CNJ
-        try:
-            numero_unico_link = WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located((By.XPATH, "//a[contains(@href, 'tipoPesquisaNumeroUnico')]"))
-            )
-            numero_cnj = numero_unico_link.text.strip()
-        except:
-            numero_cnj = "Não localizado"
+        campos = interpretar_detalhes(html)
+        if campos["numero_processo"] is None:
+            raise ValueError("idSpanClasseDescricao não encontrado")
+
+        numero_processo = campos["numero_processo"]
+        relator = campos["relator"] or RELATOR_PADRAO
+        situacao = campos["situacao"] or SITUACAO_PADRAO
+        numero_cnj = campos["numero_cnj"] or CNJ_PADRAO
+        data_autuacao = data_autuacao or campos["data_autuacao"] or ""
 
         print(f"✔️ HC: {numero_processo}")
         print(f"   Relator(a): {relator}")
@@ -58,4 +149,19 @@ def extrair_detalhes_processo(driver, wait, titulo="Processo", data_autuacao="")
 
     except Exception as e:
         print(f"⚠️ Erro ao extrair dados de {titulo}: {e}")
+        contar("falhas_detalhe_hc")
         return None
+
+
+@medido("detalhe_hc")
+def extrair_detalhes_processo(driver, wait, titulo="Processo", data_autuacao=""):
+    try:
+        # Só espera a classe/número; o restante é lido de uma vez do page_source
+        wait.until(prontidao.pronta(prontidao.DETALHE))
+        html = driver.page_source
+    except Exception as e:
+        print(f"⚠️ Erro ao extrair dados de {titulo}: {e}")
+        contar("falhas_detalhe_hc")
+        return None
+
+    return extrair_detalhes_html(html, titulo, data_autuacao)
@@ -10,12 +10,59 @@ import time
 import os
 import sys
 
-from config import URL_PESQUISA, ORGAO_ORIGEM
+from config import URL_PESQUISA, STJ_URL_BASE, STJ_URL_ALTERNATIVA, ORGAO_ORIGEM
+from utils.espera import aguardar_ate
+from utils import prontidao
+from metricas import medido, medir, registrar_duracao, contar
+from instrumentacao import dormir
+from orgaos_origem import codigo_orgao_origem
+from sessao_cloudflare import carregar_sessao, salvar_sessao, descartar_sessao, aplicar_sessao
 
+# Duração de cada desafio do Cloudflare enfrentado nesta execução
+# ({"url", "segundos", "resolvido"}), para saber quanto tempo ele realmente custa
+DESAFIOS_REGISTRADOS = []
+
+# Pausa entre rodadas de tentativas de acesso (dobra a cada rodada)
+PAUSA_BASE_ENTRE_TENTATIVAS = 5
+
+# Tempo de espera passiva antes de aplicar as estratégias adicionais
+ESPERA_ANTES_ESTRATEGIAS = 30
+
+SCRIPT_SIMULAR_INTERACAO = """
+    // Simular movimento do mouse
+    var event = new MouseEvent('mousemove', {
+        'view': window,
+        'bubbles': true,
+        'cancelable': true,
+        'clientX': Math.random() * window.innerWidth,
+        'clientY': Math.random() * window.innerHeight
+    });
+    document.dispatchEvent(event);
+    
+    // Simular scroll
+    window.scrollTo(0, Math.random() * 100);
+    
+    // Simular clique
+    var clickEvent = new MouseEvent('click', {
+        'view': window,
+        'bubbles': true,
+        'cancelable': true
+    });
+    document.body.dispatchEvent(clickEvent);
+"""
+
+def _fora_do_challenge(driver):
+    """True quando a página carregada não é mais a de "Just a moment..."."""
+    return "just a moment" not in driver.title.lower()
+
+@medido("challenge")
 def aguardar_pos_challenge(driver, timeout=180):
     """
     Aguarda até que o título da página não contenha "Just a moment..." (case insensitive).
-    Implementa estratégias adicionais para contornar proteções do Cloudflare.
+    A verificação é feita em intervalos curtos e crescentes (utils.espera.aguardar_ate),
+    então a função retorna assim que o desafio termina. Se ele não terminar sozinho em
+    ESPERA_ANTES_ESTRATEGIAS segundos, aplica estratégias adicionais para contornar o Cloudflare.
+    A duração de cada desafio fica em DESAFIOS_REGISTRADOS.
     
     Args:
         driver: Instância do WebDriver
@@ -24,89 +71,56 @@ def aguardar_pos_challenge(driver, timeout=180):
     Returns:
         bool: True se a página passou do desafio, False se o tempo estourar
     """
-    logging.info(f"🔄 Aguardando resolução do desafio de carregamento (timeout: {timeout}s)...")
+    inicio = time.monotonic()
+    url_inicial = driver.current_url
+    
+    def restante():
+        return max(0, timeout - (time.monotonic() - inicio))
     
-    start_time = time.time()
-    check_interval = 5  # Verificar a cada 5 segundos
+    def passou(espera):
+        return bool(aguardar_ate(lambda: _fora_do_challenge(driver), min(espera, restante()))[0])
     
-    # Estratégias adicionais para contornar Cloudflare
-    strategies_applied = False
+    resolvido = passou(0)
+    if not resolvido:
+        logging.info(f"🔄 Aguardando resolução do desafio de carregamento (timeout: {timeout}s)...")
+        resolvido = passou(ESPERA_ANTES_ESTRATEGIAS)
     
-    while (time.time() - start_time) < timeout:
+    if not resolvido and restante() > 0:
+        logging.info("🔧 Aplicando estratégias adicionais para contornar Cloudflare...")
         try:
-            current_title = driver.title
-            current_url = driver.current_url
-            logging.info(f"   Título atual: '{current_title}'")
-            logging.info(f"   URL atual: {current_url}")
+            # Estratégia 1: Recarregar a página
+            logging.info("   Estratégia 1: Recarregando página...")
+            driver.refresh()
+            resolvido = passou(10)
             
-            # Verificar se o título contém "Just a moment..."
-            if "just a moment" not in current_title.lower():
-                elapsed_time = time.time() - start_time
-                logging.info(f"✅ Desafio resolvido em {elapsed_time:.1f}s - Título: '{current_title}'")
-                return True
+            # Estratégia 2: Tentar navegar para uma URL diferente e voltar
+            if not resolvido:
+                logging.info("   Estratégia 2: Navegando para URL alternativa...")
+                driver.get(STJ_URL_ALTERNATIVA)
+                driver.get(URL_PESQUISA)
+                resolvido = passou(10)
             
-            # Aplicar estratégias adicionais após 30 segundos se ainda não aplicadas
-            if not strategies_applied and (time.time() - start_time) > 30:
-                logging.info("🔧 Aplicando estratégias adicionais para contornar Cloudflare...")
-                
-                try:
-                    # Estratégia 1: Recarregar a página
-                    logging.info("   Estratégia 1: Recarregando página...")
-                    driver.refresh()
-                    time.sleep(10)
-                    
-                    # Estratégia 2: Tentar navegar para uma URL diferente e voltar
-                    if "just a moment" in driver.title.lower():
-                        logging.info("   Estratégia 2: Navegando para URL alternativa...")
-                        driver.get("https://www.stj.jus.br")
-                        time.sleep(5)
-                        driver.get(URL_PESQUISA)
-                        time.sleep(10)
-                    
-                    # Estratégia 3: Executar JavaScript para simular interação humana
-                    if "just a moment" in driver.title.lower():
-                        logging.info("   Estratégia 3: Executando JavaScript para simular interação...")
-                        driver.execute_script("""
-                            // Simular movimento do mouse
-                            var event = new MouseEvent('mousemove', {
-                                'view': window,
-                                'bubbles': true,
-                                'cancelable': true,
-                                'clientX': Math.random() * window.innerWidth,
-                                'clientY': Math.random() * window.innerHeight
-                            });
-                            document.dispatchEvent(event);
-                            
-                            // Simular scroll
-                            window.scrollTo(0, Math.random() * 100);
-                            
-                            // Simular clique
-                            var clickEvent = new MouseEvent('click', {
-                                'view': window,
-                                'bubbles': true,
-                                'cancelable': true
-                            });
-                            document.body.dispatchEvent(clickEvent);
-                        """)
-                        time.sleep(5)
-                    
-                    strategies_applied = True
-                    logging.info("✅ Estratégias adicionais aplicadas")
-                    
-                except Exception as e:
-                    logging.warning(f"   Erro ao aplicar estratégias adicionais: {e}")
-                    strategies_applied = True  # Marcar como aplicadas para não tentar novamente
-            
-            # Aguardar antes da próxima verificação
-            time.sleep(check_interval)
+            # Estratégia 3: Executar JavaScript para simular interação humana
+            if not resolvido:
+                logging.info("   Estratégia 3: Executando JavaScript para simular interação...")
+                driver.execute_script(SCRIPT_SIMULAR_INTERACAO)
             
+            logging.info("✅ Estratégias adicionais aplicadas")
         except Exception as e:
-            logging.warning(f"   Erro ao verificar título: {e}")
-            time.sleep(check_interval)
+            logging.warning(f"   Erro ao aplicar estratégias adicionais: {e}")
+        
+        if not resolvido:
+            resolvido = passou(restante())
+    
+    decorrido = time.monotonic() - inicio
+    DESAFIOS_REGISTRADOS.append({"url": url_inicial, "segundos": round(decorrido, 2), "resolvido": resolvido})
+    
+    if resolvido:
+        logging.info(f"✅ Desafio resolvido em {decorrido:.1f}s - Título: '{driver.title}'")
+        return True
     
     # Timeout atingido
-    elapsed_time = time.time() - start_time
-    logging.error(f"❌ Timeout após {elapsed_time:.1f}s - Desafio de carregamento não resolvido")
+    logging.error(f"❌ Timeout após {decorrido:.1f}s - Desafio de carregamento não resolvido")
     logging.error(f"   Título final: '{driver.title}'")
     logging.error(f"   URL final: {driver.current_url}")
     return False
@@ -120,11 +134,13 @@ def click_and_wait(driver, wait, botao_locator, resultado_locator, retries=3, de
     for i in range(retries):
         try:
             logging.info(f"click_and_wait: Tentativa {i+1}/{retries}")
+            if i:
+                contar("retentativas_pesquisa")
             
             # Tentar clicar no botão
             botao = wait.until(EC.element_to_be_clickable(botao_locator))
             driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", botao)
-            time.sleep(0.5)
+            dormir(0.5)
             
             # Tentar clicar de diferentes formas
             try:
@@ -137,12 +153,7 @@ def click_and_wait(driver, wait, botao_locator, resultado_locator, retries=3, de
             
             # Aguardar resultado
             logging.info("click_and_wait: Aguardando resultado...")
-            resultado = wait.until(EC.any_of(
-                EC.presence_of_element_located(resultado_locator),
-                EC.presence_of_element_located((By.CSS_SELECTOR, ".clsMensagemLinha")),
-                EC.presence_of_element_located((By.CSS_SELECTOR, ".clsListaProcessoFormatoVerticalLinha")),
-                EC.presence_of_element_located((By.ID, "idSpanClasseDescricao"))
-            ))
+            resultado = wait.until(prontidao.pronta(resultado_locator))
             
             logging.info(f"click_and_wait: ✅ Resultado encontrado: {resultado.tag_name}")
             return True
@@ -151,14 +162,14 @@ def click_and_wait(driver, wait, botao_locator, resultado_locator, retries=3, de
             logging.warning(f"click_and_wait: Timeout na tentativa {i+1}: {e}")
             if i < retries - 1:
                 logging.info(f"Aguardando {delay}s antes da próxima tentativa...")
-                time.sleep(delay)
+                dormir(delay)
             else:
                 logging.error(f"click_and_wait: Falha após {retries} tentativas por timeout.")
         except Exception as e:
             logging.warning(f"click_and_wait: Erro inesperado na tentativa {i+1}: {type(e).__name__} - {e}")
             if i < retries - 1:
                 logging.info(f"Aguardando {delay}s antes da próxima tentativa...")
-                time.sleep(delay)
+                dormir(delay)
             else:
                 logging.error(f"click_and_wait: Falha após {retries} tentativas devido a erro inesperado.")
 
@@ -211,10 +222,12 @@ def wait_for_page_load(driver, wait, max_attempts=5):
     for attempt in range(max_attempts):
         try:
             logging.info(f"   Tentativa {attempt + 1}/{max_attempts}")
+            if attempt:
+                contar("retentativas_carregamento_formulario")
             
             # Estratégia 1: Elemento específico do formulário
             try:
-                WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.ID, "idDataAutuacaoInicial")))
+                WebDriverWait(driver, 20).until(prontidao.pronta(prontidao.FORMULARIO))
                 logging.info("✅ Página carregada (estratégia 1 - elemento específico)")
                 return True
             except TimeoutException:
@@ -222,7 +235,8 @@ def wait_for_page_load(driver, wait, max_attempts=5):
             
             # Estratégia 2: ReadyState
             try:
-                WebDriverWait(driver, 15).until(lambda d: d.execute_script("return document.readyState") == "complete")
+                # Com page_load_strategy "eager" o documento pode ficar em "interactive" enquanto subrecursos carregam
+                WebDriverWait(driver, 15).until(lambda d: d.execute_script("return document.readyState") in ("interactive", "complete"))
                 logging.info("✅ Página carregada (estratégia 2 - readyState)")
                 return True
             except TimeoutException:
@@ -247,27 +261,37 @@ def wait_for_page_load(driver, wait, max_attempts=5):
             # Estratégia 5: Aguardar um pouco mais e tentar novamente
             if attempt < max_attempts - 1:
                 logging.info(f"   Aguardando 5s antes da próxima tentativa...")
-                time.sleep(5)
+                dormir(5)
                 
         except Exception as e:
             logging.error(f"   Erro na tentativa {attempt + 1}: {e}")
             if attempt < max_attempts - 1:
-                time.sleep(5)
+                dormir(5)
     
     logging.error("❌ Falha ao carregar página após múltiplas tentativas")
     debug_page_state(driver, wait, "page_load_failed")
     return False
 
-def preencher_formulario(driver, wait, data_inicial, data_final):
+def preencher_formulario(driver, wait, data_inicial, data_final, orgao=ORGAO_ORIGEM):
     """
     Acessa a página de pesquisa do STJ e preenche os campos do formulário.
+    
+    Args:
+        orgao: Sigla do órgão de origem (ex.: "TJGO")
     """
     logging.info("🌐 Tentando acessar site do STJ...")
     
-    # Tentar múltiplas estratégias de acesso
-    if not tentar_acesso_multiplo(driver, wait, max_tentativas=3):
-        logging.error("❌ Falha em todas as tentativas de acesso ao site")
-        sys.exit(1)
+    # Reaproveitar a sessão de uma execução anterior; só passa pelo desafio se ela não valer mais
+    if not acessar_com_sessao_salva(driver):
+        # Tentar múltiplas estratégias de acesso
+        if not tentar_acesso_multiplo(driver, wait, max_tentativas=3):
+            logging.error("❌ Falha em todas as tentativas de acesso ao site")
+            sys.exit(1)
+    salvar_sessao(driver)
+    if DESAFIOS_REGISTRADOS:
+        total_desafios = sum(d["segundos"] for d in DESAFIOS_REGISTRADOS)
+        logging.info(f"⏱️ Desafios do Cloudflare: {len(DESAFIOS_REGISTRADOS)}, {total_desafios:.1f}s no total")
+    inicio_preenchimento = time.perf_counter()
     
     # Aguardar página carregar completamente
     if not wait_for_page_load(driver, wait):
@@ -276,6 +300,20 @@ def preencher_formulario(driver, wait, data_inicial, data_final):
     # Debug do estado inicial da página
     debug_page_state(driver, wait, "after_page_load")
     
+    # Confere a sigla na tabela de órgãos da página (lida uma vez e guardada em cache)
+    valores_orgaos = None
+    try:
+        valores_orgaos = driver.execute_script(
+            "var e = document.getElementById('idOrgaosOrigemValores'); return e ? e.value : null;"
+        )
+    except Exception as e:
+        logging.warning(f"⚠️ Não foi possível ler a tabela de órgãos de origem: {e}")
+    codigo_orgao = codigo_orgao_origem(orgao, valores_orgaos)
+    if codigo_orgao:
+        logging.info(f"🏛️ Órgão de origem {orgao}: código {codigo_orgao}")
+    elif valores_orgaos:
+        raise ValueError(f"Órgão de origem '{orgao}' não consta da tabela idOrgaosOrigemValores")
+    
     logging.info("📝 Página carregada. Preenchendo datas...")
 
     # Tentar diferentes estratégias para encontrar os campos de data
@@ -308,7 +346,7 @@ def preencher_formulario(driver, wait, data_inicial, data_final):
         logging.info("🔍 Tentando estratégia alternativa para campos de data...")
         try:
             # Aguardar um pouco mais para garantir que a página carregou completamente
-            time.sleep(3)
+            dormir(3)
             
             # Buscar por inputs que contenham "data" no placeholder ou name
             data_inputs = driver.find_elements(By.CSS_SELECTOR, "input[placeholder*='data'], input[name*='data'], input[id*='data']")
@@ -386,9 +424,9 @@ def preencher_formulario(driver, wait, data_inicial, data_final):
         
         if secao_julgador:
             driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", secao_julgador)
-            time.sleep(0.5)
+            dormir(0.5)
             secao_julgador.click()
-            time.sleep(0.5)
+            dormir(0.5)
             logging.info("✅ Seção do órgão julgador expandida")
         else:
             logging.warning("⚠️ Seção do órgão julgador não encontrada, continuando...")
@@ -418,8 +456,8 @@ def preencher_formulario(driver, wait, data_inicial, data_final):
         
         if campo_origem:
             campo_origem.clear()
-            campo_origem.send_keys(ORGAO_ORIGEM)
-            time.sleep(1)
+            campo_origem.send_keys(orgao)
+            dormir(1)
             logging.info("✅ Campo órgão de origem preenchido")
         else:
             logging.error("❌ Campo órgão de origem não encontrado")
@@ -433,11 +471,15 @@ def preencher_formulario(driver, wait, data_inicial, data_final):
     # Definição dos localizadores para botão e resultados esperados
     botao_pesquisar_locator = (By.ID, "idBotaoPesquisarFormularioExtendido")
     # Espera por MENSAGEM, LISTA ou DETALHES (pelo ID do span da classe)
-    resultado_locator = (By.CSS_SELECTOR, ".clsMensagemLinha, .clsListaProcessoFormatoVerticalLinha, #idSpanClasseDescricao")
+    resultado_locator = prontidao.POS_PESQUISA
+
+    registrar_duracao("formulario", time.perf_counter() - inicio_preenchimento)
 
     logging.info("🔍 Tentando clicar em 'Pesquisar' e aguardar resultados com retentativas...")
     # Chama a função de clique com retentativas
-    if not click_and_wait(driver, wait, botao_pesquisar_locator, resultado_locator, retries=3, delay=5):
+    with medir("primeiros_resultados"):
+        pesquisou = click_and_wait(driver, wait, botao_pesquisar_locator, resultado_locator, retries=3, delay=5)
+    if not pesquisou:
         # Se a função retornar False (falhou após retentativas), levanta uma exceção
         logging.error("❌ Falha crítica ao clicar em pesquisar e aguardar resultados após múltiplas tentativas.")
         debug_page_state(driver, wait, "search_button_failed")
@@ -445,6 +487,36 @@ def preencher_formulario(driver, wait, data_inicial, data_final):
 
     logging.info("✅ Preenchimento do formulário e espera pós-pesquisa concluídos.")
 
+def acessar_com_sessao_salva(driver, timeout=15):
+    """
+    Injeta a sessão do Cloudflare salva em disco e abre a página de pesquisa.
+    A sessão só é aceita se a página vier sem desafio e com o formulário.
+    
+    Args:
+        driver: Instância do WebDriver
+        timeout: Tempo máximo (em segundos) para o formulário aparecer
+    
+    Returns:
+        bool: True se a sessão salva foi aceita, False se for preciso passar pelo desafio
+    """
+    sessao = carregar_sessao()
+    if not sessao:
+        return False
+    
+    try:
+        aplicar_sessao(driver, sessao)
+        driver.get(URL_PESQUISA)
+        if "just a moment" not in driver.title.lower():
+            WebDriverWait(driver, timeout).until(prontidao.pronta(prontidao.FORMULARIO))
+            logging.info("✅ Sessão do Cloudflare reaproveitada; desafio evitado.")
+            return True
+    except Exception as e:
+        logging.warning(f"⚠️ Erro ao validar sessão salva: {e}")
+    
+    logging.info("🔄 Sessão salva não foi aceita. Seguindo para o desafio.")
+    descartar_sessao()
+    return False
+
 def tentar_acesso_multiplo(driver, wait, max_tentativas=3):
     """
     Tenta acessar o site do STJ usando múltiplas estratégias para contornar proteções.
@@ -457,13 +529,13 @@ def tentar_acesso_multiplo(driver, wait, max_tentativas=3):
     Returns:
         bool: True se conseguiu acessar, False caso contrário
     """
-    urls_alternativas = [
+    urls_alternativas = list(dict.fromkeys([
         URL_PESQUISA,
-        "https://www.stj.jus.br",
-        "https://processo.stj.jus.br",
-        "https://processo.stj.jus.br/processo/",
-        "https://processo.stj.jus.br/processo/pesquisa/"
-    ]
+        STJ_URL_ALTERNATIVA,
+        STJ_URL_BASE,
+        f"{STJ_URL_BASE}/processo/",
+        f"{STJ_URL_BASE}/processo/pesquisa/"
+    ]))
     
     for tentativa in range(max_tentativas):
         logging.info(f"🔄 Tentativa {tentativa + 1}/{max_tentativas} de acesso ao site...")
@@ -471,12 +543,10 @@ def tentar_acesso_multiplo(driver, wait, max_tentativas=3):
         for i, url in enumerate(urls_alternativas):
             try:
                 logging.info(f"   Tentando URL {i + 1}/{len(urls_alternativas)}: {url}")
+                contar("tentativas_acesso_site")
                 driver.get(url)
                 
-                # Aguardar carregamento inicial
-                time.sleep(5)
-                
-                # Verificar se passou do Cloudflare
+                # Verificar se passou do Cloudflare (retorna na hora se não houver desafio)
                 if aguardar_pos_challenge(driver, timeout=120):
                     logging.info(f"✅ Acesso bem-sucedido via {url}")
                     
@@ -484,7 +554,6 @@ def tentar_acesso_multiplo(driver, wait, max_tentativas=3):
                     if url != URL_PESQUISA:
                         logging.info("   Navegando para URL de pesquisa...")
                         driver.get(URL_PESQUISA)
-                        time.sleep(3)
                         
                         if aguardar_pos_challenge(driver, timeout=60):
                             logging.info("✅ Navegação para pesquisa bem-sucedida")
@@ -504,8 +573,9 @@ def tentar_acesso_multiplo(driver, wait, max_tentativas=3):
         
         # Se chegou aqui, todas as URLs falharam nesta tentativa
         if tentativa < max_tentativas - 1:
-            logging.info(f"   Aguardando 30s antes da próxima tentativa...")
-            time.sleep(30)
+            pausa = PAUSA_BASE_ENTRE_TENTATIVAS * 2 ** tentativa
+            logging.info(f"   Aguardando {pausa}s antes da próxima tentativa...")
+            dormir(pausa)
     
     logging.error("❌ Todas as tentativas de acesso falharam")
     return False
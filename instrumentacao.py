@@ -0,0 +1,351 @@
+# instrumentacao.py
+
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+
+from config import PERFILAR_ESPERAS
+
+DIRETORIO_PROJETO = os.path.dirname(os.path.abspath(__file__))
+
+# Locais de chamada mostrados no log ao final da execução (o JSON traz todos)
+LOCAIS_NO_LOG = 15
+
+# Arquivos do projeto que só envolvem ou repassam a chamada (os ganchos e decoradores
+# deste módulo e de metricas, a espera de utils.espera e a pausa do limite de taxa de
+# utils.taxa): o local de chamada é quem os chamou
+ARQUIVOS_INTERMEDIARIOS = {
+    "instrumentacao.py",
+    "metricas.py",
+    os.path.join("utils", "espera.py"),
+    os.path.join("utils", "taxa.py"),
+}
+
+# Comando do WebDriver (findElement, getElementText, executeScript...) -> [quantidade, segundos, máximo]
+_por_comando = {}
+# Local de chamada no código do projeto -> [quantidade, segundos, {comando: quantidade}]
+_por_local = {}
+# Local de chamada -> estatísticas das esperas (WebDriverWait, aguardar_ate) feitas ali
+_esperas = {}
+# Local de chamada -> [quantidade, segundos] das pausas fixas (dormir)
+_pausas = {}
+_esperas_perfiladas = False
+_lock = threading.Lock()
+
+
+def _local_chamada(frame):
+    """
+    Primeiro frame da pilha que pertence ao projeto (fora do Selenium, de pacotes
+    instalados e de ARQUIVOS_INTERMEDIARIOS), como "paginador.py:237 (_avancar_pagina)".
+    """
+    while frame is not None:
+        arquivo = frame.f_code.co_filename
+        if arquivo.startswith(DIRETORIO_PROJETO + os.sep) and "site-packages" not in arquivo:
+            relativo = os.path.relpath(arquivo, DIRETORIO_PROJETO)
+            if relativo not in ARQUIVOS_INTERMEDIARIOS:
+                return f"{relativo}:{frame.f_lineno} ({frame.f_code.co_name})"
+        frame = frame.f_back
+    return "(fora do projeto)"
+
+
+def _registrar(comando, local, segundos):
+    with _lock:
+        estatistica = _por_comando.setdefault(comando, [0, 0.0, 0.0])
+        estatistica[0] += 1
+        estatistica[1] += segundos
+        estatistica[2] = max(estatistica[2], segundos)
+        estatistica = _por_local.setdefault(local, [0, 0.0, {}])
+        estatistica[0] += 1
+        estatistica[1] += segundos
+        estatistica[2][comando] = estatistica[2].get(comando, 0) + 1
+
+
+def instrumentar_comandos(driver):
+    """
+    Faz o driver contar e cronometrar cada comando enviado ao WebDriver, por tipo e
+    pelo local do projeto que o originou. O gancho fica em driver.execute, por onde
+    passam também os comandos dos elementos (.text, get_attribute, click...) e das
+    esperas (WebDriverWait).
+
+    Returns:
+        O próprio driver, já instrumentado.
+    """
+    executar = driver.execute
+
+    def execute(comando, parametros=None):
+        local = _local_chamada(sys._getframe(1))
+        inicio = time.perf_counter()
+        try:
+            return executar(comando, parametros)
+        finally:
+            _registrar(comando, local, time.perf_counter() - inicio)
+
+    driver.execute = execute
+    return driver
+
+
+def zerar():
+    with _lock:
+        _por_comando.clear()
+        _por_local.clear()
+        _esperas.clear()
+        _pausas.clear()
+
+
+def exportar():
+    """Contagens desta execução em forma serializável (para um processo filho devolver ao pai)."""
+    with _lock:
+        return {
+            "por_comando": {comando: list(valores) for comando, valores in _por_comando.items()},
+            "por_local": {local: [n, s, dict(comandos)] for local, (n, s, comandos) in _por_local.items()},
+            "esperas": {local: dict(e, alvos=dict(e["alvos"])) for local, e in _esperas.items()},
+            "pausas": {local: list(valores) for local, valores in _pausas.items()},
+        }
+
+
+def incorporar(dados):
+    """Soma às desta execução as contagens devolvidas por exportar() em outro processo."""
+    with _lock:
+        for comando, (quantidade, segundos, maximo) in dados.get("por_comando", {}).items():
+            estatistica = _por_comando.setdefault(comando, [0, 0.0, 0.0])
+            estatistica[0] += quantidade
+            estatistica[1] += segundos
+            estatistica[2] = max(estatistica[2], maximo)
+        for local, (quantidade, segundos, comandos) in dados.get("por_local", {}).items():
+            estatistica = _por_local.setdefault(local, [0, 0.0, {}])
+            estatistica[0] += quantidade
+            estatistica[1] += segundos
+            for comando, n in comandos.items():
+                estatistica[2][comando] = estatistica[2].get(comando, 0) + n
+        for local, espera in dados.get("esperas", {}).items():
+            estatistica = _esperas.setdefault(local, _nova_espera())
+            for chave in ("quantidade", "sucessos", "timeouts", "erros", "segundos", "segundos_sem_sucesso"):
+                estatistica[chave] += espera[chave]
+            estatistica["maximo"] = max(estatistica["maximo"], espera["maximo"])
+            for alvo, n in espera["alvos"].items():
+                estatistica["alvos"][alvo] = estatistica["alvos"].get(alvo, 0) + n
+        for local, (quantidade, segundos) in dados.get("pausas", {}).items():
+            estatistica = _pausas.setdefault(local, [0, 0.0])
+            estatistica[0] += quantidade
+            estatistica[1] += segundos
+
+
+def relatorio_comandos(hcs_extraidos=0):
+    """
+    Resumo dos comandos do WebDriver da execução, do mais ao menos custoso.
+
+    Args:
+        hcs_extraidos: HCs extraídos na execução, para a média de comandos por HC.
+
+    Returns:
+        dict com total_comandos, segundos, comandos_por_hc, por_comando e por_local.
+    """
+    dados = exportar()
+    total = sum(quantidade for quantidade, _, _ in dados["por_comando"].values())
+    segundos = sum(s for _, s, _ in dados["por_comando"].values())
+    return {
+        "total_comandos": total,
+        "segundos": round(segundos, 3),
+        "comandos_por_hc": round(total / hcs_extraidos, 1) if hcs_extraidos else None,
+        "por_comando": [
+            {"comando": comando, "quantidade": n, "segundos": round(s, 3), "media_ms": round(1000 * s / n, 2), "maximo_ms": round(1000 * m, 2)}
+            for comando, (n, s, m) in sorted(dados["por_comando"].items(), key=lambda item: -item[1][1])
+        ],
+        "por_local": [
+            {"local": local, "quantidade": n, "segundos": round(s, 3), "comandos": comandos}
+            for local, (n, s, comandos) in sorted(dados["por_local"].items(), key=lambda item: -item[1][1])
+        ],
+    }
+
+
+def registrar_relatorio_comandos(relatorio):
+    """Escreve no log o resumo de relatorio_comandos()."""
+    if not relatorio["total_comandos"]:
+        return
+    por_hc = f", {relatorio['comandos_por_hc']} por HC" if relatorio["comandos_por_hc"] else ""
+    logging.info(f"🔬 Comandos do WebDriver: {relatorio['total_comandos']} em {relatorio['segundos']:.1f}s{por_hc}")
+    for item in relatorio["por_comando"]:
+        logging.info(f"   {item['comando']:<28} {item['quantidade']:>7}x {item['segundos']:>9.2f}s (média {item['media_ms']:.1f}ms)")
+    logging.info("🔬 Locais com mais tempo em comandos do WebDriver:")
+    for item in relatorio["por_local"][:LOCAIS_NO_LOG]:
+        logging.info(f"   {item['segundos']:>9.2f}s {item['quantidade']:>7}x  {item['local']}")
+
+
+# ─── ESPERAS E PAUSAS ────────────────────────────────────────────────
+def _nova_espera():
+    return {"quantidade": 0, "sucessos": 0, "timeouts": 0, "erros": 0, "segundos": 0.0,
+            "segundos_sem_sucesso": 0.0, "maximo": 0.0, "alvos": {}}
+
+
+def _descrever_condicao(condicao):
+    """
+    Descrição curta do que uma espera aguarda: o localizador das expected_conditions
+    (ex.: "id=idDataAutuacaoInicial"), vários deles unidos por " | " (EC.any_of),
+    ou o nome da função/lambda.
+    """
+    descricoes = []
+    for celula in getattr(condicao, "__closure__", None) or ():
+        try:
+            valor = celula.cell_contents
+        except ValueError:
+            continue
+        if isinstance(valor, tuple) and len(valor) == 2 and all(isinstance(v, str) for v in valor):
+            descricoes.append(f"{valor[0]}={valor[1]}")
+        elif isinstance(valor, (tuple, list)) and valor and all(callable(v) for v in valor):
+            descricoes.extend(_descrever_condicao(v) for v in valor)
+    if descricoes:
+        return " | ".join(descricoes)
+    return getattr(condicao, "__qualname__", type(condicao).__name__)
+
+
+def registrar_espera(local, alvo, segundos, resultado):
+    """Registra uma espera feita em local: resultado é "sucesso", "timeout" ou "erro"."""
+    with _lock:
+        estatistica = _esperas.setdefault(local, _nova_espera())
+        estatistica["quantidade"] += 1
+        estatistica[{"sucesso": "sucessos", "timeout": "timeouts"}.get(resultado, "erros")] += 1
+        estatistica["segundos"] += segundos
+        if resultado != "sucesso":
+            estatistica["segundos_sem_sucesso"] += segundos
+        estatistica["maximo"] = max(estatistica["maximo"], segundos)
+        estatistica["alvos"][alvo] = estatistica["alvos"].get(alvo, 0) + 1
+
+
+def perfilar_esperas():
+    """
+    Passa a registrar cada WebDriverWait.until/until_not do processo pelo local de
+    chamada (cada estratégia de wait_for_page_load, por exemplo, tem o seu), com o
+    que foi aguardado, quanto tempo levou e se terminou em sucesso ou timeout.
+    """
+    global _esperas_perfiladas
+    if _esperas_perfiladas:
+        return
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.support.wait import WebDriverWait
+
+    def perfilar(metodo):
+        @functools.wraps(metodo)
+        def envolvido(self, condicao, *args, **kwargs):
+            local = _local_chamada(sys._getframe(1))
+            inicio = time.perf_counter()
+            resultado = "erro"
+            try:
+                valor = metodo(self, condicao, *args, **kwargs)
+                resultado = "sucesso"
+                return valor
+            except TimeoutException:
+                resultado = "timeout"
+                raise
+            finally:
+                registrar_espera(local, _descrever_condicao(condicao), time.perf_counter() - inicio, resultado)
+        return envolvido
+
+    WebDriverWait.until = perfilar(WebDriverWait.until)
+    WebDriverWait.until_not = perfilar(WebDriverWait.until_not)
+    _esperas_perfiladas = True
+
+
+def espera_perfilada(funcao):
+    """
+    Decorador para funções de espera no formato de utils.espera.aguardar_ate
+    (condicao, timeout, ...) -> (valor ou None, segundos). Sem PERFILAR_ESPERAS,
+    devolve a própria função.
+    """
+    if not PERFILAR_ESPERAS:
+        return funcao
+
+    @functools.wraps(funcao)
+    def envolvida(condicao, *args, **kwargs):
+        local = _local_chamada(sys._getframe(1))
+        inicio = time.perf_counter()
+        valor = None
+        try:
+            valor, decorrido = funcao(condicao, *args, **kwargs)
+            return valor, decorrido
+        finally:
+            registrar_espera(local, _descrever_condicao(condicao), time.perf_counter() - inicio,
+                             "sucesso" if valor else "timeout")
+    return envolvida
+
+
+def dormir(segundos):
+    """time.sleep que, com PERFILAR_ESPERAS, registra a pausa pelo local de chamada."""
+    if PERFILAR_ESPERAS:
+        local = _local_chamada(sys._getframe(1))
+        with _lock:
+            estatistica = _pausas.setdefault(local, [0, 0.0])
+            estatistica[0] += 1
+            estatistica[1] += segundos
+    time.sleep(segundos)
+
+
+def _funcao(local):
+    """Função de um local de chamada, ex.: "formulario.py:263 (f)" -> "formulario.py:f"."""
+    arquivo, _, resto = local.partition(":")
+    return f"{arquivo}:{resto.rsplit('(', 1)[-1].rstrip(')')}" if "(" in resto else local
+
+
+def relatorio_esperas():
+    """
+    Esperas e pausas da execução, da que mais consumiu tempo à que menos consumiu:
+    por local de chamada e somadas por função (as cadeias de alternativas, como
+    wait_for_page_load ou click_and_wait, aparecem com o tempo total que custaram).
+
+    Returns:
+        dict com segundos_esperando, segundos_sem_sucesso, segundos_em_pausas,
+        por_funcao, esperas e pausas.
+    """
+    dados = exportar()
+    por_funcao = {}
+    for local, espera in dados["esperas"].items():
+        funcao = por_funcao.setdefault(_funcao(local), {"segundos": 0.0, "segundos_sem_sucesso": 0.0, "segundos_em_pausas": 0.0, "timeouts": 0})
+        funcao["segundos"] += espera["segundos"]
+        funcao["segundos_sem_sucesso"] += espera["segundos_sem_sucesso"]
+        funcao["timeouts"] += espera["timeouts"]
+    for local, (_, segundos) in dados["pausas"].items():
+        funcao = por_funcao.setdefault(_funcao(local), {"segundos": 0.0, "segundos_sem_sucesso": 0.0, "segundos_em_pausas": 0.0, "timeouts": 0})
+        funcao["segundos"] += segundos
+        funcao["segundos_em_pausas"] += segundos
+
+    return {
+        "segundos_esperando": round(sum(e["segundos"] for e in dados["esperas"].values()), 3),
+        "segundos_sem_sucesso": round(sum(e["segundos_sem_sucesso"] for e in dados["esperas"].values()), 3),
+        "segundos_em_pausas": round(sum(s for _, s in dados["pausas"].values()), 3),
+        "por_funcao": [
+            dict({chave: round(valor, 3) if isinstance(valor, float) else valor for chave, valor in f.items()}, funcao=nome)
+            for nome, f in sorted(por_funcao.items(), key=lambda item: -item[1]["segundos"])
+        ],
+        "esperas": [
+            dict({chave: round(valor, 3) if isinstance(valor, float) else valor for chave, valor in e.items()}, local=local)
+            for local, e in sorted(dados["esperas"].items(), key=lambda item: -item[1]["segundos"])
+        ],
+        "pausas": [
+            {"local": local, "quantidade": n, "segundos": round(s, 3)}
+            for local, (n, s) in sorted(dados["pausas"].items(), key=lambda item: -item[1][1])
+        ],
+    }
+
+
+def registrar_relatorio_esperas(relatorio):
+    """Escreve no log o ranking de relatorio_esperas()."""
+    if not relatorio["esperas"] and not relatorio["pausas"]:
+        return
+    logging.info(
+        f"⏳ Esperas: {relatorio['segundos_esperando']:.1f}s ({relatorio['segundos_sem_sucesso']:.1f}s em timeouts/erros); "
+        f"pausas fixas: {relatorio['segundos_em_pausas']:.1f}s"
+    )
+    logging.info("⏳ Funções com mais tempo esperando:")
+    for item in relatorio["por_funcao"][:LOCAIS_NO_LOG]:
+        logging.info(
+            f"   {item['segundos']:>9.2f}s  {item['funcao']} "
+            f"({item['segundos_sem_sucesso']:.2f}s sem sucesso, {item['timeouts']} timeouts, {item['segundos_em_pausas']:.2f}s em pausas)"
+        )
+    logging.info("⏳ Esperas mais custosas:")
+    for item in relatorio["esperas"][:LOCAIS_NO_LOG]:
+        alvos = ", ".join(item["alvos"])
+        logging.info(
+            f"   {item['segundos']:>9.2f}s {item['quantidade']:>5}x ({item['timeouts']} timeouts)  {item['local']}  [{alvos}]"
+        )
@@ -5,17 +5,16 @@ import logging
 import os
 import pandas as pd
 from datetime import datetime
-from selenium.common.exceptions import TimeoutException
-from selenium.webdriver.support.ui import WebDriverWait
-from navegador import iniciar_navegador
-from extrator import extrair_detalhes_processo
-from exportador import exportar_resultados
-from paginador import navegar_paginas_e_extrair
-from formulario import preencher_formulario
-from config import ORGAO_ORIGEM, URL_PESQUISA
+from exportador import exportar_resultados, pasta_saida
+from motores import executar_busca, SessaoBusca
+from planejador import executar_busca_planejada
+from checkpoint import abrir_checkpoint
+from config import ORGAO_ORIGEM, ORGAOS_ORIGEM, URL_PESQUISA, MAX_DIAS_INTERVALO_PESQUISA, INSTRUMENTAR_WEBDRIVER, PERFILAR_ESPERAS
 from retroativos.integrador import obter_retroativos
 from retroativos.gerenciador_arquivos import salvar_csv_resultado
 from email_detalhado import preparar_email_relatorio_diario
+from metricas import medir, gravar_info_execucao
+from instrumentacao import relatorio_comandos, registrar_relatorio_comandos, relatorio_esperas, registrar_relatorio_esperas
 from pathlib import Path
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
@@ -48,10 +47,52 @@ def listar_arquivos_com_detalhes(pasta):
     except Exception as e:
         logging.error(f"❌ Erro ao listar arquivos: {e}")
 
+# ─── SAÍDA POR DIA (MODO INTERVALO) ──────────────────────────────────
+def salvar_resultados_por_dia(resultados, data_inicial, data_final, orgao=ORGAO_ORIGEM):
+    """
+    Separa os resultados de uma busca por intervalo pela data de autuação de cada
+    registro e grava um CSV e um .xlsx por dia, além do .xlsx do intervalo inteiro,
+    na pasta do órgão de origem.
+
+    Returns:
+        str: Caminho do .xlsx do intervalo (ou None se nada foi gravado).
+    """
+    pasta = pasta_saida(orgao)
+    por_dia = {}
+    for resultado in resultados:
+        por_dia.setdefault(resultado.get("data_autuacao") or "", []).append(resultado)
+
+    sem_data = por_dia.pop("", [])
+    if sem_data:
+        logging.warning(f"⚠️ {len(sem_data)} HCs sem data de autuação; ficam só no arquivo do intervalo.")
+
+    for dia in sorted(por_dia, key=lambda d: datetime.strptime(d, "%d/%m/%Y")):
+        registros = por_dia[dia]
+        caminho_csv = f"{pasta}/resultados_{dia.replace('/','-')}.csv"
+        with medir("gravacao_csv"):
+            pd.DataFrame(registros).to_csv(caminho_csv, index=False)
+        exportar_resultados(registros, dia, dia, orgao)
+        logging.info(f"📅 {dia}: {len(registros)} HCs (CSV em {caminho_csv})")
+
+    caminho_csv = f"{pasta}/resultados_{data_inicial.replace('/','-')}_a_{data_final.replace('/','-')}.csv"
+    with medir("gravacao_csv"):
+        pd.DataFrame(resultados).to_csv(caminho_csv, index=False)
+    logging.info(f"💾 CSV do intervalo salvo em: {caminho_csv}")
+    return exportar_resultados(resultados, data_inicial, data_final, orgao)
+
 # ─── FUNÇÃO PRINCIPAL ────────────────────────────────────────────────
-def main(data_referencia: str):
+def main(data_referencia: str, data_final: str = None):
+    """
+    Executa a busca para uma data ou, com data_final, para o intervalo
+    data_referencia..data_final com uma única pesquisa, gravando um arquivo por dia.
+    Cada órgão de ORGAOS_ORIGEM é pesquisado em sequência com o mesmo navegador
+    (um único desafio do Cloudflare) e tem seus próprios arquivos.
+    """
     erros = []
     inicio = datetime.now()
+    data_final = data_final or data_referencia
+    intervalo = data_final != data_referencia
+    descricao_periodo = f"o período de {data_referencia} a {data_final}" if intervalo else f"a data {data_referencia}"
     
     # Inicializar variáveis com valores padrão
     resultados = []
@@ -61,57 +102,82 @@ def main(data_referencia: str):
     paginas_processadas = 0
     caminho_excel = None
     mensagem_status = ""
+    origens = ", ".join(ORGAOS_ORIGEM)
+    hcs_por_orgao = {}
 
     try:
-        logging.info("🚀 Iniciando scraper de HCs STJ (Origem TJGO)")
-        logging.info(f"📅 Data de referência: {data_referencia}")
-        logging.info(f"🏛️ Órgão de origem: {ORGAO_ORIGEM}")
+        logging.info(f"🚀 Iniciando scraper de HCs STJ (Origem {origens})")
+        if intervalo:
+            logging.info(f"📅 Intervalo de referência: {data_referencia} a {data_final}")
+        else:
+            logging.info(f"📅 Data de referência: {data_referencia}")
+        logging.info(f"🏛️ Órgãos de origem: {origens}")
 
         # Garantir que o diretório de dados existe
         Path("dados_diarios").mkdir(exist_ok=True)
         listar_arquivos_com_detalhes(".")  # Mostrar diretório atual
 
-        # Verificar se estamos em modo headful (quando executado com xvfb-run)
-        headless = os.environ.get('DISPLAY') is None
-        navegador = iniciar_navegador(headless=headless)
-        wait = WebDriverWait(navegador, 30)
-
+        # Navegador e sessão HTTP compartilhados por todos os órgãos
+        sessao_busca = SessaoBusca()
         try:
-            preencher_formulario(navegador, wait, data_referencia, data_referencia)
-            logging.info("📝 Formulário preenchido com sucesso.")
+            for orgao in ORGAOS_ORIGEM:
+                try:
+                    logging.info(f"🏛️ Buscando HCs com origem no {orgao}...")
+                    # Retoma de onde uma execução interrompida parou (HCs e páginas já concluídos)
+                    checkpoint = abrir_checkpoint(data_referencia, data_final, orgao)
+                    # Intervalos com muitos resultados são divididos em subconsultas paralelas
+                    buscar = executar_busca_planejada if intervalo else executar_busca
+                    parciais, relatorio, total, previstas, processadas = buscar(
+                        data_referencia, data_final, checkpoint=checkpoint, orgao=orgao, sessao_busca=sessao_busca
+                    )
 
-            resultados, paginas_info, total_resultados_site, paginas_total_previstas, paginas_processadas = navegar_paginas_e_extrair(
-                navegador, wait, extrair_detalhes_processo, data_referencia
-            )
+                    for info in relatorio:
+                        logging.info(info if len(ORGAOS_ORIGEM) == 1 else f"[{orgao}] {info}")
 
-            for info in paginas_info:
-                logging.info(info)
-
-            if resultados:
-                logging.info(f"✅ {len(resultados)} HCs encontrados.")
-                df = pd.DataFrame(resultados)
-                caminho_csv = f"dados_diarios/resultados_{data_referencia.replace('/','-')}.csv"
-                df.to_csv(caminho_csv, index=False)
-                logging.info(f"💾 CSV salvo em: {caminho_csv}")
-                # Criar o arquivo Excel
-                caminho_excel = exportar_resultados(resultados, data_referencia, data_referencia)
-                mensagem_status = f"Foram encontrados {len(resultados)} Habeas Corpus no STJ com origem no TJGO para a data {data_referencia}."
-            else:
-                logging.info("ℹ️ Nenhum HC encontrado.")
-                mensagem_status = f"Nenhum Habeas Corpus foi encontrado no STJ com origem no TJGO para a data {data_referencia}."
+                    arquivo = None
+                    if parciais and intervalo:
+                        logging.info(f"✅ {orgao}: {len(parciais)} HCs encontrados.")
+                        arquivo = salvar_resultados_por_dia(parciais, data_referencia, data_final, orgao)
+                    elif parciais:
+                        logging.info(f"✅ {orgao}: {len(parciais)} HCs encontrados.")
+                        caminho_csv = f"{pasta_saida(orgao)}/resultados_{data_referencia.replace('/','-')}.csv"
+                        with medir("gravacao_csv"):
+                            pd.DataFrame(parciais).to_csv(caminho_csv, index=False)
+                        logging.info(f"💾 CSV salvo em: {caminho_csv}")
+                        # Criar o arquivo Excel
+                        arquivo = exportar_resultados(parciais, data_referencia, data_referencia, orgao)
+                    else:
+                        logging.info(f"ℹ️ {orgao}: nenhum HC encontrado.")
 
-        except Exception as e:
-            logging.error(f"❌ Erro no scraper: {e}", exc_info=True)
-            erros.append(str(e))
-            mensagem_status = f"Ocorreu um erro durante a execução: {str(e)}"
+                    checkpoint.concluir()
 
+                    # O e-mail anexa a planilha do órgão principal
+                    if orgao == ORGAO_ORIGEM:
+                        caminho_excel = arquivo
+                    hcs_por_orgao[orgao] = len(parciais)
+                    resultados.extend(parciais)
+                    paginas_info.extend(relatorio)
+                    total_resultados_site += total or 0
+                    paginas_total_previstas += previstas or 0
+                    paginas_processadas += processadas or 0
+
+                except Exception as e:
+                    logging.error(f"❌ Erro no scraper ({orgao}): {e}", exc_info=True)
+                    erros.append(str(e) if len(ORGAOS_ORIGEM) == 1 else f"{orgao}: {e}")
+                    # O navegador pode ter ficado numa página inesperada; o próximo órgão abre outro
+                    sessao_busca.descartar_navegador()
         finally:
-            try:
-                navegador.quit()
-                logging.info("🔒 Navegador encerrado.")
-            except Exception as e:
-                logging.error(f"❌ Erro ao fechar navegador: {e}")
-                erros.append(str(e))
+            sessao_busca.encerrar()
+            erros.extend(sessao_busca.erros_fechamento)
+
+        if erros:
+            mensagem_status = f"Ocorreu um erro durante a execução: {'; '.join(erros)}"
+        elif resultados:
+            mensagem_status = f"Foram encontrados {len(resultados)} Habeas Corpus no STJ com origem no {origens} para {descricao_periodo}."
+            if len(ORGAOS_ORIGEM) > 1:
+                mensagem_status += " (" + ", ".join(f"{orgao}: {n}" for orgao, n in hcs_por_orgao.items()) + ")"
+        else:
+            mensagem_status = f"Nenhum Habeas Corpus foi encontrado no STJ com origem no {origens} para {descricao_periodo}."
 
         fim = datetime.now()
         duracao = fim - inicio
@@ -128,19 +194,20 @@ def main(data_referencia: str):
 
         # ─── Gerar HTML e arquivos auxiliares ─────────────────────────
         logging.info("📧 Preparando e-mail...")
-        preparar_email_relatorio_diario(
-            data_busca=data_referencia,
-            caminho_arquivo=caminho_excel,
-            mensagem_status=mensagem_status,
-            erros=erros if erros else None,
-            total_site=total_site,
-            total_extraidos=total_extraidos,
-            paginas_processadas=paginas_processadas_email,
-            paginas_total=paginas_total_email,
-            horario_finalizacao=horario_finalizacao,
-            duracao_segundos=duracao_segundos,
-            nome_arquivo=nome_arquivo
-        )
+        with medir("preparar_email"):
+            preparar_email_relatorio_diario(
+                data_busca=f"{data_referencia} a {data_final}" if intervalo else data_referencia,
+                caminho_arquivo=caminho_excel,
+                mensagem_status=mensagem_status,
+                erros=erros if erros else None,
+                total_site=total_site,
+                total_extraidos=total_extraidos,
+                paginas_processadas=paginas_processadas_email,
+                paginas_total=paginas_total_email,
+                horario_finalizacao=horario_finalizacao,
+                duracao_segundos=duracao_segundos,
+                nome_arquivo=nome_arquivo
+            )
 
         # ─── Gravar attachment.txt e verificar se o arquivo existe ─────────────────────────────────────
         try:
@@ -189,26 +256,75 @@ def main(data_referencia: str):
         try:
             from retroativos.executor_rechecagem import executar_rechecagem_automatica
             logging.info("🔍 Verificando se é necessário executar rechecagem...")
-            if executar_rechecagem_automatica():
+            with medir("rechecagem"):
+                rechecou = executar_rechecagem_automatica()
+            if rechecou:
                 logging.info("✅ Rechecagem executada com sucesso!")
             else:
                 logging.info("ℹ️ Rechecagem não foi executada (arquivos insuficientes ou não é D+2)")
         except Exception as e:
             logging.error(f"❌ Erro ao executar rechecagem automática: {e}")
 
+        # ─── MÉTRICAS DA EXECUÇÃO ────────────────────────────────────────
+        extras = {}
+        if INSTRUMENTAR_WEBDRIVER:
+            extras["comandos_webdriver"] = relatorio_comandos(total_extraidos)
+            registrar_relatorio_comandos(extras["comandos_webdriver"])
+        if PERFILAR_ESPERAS:
+            extras["esperas"] = relatorio_esperas()
+            registrar_relatorio_esperas(extras["esperas"])
+        gravar_info_execucao(
+            data_inicial=data_referencia,
+            data_final=data_final,
+            orgaos=ORGAOS_ORIGEM,
+            hcs_por_orgao=hcs_por_orgao,
+            total_site=total_site,
+            total_extraidos=total_extraidos,
+            paginas_processadas=paginas_processadas_email,
+            paginas_total=paginas_total_email,
+            arquivo=nome_arquivo,
+            mensagem_status=mensagem_status,
+            erros=erros,
+            duracao_segundos=(datetime.now() - inicio).total_seconds(),
+            **extras,
+        )
+
         logging.info("✅ Execução finalizada.")
         return 1 if erros else 0
 
     except Exception as e:
         logging.error(f"❌ Erro crítico: {e}", exc_info=True)
+        gravar_info_execucao(
+            data_inicial=data_referencia,
+            data_final=data_final,
+            orgaos=ORGAOS_ORIGEM,
+            hcs_por_orgao=hcs_por_orgao,
+            total_extraidos=len(resultados),
+            erros=erros + [f"Erro crítico: {e}"],
+            duracao_segundos=(datetime.now() - inicio).total_seconds(),
+        )
         return 1
 
 # ─── CLI ─────────────────────────────────────────────────────────────
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print("🚫 Erro: Data não informada")
-        print("Uso: python main.py <data no formato DD/MM/AAAA>")
+        print("Uso: python main.py <data no formato DD/MM/AAAA> [data final no formato DD/MM/AAAA]")
+        sys.exit(1)
+
+    data_inicial = sys.argv[1]
+    data_final = sys.argv[2] if len(sys.argv) > 2 else data_inicial
+    try:
+        dias = (datetime.strptime(data_final, "%d/%m/%Y") - datetime.strptime(data_inicial, "%d/%m/%Y")).days
+    except ValueError:
+        print("🚫 Erro: Datas devem estar no formato DD/MM/AAAA")
+        sys.exit(1)
+    if dias < 0:
+        print("🚫 Erro: A data final é anterior à data inicial")
+        sys.exit(1)
+    if dias > MAX_DIAS_INTERVALO_PESQUISA:
+        print(f"🚫 Erro: O STJ aceita no máximo {MAX_DIAS_INTERVALO_PESQUISA} dias por pesquisa")
         sys.exit(1)
 
-    codigo_saida = main(sys.argv[1])
+    codigo_saida = main(data_inicial, data_final)
     sys.exit(codigo_saida)
\ No newline at end of file
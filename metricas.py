@@ -0,0 +1,174 @@
+# metricas.py
+
+import functools
+import json
+import logging
+import math
+import os
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from config import ARQUIVO_INFO_EXECUCAO
+
+# Fase -> durações (em segundos) medidas nesta execução, na ordem em que terminaram.
+# Fases medidas: inicio_navegador, challenge, formulario, primeiros_resultados,
+# pagina_lista (leitura dos links de cada página), detalhe_hc (cada HC),
+# gravacao_csv, exportar_resultados, preparar_email e rechecagem.
+_duracoes = {}
+# Nome -> total acumulado nesta execução (retentativas, comandos do WebDriver,
+# requisições e bytes transferidos etc.)
+_contadores = {}
+_lock = threading.Lock()
+
+# Limites (em segundos) das faixas dos histogramas gravados em info_execucao.json
+LIMITES_HISTOGRAMA = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+
+
+def registrar_duracao(fase, segundos):
+    """Acrescenta uma medição à fase (seguro entre threads)."""
+    with _lock:
+        _duracoes.setdefault(fase, []).append(segundos)
+
+
+@contextmanager
+def medir(fase):
+    """Mede o bloco `with` como uma ocorrência da fase (mesmo se ele levantar exceção)."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar_duracao(fase, time.perf_counter() - inicio)
+
+
+def medido(fase):
+    """Decorador: cada chamada da função é uma ocorrência da fase."""
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            with medir(fase):
+                return funcao(*args, **kwargs)
+        return envolvida
+    return decorador
+
+
+def contar(nome, quantidade=1):
+    """Soma quantidade ao contador nome (seguro entre threads)."""
+    with _lock:
+        _contadores[nome] = _contadores.get(nome, 0) + quantidade
+
+
+def contadores():
+    with _lock:
+        return dict(_contadores)
+
+
+def duracoes():
+    """Cópia das medições desta execução: dict fase -> lista de segundos."""
+    with _lock:
+        return {fase: list(valores) for fase, valores in _duracoes.items()}
+
+
+def zerar():
+    with _lock:
+        _duracoes.clear()
+        _contadores.clear()
+
+
+def exportar():
+    """Medições desta execução em forma serializável, para um processo filho devolver ao pai."""
+    return {"duracoes": duracoes(), "contadores": contadores()}
+
+
+def incorporar(medicoes):
+    """Soma às desta execução as medições devolvidas por exportar() em outro processo."""
+    for fase, valores in medicoes.get("duracoes", {}).items():
+        for segundos in valores:
+            registrar_duracao(fase, segundos)
+    for nome, quantidade in medicoes.get("contadores", {}).items():
+        contar(nome, quantidade)
+
+
+def percentil(valores, p):
+    """Percentil p (0-100) pelo método do posto mais próximo; None para lista vazia."""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    return ordenados[max(0, math.ceil(p / 100 * len(ordenados)) - 1)]
+
+
+def resumir(valores):
+    """Quantidade, total, mediana, p95 e máximo de uma lista de durações."""
+    return {
+        "amostras": len(valores),
+        "total": round(sum(valores), 4),
+        "mediana": round(statistics.median(valores), 4) if valores else None,
+        "p95": round(percentil(valores, 95), 4) if valores else None,
+        "maximo": round(max(valores), 4) if valores else None,
+    }
+
+
+def histograma(valores, limites=LIMITES_HISTOGRAMA):
+    """Quantas durações caem em cada faixa ("<=0.1s", ..., ">60s")."""
+    faixas = {f"<={limite}s": 0 for limite in limites}
+    faixas[f">{limites[-1]}s"] = 0
+    for valor in valores:
+        limite = next((limite for limite in limites if valor <= limite), None)
+        faixas[f"<={limite}s" if limite is not None else f">{limites[-1]}s"] += 1
+    return faixas
+
+
+def gravar_info_execucao(caminho=ARQUIVO_INFO_EXECUCAO, **resumo):
+    """
+    Grava em info_execucao.json o resumo da execução (datas, contagens, erros...)
+    junto com as métricas: por fase, totais, mediana, p95 e histograma das durações
+    (e a fração de duracao_segundos, se informada); além dos contadores.
+    Seções acrescentadas por scripts que rodaram antes do main no mesmo job
+    (arquivo ainda sem "fases") são mantidas.
+    """
+    anterior = {}
+    try:
+        with open(caminho, encoding="utf-8") as f:
+            anterior = json.load(f)
+    except (OSError, ValueError):
+        pass
+    info = {} if "fases" in anterior else {chave: valor for chave, valor in anterior.items() if isinstance(valor, list)}
+
+    duracao = resumo.get("duracao_segundos")
+    fases = {}
+    for fase, valores in duracoes().items():
+        fases[fase] = resumir(valores)
+        if duracao:
+            fases[fase]["percentual_da_execucao"] = round(100 * sum(valores) / duracao, 1)
+        fases[fase]["histograma"] = histograma(valores)
+
+    info.update(resumo)
+    info.update(gerado_em=datetime.now().isoformat(timespec="seconds"), fases=fases, contadores=contadores())
+    try:
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump(info, f, ensure_ascii=False, indent=2)
+        logging.info(f"📊 Métricas da execução salvas em: {caminho}")
+    except OSError as e:
+        logging.warning(f"⚠️ Não foi possível salvar {caminho}: {e}")
+
+
+def acrescentar_info_execucao(secao, registro, caminho=ARQUIVO_INFO_EXECUCAO):
+    """
+    Acrescenta registro à lista secao de info_execucao.json (criando o arquivo se
+    preciso), para scripts que rodam separados do main, como os do Supabase.
+    """
+    info = {}
+    try:
+        with open(caminho, encoding="utf-8") as f:
+            info = json.load(f)
+    except (OSError, ValueError):
+        pass
+    info.setdefault(secao, []).append(registro)
+    try:
+        os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump(info, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        logging.warning(f"⚠️ Não foi possível atualizar {caminho}: {e}")
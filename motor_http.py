@@ -0,0 +1,381 @@
+# motor_http.py
+
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from extrator import extrair_detalhes_html, _classes, _normalizar
+from checkpoint import Checkpoint
+from cache_detalhes import obter_cache_detalhes, assinatura_bloco
+from utils.taxa import aguardar_vez
+from orgaos_origem import codigo_orgao_origem
+from metricas import medido, medir, contar
+from config import URL_PESQUISA, ORGAO_ORIGEM, MAX_CONEXOES_HTTP, TIMEOUT_HTTP
+
+# Cabeçalhos de um navegador real (mesmos usados em teste_simples_http.py)
+CABECALHOS_PADRAO = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "pt-BR,pt;q=0.9,en;q=0.8",
+    "Connection": "keep-alive",
+    "Upgrade-Insecure-Requests": "1",
+}
+
+class MotorHttpIndisponivel(Exception):
+    """Indica que o motor HTTP não consegue prosseguir e o Selenium deve assumir."""
+
+
+class _ParserFormulario(HTMLParser):
+    """Coleta os campos do formulário idForm como o navegador os enviaria."""
+
+    def __init__(self):
+        super().__init__()
+        self.dentro_form = False
+        self.action = None
+        self.campos = {}
+        self.tabela_orgaos = ""
+        self._select_atual = None
+
+    def handle_starttag(self, tag, attrs):
+        a = dict(attrs)
+        if tag == "form" and a.get("id") == "idForm":
+            self.dentro_form = True
+            self.action = a.get("action")
+            return
+        if a.get("id") == "idOrgaosOrigemValores":
+            self.tabela_orgaos = a.get("value") or ""
+        if not self.dentro_form:
+            return
+        nome = a.get("name")
+        if tag == "input" and nome:
+            tipo = (a.get("type") or "text").lower()
+            if tipo in ("checkbox", "radio"):
+                if "checked" in a:
+                    self.campos[nome] = a.get("value") or "on"
+            elif tipo not in ("button", "submit", "image", "reset"):
+                self.campos[nome] = a.get("value") or ""
+        elif tag == "select" and nome:
+            self._select_atual = nome
+            self.campos.setdefault(nome, "")
+        elif tag == "option" and self._select_atual and "selected" in a:
+            self.campos[self._select_atual] = a.get("value") or ""
+        elif tag == "textarea" and nome:
+            self.campos[nome] = ""
+
+    def handle_endtag(self, tag):
+        if tag == "form" and self.dentro_form:
+            self.dentro_form = False
+        elif tag == "select":
+            self._select_atual = None
+
+
+class _ParserLista(HTMLParser):
+    """
+    Lê uma página de resultados: primeiro link HC de cada bloco
+    clsListaProcessoFormatoVerticalLinha (com a assinatura do texto do bloco),
+    texto da página e link 'Próximo'.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.itens = []
+        self.assinaturas = {}
+        self.blocos = 0
+        self._texto_bloco = []
+        self.textos = []
+        self.proximo = None
+        self._profundidade_bloco = 0
+        self._bloco_tem_hc = False
+        self._link = None
+        self._ignorar = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style"):
+            self._ignorar += 1
+        if tag == "div":
+            if self._profundidade_bloco:
+                self._profundidade_bloco += 1
+            elif "clsListaProcessoFormatoVerticalLinha" in _classes(attrs):
+                self._profundidade_bloco = 1
+                self._bloco_tem_hc = False
+                self._texto_bloco = []
+                self.blocos += 1
+        if tag == "a":
+            a = dict(attrs)
+            self._link = {"href": a.get("href") or "", "classe": a.get("class") or "", "texto": []}
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style") and self._ignorar:
+            self._ignorar -= 1
+        if tag == "div" and self._profundidade_bloco:
+            self._profundidade_bloco -= 1
+            if not self._profundidade_bloco and self._bloco_tem_hc:
+                self.assinaturas[self.itens[-1][1]] = assinatura_bloco("".join(self._texto_bloco))
+        if tag == "a" and self._link is not None:
+            texto = _normalizar("".join(self._link["texto"]))
+            href = self._link["href"]
+            if texto == "Próximo":
+                self.proximo = {"href": href, "classe": self._link["classe"]}
+            elif self._profundidade_bloco and not self._bloco_tem_hc:
+                if texto.startswith("HC ") and not texto.startswith("RHC "):
+                    if href and "javascript:ProcessoDetalhes()" not in href:
+                        self.itens.append((texto, href))
+                        self._bloco_tem_hc = True  # só processa um link HC por bloco
+            self._link = None
+
+    def handle_data(self, data):
+        if self._ignorar:
+            return
+        self.textos.append(data)
+        if self._profundidade_bloco:
+            self._texto_bloco.append(data)
+        if self._link is not None:
+            self._link["texto"].append(data)
+
+
+def criar_sessao_http(user_agent=None, cookies=None):
+    """
+    Cria uma requests.Session com pool de conexões e retentativas para erros transitórios.
+
+    Args:
+        user_agent: User-Agent a usar no lugar do padrão (ex.: o do navegador que passou no desafio).
+        cookies: Lista de cookies no formato de driver.get_cookies().
+    """
+    sessao = requests.Session()
+    sessao.headers.update(CABECALHOS_PADRAO)
+    if user_agent:
+        sessao.headers["User-Agent"] = user_agent
+
+    retentativas = Retry(total=3, backoff_factor=1, status_forcelist=[500, 502, 504], allowed_methods=["GET", "POST"])
+    adaptador = HTTPAdapter(pool_connections=MAX_CONEXOES_HTTP, pool_maxsize=MAX_CONEXOES_HTTP, max_retries=retentativas)
+    sessao.mount("https://", adaptador)
+    sessao.mount("http://", adaptador)
+
+    for cookie in cookies or []:
+        sessao.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain"), path=cookie.get("path", "/"))
+    return sessao
+
+
+def eh_pagina_challenge(html, status_code=200):
+    """Retorna True se a resposta é a página intermediária do Cloudflare ("Just a moment...")."""
+    match = re.search(r"<title[^>]*>(.*?)</title>", html or "", re.IGNORECASE | re.DOTALL)
+    titulo = match.group(1).strip().lower() if match else ""
+    return "just a moment" in titulo or (status_code in (403, 503) and "cloudflare" in (html or "").lower())
+
+
+def _requisitar(sessao, metodo, url, **kwargs):
+    aguardar_vez()
+    resposta = sessao.request(metodo, url, timeout=TIMEOUT_HTTP, **kwargs)
+    contar("requisicoes_http")
+    contar("bytes_http", len(resposta.content))
+    if eh_pagina_challenge(resposta.text, resposta.status_code):
+        raise MotorHttpIndisponivel(f"Desafio do Cloudflare em {url} (status {resposta.status_code})")
+    if resposta.status_code != 200:
+        raise MotorHttpIndisponivel(f"Status {resposta.status_code} ao acessar {url}")
+    return resposta
+
+
+def pesquisar_http(sessao, data_inicial, data_final, orgao=ORGAO_ORIGEM):
+    """
+    Abre a página de pesquisa, preenche o formulário idForm e o submete via POST.
+
+    Returns:
+        tuple: (html da primeira página de resultados, url da resposta)
+    """
+    logging.info("🌐 [HTTP] Carregando formulário de pesquisa...")
+    with medir("formulario"):
+        resposta = _requisitar(sessao, "GET", URL_PESQUISA)
+        parser = _ParserFormulario()
+        parser.feed(resposta.text)
+    if parser.action is None:
+        raise MotorHttpIndisponivel("Formulário idForm não encontrado na página de pesquisa")
+
+    codigo = codigo_orgao_origem(orgao, parser.tabela_orgaos)
+    if not codigo:
+        raise MotorHttpIndisponivel(f"Código do órgão de origem '{orgao}' não encontrado em idOrgaosOrigemValores")
+
+    # Os campos ocultos (inclusive "acao") vão com o valor que a própria página traz
+    campos = dict(parser.campos)
+    campos.update({
+        "dataAutuacaoInicial": data_inicial,
+        "dataAutuacaoFinal": data_final,
+        "origemOrgaosSelecionados": codigo,
+    })
+
+    url_action = urljoin(resposta.url, parser.action)
+    logging.info(f"📝 [HTTP] Submetendo pesquisa: {data_inicial} a {data_final}, origem {orgao} ({codigo})")
+    with medir("primeiros_resultados"):
+        resposta = _requisitar(sessao, "POST", url_action, data=campos, headers={"Referer": URL_PESQUISA})
+    return resposta.text, resposta.url
+
+
+def interpretar_pagina_lista(html):
+    """
+    Extrai da página de resultados os links HC, o total informado pelo site e o link 'Próximo'.
+
+    Returns:
+        dict com as chaves itens, assinaturas, blocos, total, por_pagina, proximo e detalhe_direto.
+    """
+    parser = _ParserLista()
+    parser.feed(html)
+    texto = _normalizar("".join(parser.textos))
+
+    total = None
+    por_pagina = None
+    match = re.search(r"Exibindo (\d+)[–\-—](\d+) de (\d+)", texto)
+    if match:
+        inicio, fim, total = map(int, match.groups())
+        por_pagina = fim - inicio + 1
+    else:
+        match_registros = re.search(r"Pesquisa resultou em <b>(\d+)</b> registro", html)
+        if match_registros:
+            total = int(match_registros.group(1))
+
+    return {
+        "itens": parser.itens,
+        "assinaturas": parser.assinaturas,
+        "blocos": parser.blocos,
+        "total": total,
+        "por_pagina": por_pagina,
+        "proximo": parser.proximo,
+        "detalhe_direto": "idSpanClasseDescricao" in html,
+    }
+
+
+@medido("detalhe_hc")
+def obter_detalhe_http(sessao, texto, url, data_autuacao):
+    """Baixa e interpreta uma página de detalhe. Retorna o registro ou None em caso de erro."""
+    try:
+        resposta = _requisitar(sessao, "GET", url)
+        return extrair_detalhes_html(resposta.text, texto, data_autuacao)
+    except MotorHttpIndisponivel:
+        raise
+    except Exception as e:
+        logging.warning(f"⚠️ Erro ao processar link {url}: {e}")
+        contar("falhas_detalhe_hc")
+        return None
+
+
+def extrair_detalhes_concorrente(sessao, itens, data_autuacao, max_workers=MAX_CONEXOES_HTTP):
+    """
+    Busca as páginas de detalhe em paralelo, reaproveitando o pool de conexões da sessão.
+
+    Args:
+        itens: Lista de tuplas (texto, url absoluta).
+
+    Returns:
+        list: Um registro (ou None) por item, na mesma ordem de itens.
+
+    Raises:
+        MotorHttpIndisponivel: Se alguma página vier bloqueada pelo Cloudflare.
+    """
+    if not itens:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(itens))) as executor:
+        futuros = [executor.submit(obter_detalhe_http, sessao, texto, url, data_autuacao) for texto, url in itens]
+        try:
+            return [futuro.result() for futuro in futuros]
+        except MotorHttpIndisponivel:
+            for futuro in futuros:
+                futuro.cancel()
+            raise
+
+
+def navegar_paginas_e_extrair_http(sessao, html, url_atual, data_autuacao, checkpoint=None):
+    """
+    Percorre as páginas de resultados via HTTP e extrai os detalhes de cada HC.
+    HCs já presentes no checkpoint ou válidos no cache de detalhes não são baixados de novo.
+
+    Returns:
+        Mesma tupla de paginador.navegar_paginas_e_extrair:
+        (resultados, relatorio_paginas, total_resultados_site, paginas_total_previstas, paginas_processadas)
+    """
+    checkpoint = checkpoint or Checkpoint()
+    cache = obter_cache_detalhes()
+    resultados = []
+    relatorio_paginas = []
+    pagina = 1
+    paginas_processadas = 0
+    total_resultados_site = None
+    paginas_total_previstas = None
+
+    while True:
+        relatorio = f"📄 Página {pagina}: "
+        with medir("pagina_lista"):
+            info = interpretar_pagina_lista(html)
+
+        if pagina == 1:
+            total_resultados_site = info["total"]
+            if info["total"] is not None and info["por_pagina"]:
+                paginas_total_previstas = (info["total"] + info["por_pagina"] - 1) // info["por_pagina"]
+            elif info["total"] is not None:
+                paginas_total_previstas = 1
+
+            # Pesquisa com um único resultado cai direto na página de detalhes
+            if not info["blocos"] and info["detalhe_direto"]:
+                resultado = extrair_detalhes_html(html, "Processo", data_autuacao)
+                if resultado:
+                    resultados.append(resultado)
+                relatorio_paginas.append(relatorio + f"página de detalhe única, {len(resultados)} HCs extraídos.")
+                paginas_processadas = 1
+                total_resultados_site = total_resultados_site or 1
+                paginas_total_previstas = 1
+                break
+
+        if not info["blocos"]:
+            if pagina == 1 and info["total"] is None:
+                raise MotorHttpIndisponivel("Resposta da pesquisa sem resultados, mensagem ou detalhe reconhecíveis")
+            relatorio += "❌ Nenhum bloco de resultados encontrado. Interrompendo."
+            relatorio_paginas.append(relatorio)
+            break
+
+        itens = [(texto, urljoin(url_atual, href)) for texto, href in info["itens"]]
+        assinaturas = {urljoin(url_atual, href): assinatura for href, assinatura in info["assinaturas"].items()}
+        checkpoint.iniciar_pagina(pagina, itens)
+        do_checkpoint = len(itens) - len(checkpoint.pendentes(itens))
+        do_cache = cache.aproveitar(checkpoint, pagina, itens, assinaturas, data_autuacao)
+        pendentes = checkpoint.pendentes(itens)
+        for (_, url), resultado in zip(pendentes, extrair_detalhes_concorrente(sessao, pendentes, data_autuacao)):
+            if resultado:
+                checkpoint.registrar_hc(pagina, url, resultado)
+                cache.guardar(url, resultado)
+        extraidos = checkpoint.resultados_itens(itens)
+        resultados.extend(extraidos)
+        hc_na_pagina = len(extraidos)
+
+        relatorio += f"{info['blocos']} blocos analisados, {hc_na_pagina} HCs extraídos"
+        if do_checkpoint:
+            relatorio += f" ({do_checkpoint} recuperados do checkpoint)"
+        if do_cache:
+            relatorio += f" ({do_cache} recuperados do cache)"
+        relatorio += "."
+        relatorio_paginas.append(relatorio)
+        paginas_processadas += 1
+
+        # Próxima página
+        proximo = info["proximo"]
+        if proximo is None:
+            relatorio_paginas.append("⏹️ Fim da navegação: botão 'Próximo' não encontrado.")
+            break
+        if "desabilitado" in proximo["classe"].lower():
+            relatorio_paginas.append("⏹️ Fim da navegação: botão 'Próximo' desabilitado.")
+            break
+        if not proximo["href"] or proximo["href"].lower().startswith("javascript:"):
+            raise MotorHttpIndisponivel("Link 'Próximo' depende de JavaScript; paginação HTTP indisponível")
+
+        resposta = _requisitar(sessao, "GET", urljoin(url_atual, proximo["href"]))
+        html, url_atual = resposta.text, resposta.url
+        pagina += 1
+
+    if total_resultados_site is None:
+        total_resultados_site = len(resultados)
+    if paginas_total_previstas is None:
+        paginas_total_previstas = paginas_processadas
+
+    return resultados, relatorio_paginas, total_resultados_site, paginas_total_previstas, paginas_processadas
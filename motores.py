@@ -0,0 +1,332 @@
+# motores.py
+
+import logging
+import os
+from selenium.webdriver.support.ui import WebDriverWait
+from navegador import iniciar_navegador
+from extrator import extrair_detalhes_processo
+from paginador import navegar_paginas_e_extrair, produzir_itens_paginas, extrair_detalhes_em_abas
+from formulario import preencher_formulario
+from sessao_cloudflare import carregar_sessao
+from checkpoint import Checkpoint
+from cache_detalhes import obter_cache_detalhes
+from pool_navegadores import criar_fabrica_workers
+from produtor_consumidor import executar_pipeline, ConsumidorIndisponivel
+from motor_http import (
+    MotorHttpIndisponivel, criar_sessao_http, pesquisar_http,
+    navegar_paginas_e_extrair_http, obter_detalhe_http,
+)
+from config import MOTOR_BUSCA, MOTOR_FALLBACK, NUM_NAVEGADORES_POOL, MAX_CONEXOES_HTTP, ORGAO_ORIGEM
+
+
+def _fechar_navegador(navegador):
+    """Fecha o navegador; devolve a mensagem do erro, se houver, para quem precisar registrá-lo."""
+    try:
+        navegador.quit()
+        logging.info("🔒 Navegador encerrado.")
+    except Exception as e:
+        logging.error(f"❌ Erro ao fechar navegador: {e}")
+        return str(e)
+    return None
+
+
+class SessaoBusca:
+    """
+    Navegador e sessão HTTP compartilhados por várias buscas seguidas (ex.: um órgão
+    de origem depois do outro): o Chrome é aberto e passa pelo desafio do Cloudflare
+    uma vez só. Cada um é criado na primeira vez que um motor precisar dele.
+    Erros ao fechar o navegador ficam em erros_fechamento, para irem ao resumo da execução.
+    """
+
+    def __init__(self):
+        self.navegador = None
+        self.sessao_http = None
+        self.erros_fechamento = []
+
+    def obter_navegador(self):
+        if self.navegador is None:
+            self.navegador = iniciar_navegador(headless=os.environ.get('DISPLAY') is None)
+        return self.navegador
+
+    def obter_sessao_http(self):
+        if self.sessao_http is None:
+            salva = carregar_sessao() or {}
+            self.sessao_http = criar_sessao_http(user_agent=salva.get("user_agent"), cookies=salva.get("cookies"))
+        return self.sessao_http
+
+    def descartar_sessao_http(self):
+        """Descarta a sessão HTTP (ex.: bloqueada); a próxima busca cria outra com os cookies mais recentes."""
+        if self.sessao_http is not None:
+            self.sessao_http.close()
+            self.sessao_http = None
+
+    def descartar_navegador(self):
+        """Fecha o navegador (ex.: após um erro que pode tê-lo deixado num estado ruim)."""
+        if self.navegador is not None:
+            erro = _fechar_navegador(self.navegador)
+            if erro:
+                self.erros_fechamento.append(erro)
+            self.navegador = None
+
+    def encerrar(self):
+        self.descartar_sessao_http()
+        self.descartar_navegador()
+
+
+class PesquisaFeita:
+    """
+    Pesquisa de um intervalo já submetida (ex.: pela sondagem do planejador) cuja
+    primeira página de resultados o motor aproveita em vez de pesquisar de novo: via
+    HTTP, o html e a url da resposta (na sessão HTTP da SessaoBusca); via navegador,
+    o próprio navegador da SessaoBusca, que ficou na página de resultados.
+    """
+
+    def __init__(self, data_inicial, data_final, html=None, url=None):
+        self.intervalo = (data_inicial, data_final)
+        self.html = html
+        self.url = url
+
+    @property
+    def via_http(self):
+        return self.html is not None
+
+
+def _pesquisa_no_navegador(pesquisa, proprio):
+    """Indica se o navegador da SessaoBusca já está nos resultados da pesquisa."""
+    return pesquisa is not None and not pesquisa.via_http and not proprio
+
+
+def _obter_navegador(sessao_busca):
+    """Navegador da sessão_busca, se houver, ou um novo; o booleano indica se ele é só desta busca."""
+    if sessao_busca is not None:
+        return sessao_busca.obter_navegador(), False
+    return iniciar_navegador(headless=os.environ.get('DISPLAY') is None), True
+
+
+def executar_motor_selenium(data_inicial, data_final, checkpoint=None, orgao=ORGAO_ORIGEM, sessao_busca=None,
+                            pesquisa=None):
+    """
+    Executa a busca controlando o Chrome via Selenium (formulário, paginação e abas de detalhe).
+
+    Args:
+        orgao: Sigla do órgão de origem pesquisado.
+        sessao_busca: SessaoBusca cujo navegador é reaproveitado (e não é fechado ao final).
+        pesquisa: PesquisaFeita no navegador da sessao_busca, que dispensa preencher o formulário.
+
+    Returns:
+        (resultados, paginas_info, total_resultados_site, paginas_total_previstas, paginas_processadas)
+    """
+    navegador, proprio = _obter_navegador(sessao_busca)
+    wait = WebDriverWait(navegador, 30)
+
+    try:
+        if _pesquisa_no_navegador(pesquisa, proprio):
+            logging.info("📝 Aproveitando a pesquisa já feita no navegador.")
+        else:
+            preencher_formulario(navegador, wait, data_inicial, data_final, orgao)
+            logging.info("📝 Formulário preenchido com sucesso.")
+
+        data_autuacao = data_inicial if data_inicial == data_final else ""
+        return navegar_paginas_e_extrair(navegador, wait, extrair_detalhes_processo, data_autuacao, checkpoint)
+    finally:
+        if proprio:
+            _fechar_navegador(navegador)
+
+
+def executar_motor_http(data_inicial, data_final, checkpoint=None, orgao=ORGAO_ORIGEM, sessao_busca=None,
+                        pesquisa=None):
+    """
+    Executa a busca submetendo o formulário idForm direto, com uma requests.Session
+    reaproveitando conexões. Não abre navegador. Se houver uma sessão do Cloudflare
+    salva por uma execução com navegador, seus cookies e User-Agent são reutilizados.
+    Uma PesquisaFeita via HTTP na sessão da sessao_busca é continuada sem nova submissão.
+
+    Returns:
+        Mesma tupla de executar_motor_selenium.
+    """
+    if sessao_busca is None:
+        salva = carregar_sessao() or {}
+        with criar_sessao_http(user_agent=salva.get("user_agent"), cookies=salva.get("cookies")) as sessao:
+            return _buscar_http(sessao, data_inicial, data_final, checkpoint, orgao)
+
+    try:
+        sessao = sessao_busca.obter_sessao_http()
+        if pesquisa is not None and pesquisa.via_http:
+            logging.info("📝 [HTTP] Aproveitando a pesquisa já submetida.")
+            data_autuacao = data_inicial if data_inicial == data_final else ""
+            return navegar_paginas_e_extrair_http(sessao, pesquisa.html, pesquisa.url, data_autuacao, checkpoint)
+        return _buscar_http(sessao, data_inicial, data_final, checkpoint, orgao)
+    except MotorHttpIndisponivel:
+        sessao_busca.descartar_sessao_http()
+        raise
+
+
+def _buscar_http(sessao, data_inicial, data_final, checkpoint, orgao):
+    html, url = pesquisar_http(sessao, data_inicial, data_final, orgao)
+    logging.info("📝 [HTTP] Pesquisa submetida com sucesso.")
+
+    data_autuacao = data_inicial if data_inicial == data_final else ""
+    return navegar_paginas_e_extrair_http(sessao, html, url, data_autuacao, checkpoint)
+
+
+def _executar_pipeline_navegador(data_inicial, data_final, preparar_consumidores, checkpoint=None,
+                                 orgao=ORGAO_ORIGEM, sessao_busca=None, pesquisa=None):
+    """
+    Esqueleto comum aos motores híbrido e pool: o navegador principal passa pelo desafio,
+    pesquisa e percorre as páginas como produtor; os consumidores devolvidos por
+    preparar_consumidores(navegador) extraem os detalhes em paralelo. Itens que ficarem
+    sem consumidor são extraídos em abas do próprio navegador principal. HCs já
+    presentes no checkpoint (ou no cache de detalhes) não são extraídos de novo.
+
+    Args:
+        preparar_consumidores: Função (navegador) -> (criar_consumidor, num_consumidores, encerrar).
+
+    Returns:
+        Mesma tupla de executar_motor_selenium.
+    """
+    checkpoint = checkpoint or Checkpoint()
+    headless = os.environ.get('DISPLAY') is None
+    navegador, proprio = _obter_navegador(sessao_busca)
+    wait = WebDriverWait(navegador, 30)
+
+    try:
+        if _pesquisa_no_navegador(pesquisa, proprio):
+            logging.info("📝 Aproveitando a pesquisa já feita no navegador.")
+        else:
+            preencher_formulario(navegador, wait, data_inicial, data_final, orgao)
+            logging.info("📝 Formulário preenchido com sucesso.")
+
+        data_autuacao = data_inicial if data_inicial == data_final else ""
+        criar_consumidor_base, num_consumidores, encerrar = preparar_consumidores(navegador, headless)
+
+        cache = obter_cache_detalhes()
+
+        def com_checkpoint(extrair):
+            def consumir(item):
+                resultado = checkpoint.resultado(item.href)
+                if resultado is None:
+                    resultado = extrair(item)
+                    if resultado:
+                        checkpoint.registrar_hc(item.pagina, item.href, resultado)
+                        cache.guardar(item.href, resultado)
+                return resultado
+            return consumir
+
+        def criar_consumidor(numero):
+            return com_checkpoint(criar_consumidor_base(numero))
+
+        @com_checkpoint
+        def tratar_pendente(item):
+            extraidos = extrair_detalhes_em_abas(navegador, wait, [(item.texto, item.href)], extrair_detalhes_processo, item.data_autuacao)
+            return extraidos[0] if extraidos else None
+
+        estatisticas = {}
+        try:
+            resultados = executar_pipeline(
+                produzir_itens_paginas(navegador, wait, data_autuacao, estatisticas, checkpoint),
+                criar_consumidor, num_consumidores, tratar_pendente,
+            )
+        finally:
+            encerrar()
+
+        total_resultados_site = estatisticas["total_resultados_site"]
+        if total_resultados_site is None:
+            total_resultados_site = len(resultados)
+        return (
+            resultados, estatisticas["relatorio_paginas"], total_resultados_site,
+            estatisticas["paginas_total_previstas"], estatisticas["paginas_processadas"],
+        )
+    finally:
+        if proprio:
+            _fechar_navegador(navegador)
+
+
+def executar_motor_hibrido(data_inicial, data_final, checkpoint=None, orgao=ORGAO_ORIGEM, sessao_busca=None,
+                           pesquisa=None):
+    """
+    Usa o Chrome apenas para passar pelo desafio do Cloudflare, pesquisar e percorrer as
+    páginas de resultados. Os cookies e o User-Agent do navegador são repassados a uma
+    requests.Session, e MAX_CONEXOES_HTTP consumidores buscam as páginas de detalhe em
+    paralelo enquanto a paginação continua.
+
+    Se as requisições HTTP forem bloqueadas, os detalhes são extraídos no próprio
+    navegador, como no motor Selenium.
+
+    Returns:
+        Mesma tupla de executar_motor_selenium.
+    """
+    def preparar_consumidores(navegador, headless):
+        user_agent = navegador.execute_script("return navigator.userAgent")
+        sessao = criar_sessao_http(user_agent=user_agent, cookies=navegador.get_cookies())
+
+        def criar_consumidor(numero):
+            def consumir(item):
+                try:
+                    return obter_detalhe_http(sessao, item.texto, item.href, item.data_autuacao)
+                except MotorHttpIndisponivel as e:
+                    raise ConsumidorIndisponivel(f"detalhes via HTTP bloqueados ({e})")
+            return consumir
+
+        return criar_consumidor, MAX_CONEXOES_HTTP, sessao.close
+
+    return _executar_pipeline_navegador(data_inicial, data_final, preparar_consumidores, checkpoint, orgao, sessao_busca, pesquisa)
+
+
+def executar_motor_pool(data_inicial, data_final, checkpoint=None, orgao=ORGAO_ORIGEM, sessao_busca=None,
+                          pesquisa=None):
+    """
+    O navegador principal passa pelo desafio, pesquisa e percorre as páginas de resultados;
+    cada link de HC encontrado vai para uma fila consumida por um pool de
+    NUM_NAVEGADORES_POOL navegadores, que extraem os detalhes em paralelo.
+
+    Returns:
+        Mesma tupla de executar_motor_selenium.
+    """
+    def preparar_consumidores(navegador, headless):
+        criar_consumidor = criar_fabrica_workers(navegador.get_cookies(), extrair_detalhes_processo, headless)
+        return criar_consumidor, NUM_NAVEGADORES_POOL, lambda: None
+
+    return _executar_pipeline_navegador(data_inicial, data_final, preparar_consumidores, checkpoint, orgao, sessao_busca, pesquisa)
+
+
+MOTORES = {
+    "http": executar_motor_http,
+    "hibrido": executar_motor_hibrido,
+    "pool": executar_motor_pool,
+    "selenium": executar_motor_selenium,
+}
+
+if MOTOR_FALLBACK not in MOTORES:
+    logging.warning(f"⚠️ Motor de fallback desconhecido '{MOTOR_FALLBACK}'. Usando 'selenium'.")
+    MOTOR_FALLBACK = "selenium"
+
+
+def executar_busca(data_inicial, data_final, motor=MOTOR_BUSCA, checkpoint=None,
+                   orgao=ORGAO_ORIGEM, sessao_busca=None, pesquisa=None):
+    """
+    Executa a busca com o motor configurado. Se o motor falhar por qualquer motivo
+    (desafio do Cloudflare, layout inesperado, erro de rede), refaz a busca com o
+    motor de fallback (MOTOR_FALLBACK, Selenium por padrão), que aproveita o que o
+    primeiro motor já tiver registrado no checkpoint.
+
+    Args:
+        orgao: Sigla do órgão de origem pesquisado.
+        sessao_busca: SessaoBusca para reaproveitar navegador e sessão HTTP entre buscas.
+        pesquisa: PesquisaFeita deste intervalo na sessao_busca, aproveitada pelo primeiro
+            motor tentado (o de fallback pesquisa de novo).
+    """
+    checkpoint = checkpoint or Checkpoint()
+    if motor not in MOTORES:
+        logging.warning(f"⚠️ Motor de busca desconhecido '{motor}'. Usando '{MOTOR_FALLBACK}'.")
+        motor = MOTOR_FALLBACK
+
+    if motor != MOTOR_FALLBACK:
+        try:
+            logging.info(f"⚡ Motor de busca: {motor}")
+            return MOTORES[motor](data_inicial, data_final, checkpoint, orgao, sessao_busca, pesquisa=pesquisa)
+        except Exception as e:
+            logging.warning(f"⚠️ Motor '{motor}' indisponível ({e}). Usando '{MOTOR_FALLBACK}' como fallback.")
+            pesquisa = None
+
+    logging.info(f"🌐 Motor de busca: {MOTOR_FALLBACK}")
+    return MOTORES[MOTOR_FALLBACK](data_inicial, data_final, checkpoint, orgao, sessao_busca, pesquisa=pesquisa)
@@ -6,9 +6,178 @@ from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
 import subprocess
 import logging
+import json
 import os
+import re
 import shutil
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from config import (
+    URLS_BLOQUEADAS, ESTRATEGIA_CARREGAMENTO, ARQUIVO_MANIFESTO_CHROMEDRIVER,
+    PERFIL_CHROME_PERSISTENTE, DIRETORIO_PERFIS_CHROME, TAMANHO_MAXIMO_PERFIL_MB, MAX_PERFIS_CHROME,
+    INSTRUMENTAR_WEBDRIVER, PERFILAR_ESPERAS,
+)
+from metricas import medido, contar
+from instrumentacao import instrumentar_comandos, perfilar_esperas
+
+# Subpastas do perfil que podem ser apagadas sem perder cookies e armazenamento do site
+CACHES_PERFIL = [
+    os.path.join("Default", "Cache"),
+    os.path.join("Default", "Code Cache"),
+    os.path.join("Default", "GPUCache"),
+    os.path.join("Default", "Service Worker", "CacheStorage"),
+    "GrShaderCache",
+    "ShaderCache",
+]
+
+# Travas do próprio Chrome; como o perfil já está reservado, se existirem são de um Chrome que caiu
+TRAVAS_CHROME = ["SingletonLock", "SingletonSocket", "SingletonCookie"]
+
+# Mensagens do Chrome/ChromeDriver que indicam perfil travado ou corrompido (as demais
+# falhas de inicialização, como versão incompatível do driver, não se resolvem recriando o perfil)
+RE_ERRO_PERFIL = re.compile(
+    r"user data directory is already in use|crashed|DevToolsActivePort file doesn't exist|exited abnormally",
+    re.IGNORECASE,
+)
+
+
+def _tamanho_diretorio(caminho):
+    total = 0
+    for raiz, _, arquivos in os.walk(caminho):
+        for nome in arquivos:
+            try:
+                total += os.path.getsize(os.path.join(raiz, nome))
+            except OSError:
+                pass
+    return total
+
+
+class PerfilChrome:
+    """
+    Diretório de perfil persistente reservado para um único Chrome por meio de uma
+    trava de arquivo, liberada em liberar() (ou pelo sistema, se o processo morrer).
+    """
+
+    def __init__(self, caminho, trava):
+        self.caminho = caminho
+        self._trava = trava
+
+    def preparar(self):
+        """Remove travas deixadas por um Chrome que caiu e poda os caches acima do limite."""
+        os.makedirs(self.caminho, exist_ok=True)
+        for nome in TRAVAS_CHROME:
+            try:
+                os.remove(os.path.join(self.caminho, nome))
+            except OSError:
+                pass
+
+        limite = TAMANHO_MAXIMO_PERFIL_MB * 1024 * 1024
+        if _tamanho_diretorio(self.caminho) <= limite:
+            return
+        for cache in CACHES_PERFIL:
+            shutil.rmtree(os.path.join(self.caminho, cache), ignore_errors=True)
+        tamanho = _tamanho_diretorio(self.caminho)
+        if tamanho > limite:
+            logging.info(f"🧹 Perfil {self.caminho} com {tamanho / 1024 / 1024:.0f} MB mesmo sem caches; recriando.")
+            self.resetar()
+        else:
+            logging.info(f"🧹 Caches do perfil {self.caminho} podados ({tamanho / 1024 / 1024:.0f} MB restantes).")
+
+    def resetar(self):
+        """Apaga o perfil (ex.: corrompido) e começa um vazio no mesmo lugar."""
+        shutil.rmtree(self.caminho, ignore_errors=True)
+        os.makedirs(self.caminho, exist_ok=True)
+
+    def liberar(self):
+        if self._trava is not None:
+            self._trava.close()
+            self._trava = None
+
+
+def reservar_perfil():
+    """
+    Reserva o primeiro perfil livre em DIRETORIO_PERFIS_CHROME (perfil_0, perfil_1, ...),
+    de modo que navegadores abertos ao mesmo tempo, no mesmo processo ou em outros,
+    nunca compartilhem um perfil.
+
+    Returns:
+        PerfilChrome preparado, ou None se todos os MAX_PERFIS_CHROME estiverem em uso.
+    """
+    os.makedirs(DIRETORIO_PERFIS_CHROME, exist_ok=True)
+    for numero in range(MAX_PERFIS_CHROME):
+        caminho = os.path.join(DIRETORIO_PERFIS_CHROME, f"perfil_{numero}")
+        trava = open(f"{caminho}.lock", "a+")
+        try:
+            if fcntl is not None:
+                fcntl.flock(trava.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(trava.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            trava.close()
+            continue
+        perfil = PerfilChrome(caminho, trava)
+        perfil.preparar()
+        return perfil
+    logging.warning(f"⚠️ Todos os {MAX_PERFIS_CHROME} perfis persistentes estão em uso; usando um perfil temporário.")
+    return None
+
+
+def _versao_principal(versao):
+    match = re.search(r"(\d+)\.\d+", versao or "")
+    return match.group(1) if match else None
+
+
+def resolver_chromedriver(chrome_cmd):
+    """
+    Resolve o ChromeDriver compatível com o Chrome em chrome_cmd, guardando o resultado
+    em ARQUIVO_MANIFESTO_CHROMEDRIVER. Enquanto o binário do Chrome não mudar (mesmo
+    caminho e data de modificação), nada é executado nem baixado. Se mudar mas a versão
+    principal continuar a mesma, o ChromeDriver do manifesto segue valendo; só uma
+    versão principal nova consulta o ChromeDriverManager.
+
+    Returns:
+        tuple: (caminho do chromedriver, versão do Chrome)
+    """
+    chrome = os.path.realpath(chrome_cmd)
+    modificado_em = os.path.getmtime(chrome)
+    try:
+        with open(ARQUIVO_MANIFESTO_CHROMEDRIVER, encoding="utf-8") as f:
+            manifesto = json.load(f)
+    except (OSError, ValueError):
+        manifesto = {}
+
+    chromedriver = manifesto.get("chromedriver")
+    if not (chromedriver and os.path.exists(chromedriver)):
+        chromedriver = None
+    elif manifesto.get("chrome") == chrome and manifesto.get("chrome_modificado_em") == modificado_em:
+        return chromedriver, manifesto.get("versao_chrome", "")
+
+    versao = subprocess.check_output([chrome_cmd, '--version'], stderr=subprocess.STDOUT).decode().strip()
+    if chromedriver is None or _versao_principal(versao) != _versao_principal(manifesto.get("versao_chrome")):
+        logging.info(f"🧭 Resolvendo ChromeDriver para {versao!r}...")
+        chromedriver = ChromeDriverManager().install()
+
+    try:
+        os.makedirs(os.path.dirname(ARQUIVO_MANIFESTO_CHROMEDRIVER) or ".", exist_ok=True)
+        temporario = f"{ARQUIVO_MANIFESTO_CHROMEDRIVER}.{os.getpid()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump({
+                "chrome": chrome,
+                "chrome_modificado_em": modificado_em,
+                "versao_chrome": versao,
+                "chromedriver": chromedriver,
+            }, f, ensure_ascii=False, indent=2)
+        os.replace(temporario, ARQUIVO_MANIFESTO_CHROMEDRIVER)
+    except OSError as e:
+        logging.warning(f"⚠️ Não foi possível salvar o manifesto do ChromeDriver: {e}")
+    return chromedriver, versao
+
+@medido("inicio_navegador")
 def iniciar_navegador(headless=True):
     """
     Inicia o navegador Chrome com configurações otimizadas.
@@ -53,8 +222,8 @@ def iniciar_navegador(headless=True):
             else:
                 raise Exception("Chrome não está instalado ou não pode ser executado")
 
-        chrome_version = subprocess.check_output([chrome_cmd, '--version'], stderr=subprocess.STDOUT)
-        logging.info(f"Chrome instalado: {chrome_version.decode().strip()!r}")
+        chromedriver, chrome_version = resolver_chromedriver(chrome_cmd)
+        logging.info(f"Chrome instalado: {chrome_version!r}")
 
     except (subprocess.CalledProcessError, FileNotFoundError, Exception) as e:
         logging.error(f"Chrome não está instalado ou não pode ser executado: {e}")
@@ -63,6 +232,15 @@ def iniciar_navegador(headless=True):
 
     options = Options()
     
+    # Não esperar subrecursos em driver.get: cada página é dada como pronta pelo seu seletor
+    options.page_load_strategy = ESTRATEGIA_CARREGAMENTO
+    
+    # Perfil persistente (cache HTTP e estado do site aquecidos entre execuções)
+    perfil = reservar_perfil() if PERFIL_CHROME_PERSISTENTE else None
+    if perfil is not None:
+        options.add_argument(f"--user-data-dir={os.path.abspath(perfil.caminho)}")
+        logging.info(f"🗄️ Usando perfil persistente: {perfil.caminho}")
+    
     # Configurar modo headless/headful
     if headless:
         options.add_argument("--headless")
@@ -150,7 +328,7 @@ def iniciar_navegador(headless=True):
     options.add_argument("--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
     
     try:
-        service = Service(ChromeDriverManager().install())
+        service = Service(chromedriver)
         logging.info(f"ChromeDriver instalado em: {service.path}")
         
         if os.path.exists(service.path):
@@ -160,7 +338,23 @@ def iniciar_navegador(headless=True):
                 os.chmod(service.path, 0o755)
                 logging.info("Permissão de execução adicionada ao ChromeDriver")
         
-        driver = webdriver.Chrome(service=service, options=options)
+        try:
+            driver = webdriver.Chrome(service=service, options=options)
+        except Exception as e:
+            if perfil is None or not RE_ERRO_PERFIL.search(str(e)):
+                raise
+            # Perfil corrompido (ex.: Chrome morto no meio de uma escrita): recomeça do zero
+            logging.warning(f"⚠️ Chrome não abriu com o perfil {perfil.caminho} ({e}); recriando o perfil.")
+            perfil.resetar()
+            driver = webdriver.Chrome(service=service, options=options)
+        
+        if perfil is not None:
+            _liberar_perfil_ao_encerrar(driver, perfil)
+        _contar_comandos(driver)
+        if INSTRUMENTAR_WEBDRIVER:
+            instrumentar_comandos(driver)
+        if PERFILAR_ESPERAS:
+            perfilar_esperas()
         
         # Executar scripts para remover propriedades de automação e contornar Cloudflare
         driver.execute_script("""
@@ -179,10 +373,15 @@ def iniciar_navegador(headless=True):
             delete window.cdc_adoQpoasnfa76pfcZLmcfl_Symbol;
         """)
         
+        # Analytics, fontes e imagens não são baixados (só vale para a aba atual)
+        bloquear_recursos(driver)
+        
         logging.info("Navegador Chrome iniciado com sucesso!")
         return driver
 
     except Exception as e:
+        if perfil is not None:
+            perfil.liberar()
         logging.error(f"Erro ao iniciar o ChromeDriver ou abrir o navegador: {e}")
         # Se quiser diagnosticar dependências no Linux:
         try:
@@ -191,3 +390,68 @@ def iniciar_navegador(headless=True):
         except Exception:
             logging.error("Não foi possível verificar as dependências do ChromeDriver")
         raise
+
+
+def copiar_cookies(driver, cookies):
+    """
+    Injeta cookies (no formato de driver.get_cookies()) em outro navegador via CDP,
+    sem precisar abrir antes uma página do domínio.
+    """
+    driver.execute_cdp_cmd("Network.enable", {})
+    for cookie in cookies:
+        parametros = {
+            "name": cookie["name"],
+            "value": cookie["value"],
+            "domain": cookie.get("domain"),
+            "path": cookie.get("path", "/"),
+            "secure": cookie.get("secure", False),
+            "httpOnly": cookie.get("httpOnly", False),
+        }
+        if cookie.get("expiry"):
+            parametros["expires"] = cookie["expiry"]
+        if cookie.get("sameSite"):
+            parametros["sameSite"] = cookie["sameSite"]
+        driver.execute_cdp_cmd("Network.setCookie", parametros)
+
+
+def _liberar_perfil_ao_encerrar(driver, perfil):
+    """Faz driver.quit() liberar também a reserva do perfil persistente."""
+    encerrar = driver.quit
+
+    def quit():
+        try:
+            encerrar()
+        finally:
+            perfil.liberar()
+
+    driver.quit = quit
+
+
+def _contar_comandos(driver):
+    """Conta em metricas cada comando enviado ao WebDriver e os bytes das respostas em texto."""
+    executar = driver.execute
+
+    def execute(comando, parametros=None):
+        resposta = executar(comando, parametros)
+        contar("comandos_webdriver")
+        valor = resposta.get("value") if isinstance(resposta, dict) else None
+        if isinstance(valor, str):
+            contar("bytes_webdriver", len(valor.encode("utf-8")))
+        return resposta
+
+    driver.execute = execute
+
+
+def bloquear_recursos(driver, padroes=URLS_BLOQUEADAS):
+    """
+    Bloqueia via CDP as requisições cujas URLs casem com algum dos padrões (curinga *).
+    O bloqueio vale só para a aba atual: cada aba nova precisa chamar esta função
+    antes de navegar.
+    """
+    if not padroes:
+        return
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(padroes)})
+    except Exception as e:
+        logging.warning(f"⚠️ Não foi possível bloquear recursos na aba: {e}")
@@ -0,0 +1,74 @@
+# orgaos_origem.py
+
+import json
+import logging
+import os
+import re
+
+from config import ARQUIVO_TABELA_ORGAOS
+
+# "0360,TRIBUNAL DE JUSTIÇA DO ESTADO DE GOIÁS  (TJGO)" -> sigla entre parênteses no fim
+RE_SIGLA = re.compile(r"\(([^)]+)\)\s*$")
+
+# Tabela sigla -> código já interpretada nesta execução
+_tabela = None
+
+
+def interpretar_tabela_orgaos(valores):
+    """
+    Interpreta o valor do campo oculto idOrgaosOrigemValores, no formato
+    "0360,TRIBUNAL DE JUSTIÇA DO ESTADO DE GOIÁS  (TJGO),...".
+
+    Returns:
+        dict: sigla (maiúscula) -> código.
+    """
+    partes = valores.split(",")
+    tabela = {}
+    for codigo, descricao in zip(partes[0::2], partes[1::2]):
+        match = RE_SIGLA.search(descricao)
+        if match:
+            tabela.setdefault(match.group(1).strip().upper(), codigo.strip())
+    return tabela
+
+
+def registrar_tabela_orgaos(valores):
+    """Guarda (em memória e em disco) a tabela lida da página de pesquisa."""
+    global _tabela
+    tabela = interpretar_tabela_orgaos(valores or "")
+    if not tabela:
+        return
+    _tabela = tabela
+    try:
+        os.makedirs(os.path.dirname(ARQUIVO_TABELA_ORGAOS) or ".", exist_ok=True)
+        with open(ARQUIVO_TABELA_ORGAOS, "w", encoding="utf-8") as f:
+            json.dump(tabela, f, ensure_ascii=False)
+    except OSError as e:
+        logging.warning(f"⚠️ Não foi possível salvar a tabela de órgãos de origem: {e}")
+
+
+def tabela_orgaos():
+    """
+    Tabela sigla -> código dos órgãos de origem: a já lida nesta execução ou a
+    salva em disco por uma execução anterior. Retorna None se nenhuma existir.
+    """
+    global _tabela
+    if _tabela is None:
+        try:
+            with open(ARQUIVO_TABELA_ORGAOS, encoding="utf-8") as f:
+                _tabela = json.load(f)
+        except (OSError, ValueError):
+            return None
+    return _tabela
+
+
+def codigo_orgao_origem(sigla, valores=None):
+    """
+    Código de um órgão de origem pela sigla (ex.: "TJGO" -> "0360"). Só se a sigla
+    não estiver na tabela em cache, valores (o campo idOrgaosOrigemValores da
+    página) é interpretado e passa a ser a tabela guardada.
+    """
+    codigo = (tabela_orgaos() or {}).get(sigla.upper())
+    if codigo is None and valores:
+        registrar_tabela_orgaos(valores)
+        codigo = (tabela_orgaos() or {}).get(sigla.upper())
+    return codigo
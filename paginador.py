@@ -1,131 +1,325 @@
 # paginador.py
 
-import time
+from collections import deque
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
-from config import TEMPO_PAUSA_CURTO_ENTRE_PAGINAS
+from selenium.webdriver.support.ui import WebDriverWait
+from config import TEMPO_MAXIMO_TROCA_PAGINA, MAX_ABAS_SIMULTANEAS
 from selenium.common.exceptions import TimeoutException
+from produtor_consumidor import ItemTrabalho
+from checkpoint import Checkpoint
+from navegador import bloquear_recursos
+from cache_detalhes import obter_cache_detalhes, assinatura_bloco
+from utils.taxa import aguardar_vez
+from utils import prontidao
+from metricas import medido, contar
 
-def navegar_paginas_e_extrair(driver, wait, extrair_detalhes_processo, data_autuacao):
+def extrair_total_resultados(driver):
+    """
+    Lê o total de resultados informado pelo site na primeira página de resultados.
+
+    Returns:
+        tuple: (total_resultados_site, paginas_total_previstas)
+    """
+    total_resultados_site = None
+    paginas_total_previstas = None
+    resultados_por_pagina = None
+
+    try:
+        import re
+        # 1. Tenta extrair pelo padrão "Exibindo X–Y de Z" (abrange todos os casos com mais de 1 resultado)
+        try:
+            info_element = driver.find_element(By.XPATH, "//*[contains(text(), 'Exibindo') and contains(text(), 'de')]")
+            info_text = info_element.text.strip()
+            print(f"[DEBUG] Texto de info de resultados extraído: '{info_text}'")
+            match = re.search(r"Exibindo (\d+)[–\-—](\d+) de (\d+)", info_text)
+            if match:
+                inicio, fim, total = map(int, match.groups())
+                total_resultados_site = total
+                resultados_por_pagina = fim - inicio + 1
+                paginas_total_previstas = (total + resultados_por_pagina - 1) // resultados_por_pagina
+                print(f"[DEBUG] Regex principal capturou: inicio={inicio}, fim={fim}, total={total}")
+            else:
+                match_total = re.search(r"de (\d+)", info_text)
+                if match_total:
+                    total = int(match_total.group(1))
+                    total_resultados_site = total
+                    print(f"[DEBUG] Regex alternativo capturou total_resultados_site={total_resultados_site}")
+                else:
+                    print(f"[ERRO] Regex não capturou total de resultados no texto: '{info_text}'")
+                    total_resultados_site = None
+                    paginas_total_previstas = None
+        except Exception as e:
+            print(f"[DEBUG] 'Exibindo ... de ...' não encontrado ou erro: {e}")
+
+        # 2. Se não achou, tenta o padrão "Pesquisa resultou em <b>1</b> registro(s)!"
+        if total_resultados_site is None:
+            try:
+                mensagem_element = driver.find_element(By.CSS_SELECTOR, ".clsMensagemLinha")
+                mensagem_html = mensagem_element.get_attribute("innerHTML")
+                print(f"[DEBUG] HTML de .clsMensagemLinha: '{mensagem_html}'")
+                match_registros = re.search(r"Pesquisa resultou em <b>(\d+)</b> registro", mensagem_html)
+                if match_registros:
+                    total_resultados_site = int(match_registros.group(1))
+                    print(f"[DEBUG] Capturado total_resultados_site={total_resultados_site} via .clsMensagemLinha")
+                    paginas_total_previstas = 1
+                else:
+                    print(f"[DEBUG] .clsMensagemLinha presente mas regex não bateu: '{mensagem_html}'")
+            except Exception as e:
+                print(f"[DEBUG] .clsMensagemLinha não encontrada ou erro: {e}")
+
+        # 3. Se ainda não achou, pode ser o caso de cair direto na página de detalhes de 1 resultado
+        if total_resultados_site is None:
+            print("[DEBUG] Nenhum total de resultados encontrado, assumindo 1 resultado (página de detalhe única)")
+            total_resultados_site = 1
+            paginas_total_previstas = 1
+    except Exception as e:
+        print(f"[ERRO] Falha inesperada ao extrair total de resultados do site: {e}")
+        total_resultados_site = 1
+        paginas_total_previstas = 1
+
+    return total_resultados_site, paginas_total_previstas
+
+
+# Coleta, numa única chamada ao navegador, o primeiro link de HC de cada bloco de
+# resultado (mesmo filtro de antes: "HC " mas não "RHC ", sem ProcessoDetalhes()),
+# junto com o texto do bloco, usado para saber se o HC mudou desde que foi para o cache
+SCRIPT_LINKS_HC = """
+var blocos = document.getElementsByClassName('clsListaProcessoFormatoVerticalLinha');
+var itens = [];
+for (var i = 0; i < blocos.length; i++) {
+    var links = blocos[i].getElementsByTagName('a');
+    for (var j = 0; j < links.length; j++) {
+        var texto = (links[j].innerText || '').replace(/\\u00a0/g, ' ').trim();
+        if (texto.indexOf('HC ') !== 0 || texto.indexOf('RHC ') === 0) continue;
+        var href = links[j].href;
+        if (href && href.indexOf('javascript:ProcessoDetalhes()') === -1) {
+            itens.push([texto, href, blocos[i].innerText || '']);
+            break;  // só processa um link HC por bloco
+        }
+    }
+}
+return {blocos: blocos.length, itens: itens};
+"""
+
+
+@medido("pagina_lista")
+def _coletar_links_pagina(driver, wait):
+    """
+    Aguarda a página de resultados e devolve (numero_de_blocos, [(texto, href), ...],
+    {href: assinatura do bloco}) com um único execute_script, em vez de várias
+    chamadas por link.
+    """
+    _localizar_blocos(wait)
+    dados = driver.execute_script(SCRIPT_LINKS_HC)
+    itens = [(texto, href) for texto, href, _ in dados["itens"]]
+    assinaturas = {href: assinatura_bloco(bloco) for _, href, bloco in dados["itens"]}
+    return dados["blocos"], itens, assinaturas
+
+
+def _abrir_aba(driver, wait, href):
+    """
+    Abre href em uma nova aba e retorna o handle criado, voltando para a aba atual.
+    A aba nasce em branco para receber o bloqueio de recursos antes de navegar.
+    """
+    atual = driver.current_window_handle
+    antes = set(driver.window_handles)
+    driver.execute_script("window.open('about:blank');")
+    wait.until(lambda d: len(d.window_handles) > len(antes))
+    handle = (set(driver.window_handles) - antes).pop()
+    driver.switch_to.window(handle)
+    bloquear_recursos(driver)
+    driver.execute_script("window.location.href = arguments[0];", href)
+    driver.switch_to.window(atual)
+    return handle
+
+
+def extrair_detalhes_em_abas(driver, wait, itens, extrair_detalhes_processo, data_autuacao, max_abas=MAX_ABAS_SIMULTANEAS, ao_extrair=None):
+    """
+    Extrai os detalhes abrindo até max_abas abas ao mesmo tempo: enquanto uma aba é lida,
+    as seguintes já estão carregando. Cada aba lida é reaproveitada para o próximo link.
+
+    Args:
+        itens: Lista de tuplas (texto, href).
+        max_abas: Número máximo de abas de detalhe abertas simultaneamente.
+        ao_extrair: Função opcional (href, resultado) chamada a cada HC extraído.
+
+    Returns:
+        list: Resultados extraídos (na ordem dos itens, sem os que falharam).
+    """
+    resultados = []
+    principal = driver.current_window_handle
+    restantes = iter(itens)
+    abertas = deque()  # (texto, href, handle) na ordem dos itens
+
+    def carregar_proximo(handle=None):
+        for texto, href in restantes:
+            try:
+                aguardar_vez()
+                if handle is None:
+                    abertas.append((texto, href, _abrir_aba(driver, wait, href)))
+                else:
+                    # Esvazia a página antes de navegar, para não ler o HC anterior
+                    driver.execute_script(
+                        "document.documentElement.innerHTML = ''; window.location.href = arguments[0];", href
+                    )
+                    abertas.append((texto, href, handle))
+                return
+            except Exception as e:
+                print(f"⚠️ Erro ao processar link {href}: {e}")
+                handle = None
+
+    try:
+        for _ in range(max(1, max_abas)):
+            carregar_proximo()
+
+        while abertas:
+            texto, href, handle = abertas.popleft()
+            reaproveitar = None
+            try:
+                driver.switch_to.window(handle)
+                resultado = extrair_detalhes_processo(driver, wait, texto, data_autuacao)
+                if resultado:
+                    resultados.append(resultado)
+                    if ao_extrair:
+                        ao_extrair(href, resultado)
+                reaproveitar = handle
+            except Exception as e:
+                print(f"⚠️ Erro ao processar link {href}: {e}")
+                contar("falhas_detalhe_hc")
+                try:
+                    driver.close()
+                except Exception:
+                    pass
+            if reaproveitar is None:
+                driver.switch_to.window(principal)
+            carregar_proximo(reaproveitar)
+    finally:
+        for handle in driver.window_handles:
+            if handle != principal:
+                driver.switch_to.window(handle)
+                driver.close()
+        driver.switch_to.window(principal)
+
+    return resultados
+
+
+# Texto do contador "Exibindo X–Y de Z" da página atual (ou null)
+SCRIPT_CONTADOR = """
+var m = document.body ? document.body.innerText.match(/Exibindo \\d+\\D\\d+ de \\d+/) : null;
+return m ? m[0] : null;
+"""
+
+
+def _pagina_trocou(bloco_anterior, contador_anterior):
+    """Condição de espera: o primeiro bloco antigo saiu do DOM ou o contador mudou."""
+    def condicao(driver):
+        if bloco_anterior is not None and EC.staleness_of(bloco_anterior)(driver):
+            return True
+        contador = driver.execute_script(SCRIPT_CONTADOR)
+        return contador is not None and contador != contador_anterior
+    return condicao
+
+
+def _avancar_pagina(driver, relatorio_paginas):
+    """
+    Clica em 'Próximo' e espera a troca de página (blocos antigos obsoletos ou contador
+    alterado), por no máximo TEMPO_MAXIMO_TROCA_PAGINA segundos.
+    Retorna False quando não há próxima página ou ela não carregou.
+    """
+    try:
+        botao_proximo = driver.find_element(By.LINK_TEXT, "Próximo")
+        if "desabilitado" in botao_proximo.get_attribute("class").lower():
+            relatorio_paginas.append("⏹️ Fim da navegação: botão 'Próximo' desabilitado.")
+            return False
+        blocos = driver.find_elements(By.CLASS_NAME, "clsListaProcessoFormatoVerticalLinha")
+        contador = driver.execute_script(SCRIPT_CONTADOR)
+        aguardar_vez()
+        botao_proximo.click()
+    except Exception:
+        relatorio_paginas.append("⏹️ Fim da navegação: botão 'Próximo' não encontrado.")
+        return False
+
+    try:
+        WebDriverWait(driver, TEMPO_MAXIMO_TROCA_PAGINA, poll_frequency=0.1).until(
+            _pagina_trocou(blocos[0] if blocos else None, contador)
+        )
+    except TimeoutException:
+        contar("falhas_troca_pagina")
+        relatorio_paginas.append(f"⏹️ Fim da navegação: a página não mudou em {TEMPO_MAXIMO_TROCA_PAGINA}s após clicar em 'Próximo'.")
+        return False
+    return True
+
+
+def _localizar_blocos(wait):
+    # Lista de resultados ou, se a pesquisa não trouxe nada, a mensagem do site
+    # (sem esperar o timeout inteiro por blocos que não virão)
+    return wait.until(prontidao.pronta(prontidao.RESULTADOS))
+
+
+def navegar_paginas_e_extrair(driver, wait, extrair_detalhes_processo, data_autuacao, checkpoint=None):
+    """
+    Percorre as páginas de resultados extraindo os detalhes de cada HC em abas.
+    Com um checkpoint de execução anterior, páginas já concluídas são apenas
+    atravessadas e HCs já extraídos não são abertos de novo. HCs válidos no cache
+    de detalhes também não são abertos.
+    """
+    checkpoint = checkpoint or Checkpoint()
+    cache = obter_cache_detalhes()
     resultados = []
     relatorio_paginas = []
     pagina = 1
     paginas_processadas = 0
     total_resultados_site = None
     paginas_total_previstas = None
-    resultados_por_pagina = None
 
     while True:
         relatorio = f"📄 Página {pagina}: "
 
         # Na primeira página, tentar extrair o total de resultados do site
         if pagina == 1:
+            total_resultados_site, paginas_total_previstas = extrair_total_resultados(driver)
+
+        if checkpoint.pagina_concluida(pagina):
+            extraidos = checkpoint.resultados_pagina(pagina)
+            relatorio += f"concluída em execução anterior, {len(extraidos)} HCs recuperados do checkpoint."
+        else:
             try:
-                import re
-                # 1. Tenta extrair pelo padrão "Exibindo X–Y de Z" (abrange todos os casos com mais de 1 resultado)
-                try:
-                    info_element = driver.find_element(By.XPATH, "//*[contains(text(), 'Exibindo') and contains(text(), 'de')]")
-                    info_text = info_element.text.strip()
-                    print(f"[DEBUG] Texto de info de resultados extraído: '{info_text}'")
-                    match = re.search(r"Exibindo (\d+)[–\-—](\d+) de (\d+)", info_text)
-                    if match:
-                        inicio, fim, total = map(int, match.groups())
-                        total_resultados_site = total
-                        resultados_por_pagina = fim - inicio + 1
-                        paginas_total_previstas = (total + resultados_por_pagina - 1) // resultados_por_pagina
-                        print(f"[DEBUG] Regex principal capturou: inicio={inicio}, fim={fim}, total={total}")
-                    else:
-                        match_total = re.search(r"de (\d+)", info_text)
-                        if match_total:
-                            total = int(match_total.group(1))
-                            total_resultados_site = total
-                            print(f"[DEBUG] Regex alternativo capturou total_resultados_site={total_resultados_site}")
-                        else:
-                            print(f"[ERRO] Regex não capturou total de resultados no texto: '{info_text}'")
-                            total_resultados_site = None
-                            paginas_total_previstas = None
-                except Exception as e:
-                    print(f"[DEBUG] 'Exibindo ... de ...' não encontrado ou erro: {e}")
-
-                # 2. Se não achou, tenta o padrão "Pesquisa resultou em <b>1</b> registro(s)!"
-                if total_resultados_site is None:
-                    try:
-                        mensagem_element = driver.find_element(By.CSS_SELECTOR, ".clsMensagemLinha")
-                        mensagem_html = mensagem_element.get_attribute("innerHTML")
-                        print(f"[DEBUG] HTML de .clsMensagemLinha: '{mensagem_html}'")
-                        match_registros = re.search(r"Pesquisa resultou em <b>(\d+)</b> registro", mensagem_html)
-                        if match_registros:
-                            total_resultados_site = int(match_registros.group(1))
-                            print(f"[DEBUG] Capturado total_resultados_site={total_resultados_site} via .clsMensagemLinha")
-                            paginas_total_previstas = 1
-                        else:
-                            print(f"[DEBUG] .clsMensagemLinha presente mas regex não bateu: '{mensagem_html}'")
-                    except Exception as e:
-                        print(f"[DEBUG] .clsMensagemLinha não encontrada ou erro: {e}")
-
-                # 3. Se ainda não achou, pode ser o caso de cair direto na página de detalhes de 1 resultado
-                if total_resultados_site is None:
-                    print("[DEBUG] Nenhum total de resultados encontrado, assumindo 1 resultado (página de detalhe única)")
-                    total_resultados_site = 1
-                    paginas_total_previstas = 1
-            except Exception as e:
-                print(f"[ERRO] Falha inesperada ao extrair total de resultados do site: {e}")
-                total_resultados_site = 1
-                paginas_total_previstas = 1
+                num_blocos, itens, assinaturas = _coletar_links_pagina(driver, wait)
+            except TimeoutException:
+                relatorio += "❌ Timeout ao tentar localizar blocos. Interrompendo."
+                relatorio_paginas.append(relatorio)
+                break
 
-        try:
-            blocos = wait.until(EC.presence_of_all_elements_located(
-                (By.CLASS_NAME, "clsListaProcessoFormatoVerticalLinha")
-            ))
-        except TimeoutException:
-            relatorio += "❌ Timeout ao tentar localizar blocos. Interrompendo."
-            relatorio_paginas.append(relatorio)
-            break
+            checkpoint.iniciar_pagina(pagina, itens)
+            do_checkpoint = len(itens) - len(checkpoint.pendentes(itens))
+            do_cache = cache.aproveitar(checkpoint, pagina, itens, assinaturas, data_autuacao)
+            pendentes = checkpoint.pendentes(itens)
 
-        hc_na_pagina = 0
-
-        for bloco in blocos:
-            links = bloco.find_elements(By.TAG_NAME, "a")
-            for link in links:
-                texto = link.text.strip()
-                if texto.startswith("HC ") and not texto.startswith("RHC "):
-                    href = link.get_attribute("href")
-                    if href and "javascript:ProcessoDetalhes()" not in href:
-                        try:
-                            driver.execute_script("window.open(arguments[0]);", href)
-                            wait.until(lambda d: len(d.window_handles) == 2)
-                            driver.switch_to.window(driver.window_handles[-1])
-
-                            resultado = extrair_detalhes_processo(driver, wait, texto, data_autuacao)
-                            if resultado:
-                                resultados.append(resultado)
-                                hc_na_pagina += 1
-
-                        except Exception as e:
-                            print(f"⚠️ Erro ao processar link {href}: {e}")
-                        finally:
-                            driver.close()
-                            driver.switch_to.window(driver.window_handles[0])
-                            time.sleep(0.5)
-                        break  # só processa um link HC por bloco
-
-        relatorio += f"{len(blocos)} blocos analisados, {hc_na_pagina} HCs extraídos."
+            def ao_extrair(href, resultado, pagina=pagina):
+                checkpoint.registrar_hc(pagina, href, resultado)
+                cache.guardar(href, resultado)
+
+            extrair_detalhes_em_abas(
+                driver, wait, pendentes, extrair_detalhes_processo, data_autuacao, ao_extrair=ao_extrair,
+            )
+            extraidos = checkpoint.resultados_itens(itens)
+
+            relatorio += f"{num_blocos} blocos analisados, {len(extraidos)} HCs extraídos"
+            if do_checkpoint:
+                relatorio += f" ({do_checkpoint} recuperados do checkpoint)"
+            if do_cache:
+                relatorio += f" ({do_cache} recuperados do cache)"
+            relatorio += "."
+
+        resultados.extend(extraidos)
         relatorio_paginas.append(relatorio)
         paginas_processadas += 1
 
         # Próxima página
-        try:
-            botao_proximo = driver.find_element(By.LINK_TEXT, "Próximo")
-            if "desabilitado" in botao_proximo.get_attribute("class").lower():
-                relatorio_paginas.append("⏹️ Fim da navegação: botão 'Próximo' desabilitado.")
-                break
-            else:
-                botao_proximo.click()
-                time.sleep(TEMPO_PAUSA_CURTO_ENTRE_PAGINAS)
-                pagina += 1
-        except Exception:
-            relatorio_paginas.append("⏹️ Fim da navegação: botão 'Próximo' não encontrado.")
+        if not _avancar_pagina(driver, relatorio_paginas):
             break
+        pagina += 1
 
     # Garantir que os valores não fiquem None
     if total_resultados_site is None:
@@ -135,3 +329,61 @@ def navegar_paginas_e_extrair(driver, wait, extrair_detalhes_processo, data_autu
         paginas_total_previstas = paginas_processadas
 
     return resultados, relatorio_paginas, total_resultados_site, paginas_total_previstas, paginas_processadas
+
+
+def produzir_itens_paginas(driver, wait, data_autuacao, estatisticas, checkpoint=None):
+    """
+    Gerador que percorre todas as páginas de resultados e produz um ItemTrabalho
+    (texto, href, data_autuacao, pagina) por HC, sem abrir as páginas de detalhe.
+    A extração fica a cargo de consumidores independentes (ver produtor_consumidor.py),
+    então a paginação não espera os detalhes de cada página. Páginas já concluídas
+    no checkpoint não são lidas de novo: seus itens vêm do próprio checkpoint. HCs
+    válidos no cache de detalhes são registrados no checkpoint antes de serem
+    produzidos, e os consumidores os devolvem sem abrir a página.
+
+    Args:
+        estatisticas: Dicionário preenchido durante a iteração com relatorio_paginas,
+            total_resultados_site, paginas_total_previstas e paginas_processadas.
+    """
+    checkpoint = checkpoint or Checkpoint()
+    relatorio_paginas = []
+    pagina = 1
+    total_resultados_site, paginas_total_previstas = extrair_total_resultados(driver)
+    estatisticas.update(
+        relatorio_paginas=relatorio_paginas,
+        total_resultados_site=total_resultados_site,
+        paginas_total_previstas=paginas_total_previstas,
+        paginas_processadas=0,
+    )
+
+    while True:
+        relatorio = f"📄 Página {pagina}: "
+        if checkpoint.pagina_concluida(pagina):
+            itens_pagina = checkpoint.itens_pagina(pagina)
+            relatorio += f"concluída em execução anterior, {len(itens_pagina)} HCs recuperados do checkpoint."
+        else:
+            try:
+                num_blocos, itens_pagina, assinaturas = _coletar_links_pagina(driver, wait)
+            except TimeoutException:
+                relatorio += "❌ Timeout ao tentar localizar blocos. Interrompendo."
+                relatorio_paginas.append(relatorio)
+                break
+            checkpoint.iniciar_pagina(pagina, itens_pagina)
+            do_cache = obter_cache_detalhes().aproveitar(checkpoint, pagina, itens_pagina, assinaturas, data_autuacao)
+            relatorio += f"{num_blocos} blocos analisados, {len(itens_pagina)} HCs enviados para extração"
+            if do_cache:
+                relatorio += f" ({do_cache} recuperados do cache)"
+            relatorio += "."
+
+        for texto, href in itens_pagina:
+            yield ItemTrabalho(texto, href, data_autuacao, pagina)
+
+        relatorio_paginas.append(relatorio)
+        estatisticas["paginas_processadas"] += 1
+
+        if not _avancar_pagina(driver, relatorio_paginas):
+            break
+        pagina += 1
+
+    if estatisticas["paginas_total_previstas"] is None:
+        estatisticas["paginas_total_previstas"] = estatisticas["paginas_processadas"]
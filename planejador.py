@@ -0,0 +1,244 @@
+# planejador.py
+
+import logging
+import multiprocessing
+import os
+from datetime import datetime, timedelta
+
+from selenium.webdriver.support.ui import WebDriverWait
+
+from config import LIMITE_RESULTADOS_POR_CONSULTA, PROCESSOS_SUBCONSULTAS, TAXA_MAXIMA_REQUISICOES, ORGAO_ORIGEM, MOTOR_BUSCA
+from motor_http import MotorHttpIndisponivel, criar_sessao_http, pesquisar_http, interpretar_pagina_lista
+from sessao_cloudflare import carregar_sessao
+from utils.taxa import configurar_taxa
+import instrumentacao
+import metricas
+
+FORMATO_DATA = "%d/%m/%Y"
+
+
+class SondaTotal:
+    """
+    Consulta quantos resultados o site informa para um intervalo, sem extrair nada:
+    pelo mesmo meio do motor (via HTTP para o motor "http", enquanto possível; pelo
+    navegador para os demais), com um único navegador reaproveitado em todas as
+    consultas seguintes. Com uma SessaoBusca, usa a sessão HTTP e o navegador dela,
+    que continuam abertos ao final, e a última consulta fica em `pesquisa` para o
+    motor continuar dela sem pesquisar o intervalo de novo.
+    """
+
+    def __init__(self, orgao=ORGAO_ORIGEM, sessao_busca=None, motor=MOTOR_BUSCA):
+        self.orgao = orgao
+        self.sessao_busca = sessao_busca
+        self.sessao = None
+        if motor == "http" and sessao_busca is not None:
+            self.sessao = sessao_busca.obter_sessao_http()
+        elif motor == "http":
+            salva = carregar_sessao() or {}
+            self.sessao = criar_sessao_http(user_agent=salva.get("user_agent"), cookies=salva.get("cookies"))
+        self.navegador = None
+        self.pesquisa = None
+
+    def __call__(self, data_inicial, data_final):
+        from motores import PesquisaFeita
+
+        self.pesquisa = None
+        if self.sessao is not None:
+            try:
+                html, url = pesquisar_http(self.sessao, data_inicial, data_final, self.orgao)
+                info = interpretar_pagina_lista(html)
+                if self.sessao_busca is not None:
+                    self.pesquisa = PesquisaFeita(data_inicial, data_final, html=html, url=url)
+                if info["total"] is not None:
+                    return info["total"]
+                return 1 if info["detalhe_direto"] else 0
+            except MotorHttpIndisponivel as e:
+                logging.info(f"🔎 Sondagem via HTTP indisponível ({e}); usando o navegador.")
+                if self.sessao_busca is not None:
+                    self.sessao_busca.descartar_sessao_http()
+                else:
+                    self.sessao.close()
+                self.sessao = None
+
+        from navegador import iniciar_navegador
+        from formulario import preencher_formulario
+        from paginador import extrair_total_resultados
+
+        if self.navegador is None:
+            if self.sessao_busca is not None:
+                self.navegador = self.sessao_busca.obter_navegador()
+            else:
+                self.navegador = iniciar_navegador(headless=os.environ.get('DISPLAY') is None)
+        preencher_formulario(self.navegador, WebDriverWait(self.navegador, 30), data_inicial, data_final, self.orgao)
+        if self.sessao_busca is not None:
+            self.pesquisa = PesquisaFeita(data_inicial, data_final)
+        return extrair_total_resultados(self.navegador)[0]
+
+    def encerrar(self):
+        if self.sessao_busca is not None:
+            return
+        if self.sessao is not None:
+            self.sessao.close()
+        if self.navegador is not None:
+            try:
+                self.navegador.quit()
+            except Exception:
+                pass
+
+
+def planejar_intervalos(data_inicial, data_final, consultar_total, limite=LIMITE_RESULTADOS_POR_CONSULTA,
+                        total=None):
+    """
+    Divide o intervalo ao meio, recursivamente, enquanto o total informado pelo site
+    passar de limite (um único dia nunca é dividido). Só a metade inicial é consultada:
+    o total da outra é a diferença para o total do intervalo, pois cada processo é
+    contado na sua data de autuação.
+
+    Args:
+        consultar_total: Função (data_inicial, data_final) -> total de resultados.
+        total: Total do intervalo, se já conhecido (não é consultado de novo).
+
+    Returns:
+        list: Tuplas (data_inicial, data_final, total) em ordem cronológica.
+    """
+    if total is None:
+        total = consultar_total(data_inicial, data_final)
+    inicio = datetime.strptime(data_inicial, FORMATO_DATA)
+    fim = datetime.strptime(data_final, FORMATO_DATA)
+    if total is None or total <= limite or inicio == fim:
+        return [(data_inicial, data_final, total)]
+
+    meio = inicio + (fim - inicio) // 2
+    logging.info(f"✂️ {data_inicial} a {data_final}: {total} resultados (limite {limite}); dividindo o intervalo.")
+    primeira = planejar_intervalos(data_inicial, meio.strftime(FORMATO_DATA), consultar_total, limite)
+    totais_primeira = [parcial for _, _, parcial in primeira]
+    restante = None if None in totais_primeira else total - sum(totais_primeira)
+    if restante is not None and restante < 0:
+        restante = None  # o site mudou entre as consultas: consulta a segunda metade
+    return primeira + planejar_intervalos(
+        (meio + timedelta(days=1)).strftime(FORMATO_DATA), data_final, consultar_total, limite, restante
+    )
+
+
+def _executar_subconsulta(intervalo):
+    """
+    Executa uma subconsulta em um processo próprio, com seu próprio checkpoint.
+    Devolve o retorno da busca (ou None e a mensagem do erro, se ela falhar), as
+    métricas, a contagem de comandos do WebDriver e os erros ao fechar o navegador do
+    processo. O checkpoint fica para o processo principal concluir, depois que todas
+    as subconsultas derem certo e os resultados forem gravados.
+    """
+    from checkpoint import abrir_checkpoint
+    from motores import SessaoBusca, executar_busca
+
+    data_inicial, data_final, orgao = intervalo
+    metricas.zerar()
+    instrumentacao.zerar()
+    sessao_busca = SessaoBusca()
+    retorno = erro = None
+    try:
+        checkpoint = abrir_checkpoint(data_inicial, data_final, orgao)
+        retorno = executar_busca(data_inicial, data_final, checkpoint=checkpoint, orgao=orgao, sessao_busca=sessao_busca)
+    except (Exception, SystemExit) as e:  # inclui o sys.exit de preencher_formulario, que travaria o pool
+        logging.error(f"❌ Subconsulta {data_inicial} a {data_final} falhou: {e}", exc_info=True)
+        erro = f"{type(e).__name__}: {e}"
+    finally:
+        sessao_busca.encerrar()
+    return retorno, erro, metricas.exportar(), instrumentacao.exportar(), sessao_busca.erros_fechamento
+
+
+def _chave_resultado(resultado):
+    return resultado.get("numero_processo") or resultado.get("numero_cnj")
+
+
+def mesclar_resultados(retornos, intervalos):
+    """
+    Junta as tuplas de retorno das subconsultas em uma só, removendo HCs repetidos.
+
+    Returns:
+        (resultados, paginas_info, total_resultados_site, paginas_total_previstas, paginas_processadas)
+    """
+    resultados, paginas_info, vistos = [], [], set()
+    total_resultados_site = paginas_total_previstas = paginas_processadas = 0
+
+    for (data_inicial, data_final), (parciais, relatorio, total, previstas, processadas) in zip(intervalos, retornos):
+        for resultado in parciais:
+            chave = _chave_resultado(resultado)
+            if chave in vistos:
+                continue
+            vistos.add(chave)
+            resultados.append(resultado)
+        paginas_info.extend(f"[{data_inicial} a {data_final}] {linha}" for linha in relatorio)
+        total_resultados_site += total or 0
+        paginas_total_previstas += previstas or 0
+        paginas_processadas += processadas or 0
+
+    return resultados, paginas_info, total_resultados_site, paginas_total_previstas, paginas_processadas
+
+
+def executar_busca_planejada(data_inicial, data_final, checkpoint=None, processos=PROCESSOS_SUBCONSULTAS,
+                             orgao=ORGAO_ORIGEM, sessao_busca=None):
+    """
+    Sonda o total de resultados do intervalo e, se passar de LIMITE_RESULTADOS_POR_CONSULTA,
+    divide as datas em subconsultas menores que rodam em paralelo (um processo cada,
+    respeitando TAXA_MAXIMA_REQUISICOES somada). Se não for preciso dividir, é
+    equivalente a motores.executar_busca, que continua da primeira página de resultados
+    da própria sondagem (o intervalo é submetido uma vez só) e reaproveita a
+    sessao_busca, que os processos das subconsultas não podem compartilhar.
+
+    Returns:
+        Mesma tupla de motores.executar_busca.
+
+    Raises:
+        RuntimeError: Se alguma subconsulta falhar. Os checkpoints de todas ficam em
+            disco, e a próxima execução retoma de onde cada uma parou.
+    """
+    from checkpoint import Checkpoint, caminho_checkpoint
+    from motores import SessaoBusca, executar_busca
+
+    propria = sessao_busca is None
+    if propria:
+        sessao_busca = SessaoBusca()
+    try:
+        sonda = SondaTotal(orgao, sessao_busca)
+        try:
+            planejados = planejar_intervalos(data_inicial, data_final, sonda)
+        except (Exception, SystemExit) as e:
+            logging.warning(f"⚠️ Não foi possível sondar o total de resultados ({e}); o intervalo será buscado inteiro.")
+            planejados = [(data_inicial, data_final, None)]
+            # A página em que a sondagem parou não é confiável
+            sonda.pesquisa = None
+
+        if len(planejados) == 1:
+            pesquisa = sonda.pesquisa if sonda.pesquisa and sonda.pesquisa.intervalo == (data_inicial, data_final) else None
+            return executar_busca(data_inicial, data_final, checkpoint=checkpoint, orgao=orgao,
+                                  sessao_busca=sessao_busca, pesquisa=pesquisa)
+    finally:
+        if propria:
+            sessao_busca.encerrar()
+
+    intervalos = [(inicio, fim) for inicio, fim, _ in planejados]
+    logging.info(f"🧭 Intervalo dividido em {len(intervalos)} subconsultas: " + ", ".join(
+        f"{inicio} a {fim} ({total})" for inicio, fim, total in planejados
+    ))
+
+    with multiprocessing.Pool(
+        processes=max(1, min(processos, len(intervalos))),
+        initializer=configurar_taxa,
+        initargs=(TAXA_MAXIMA_REQUISICOES, multiprocessing.Value("d", 0.0)),
+        maxtasksperchild=1,
+    ) as pool:
+        saidas = pool.map(_executar_subconsulta, [(inicio, fim, orgao) for inicio, fim in intervalos])
+
+    for _, _, medicoes, comandos, erros_fechamento in saidas:
+        metricas.incorporar(medicoes)
+        instrumentacao.incorporar(comandos)
+        sessao_busca.erros_fechamento.extend(erros_fechamento)
+
+    falhas = [f"{inicio} a {fim}: {erro}" for (inicio, fim), (_, erro, _, _, _) in zip(intervalos, saidas) if erro]
+    if falhas:
+        raise RuntimeError(f"{len(falhas)} de {len(intervalos)} subconsultas falharam ({'; '.join(falhas)})")
+
+    for inicio, fim in intervalos:
+        Checkpoint(caminho_checkpoint(inicio, fim, orgao)).concluir()
+    return mesclar_resultados([retorno for retorno, _, _, _, _ in saidas], intervalos)
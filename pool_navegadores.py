@@ -0,0 +1,78 @@
+# pool_navegadores.py
+
+import logging
+import threading
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+from navegador import iniciar_navegador, copiar_cookies
+from formulario import aguardar_pos_challenge
+from produtor_consumidor import ConsumidorIndisponivel
+from utils.taxa import aguardar_vez
+
+# Quantas vezes um worker tenta recriar o próprio navegador antes de desistir
+MAX_REINICIOS_WORKER = 1
+
+# webdriver-manager não é seguro para instalações simultâneas
+_lock_inicio = threading.Lock()
+
+
+class WorkerNavegador:
+    """
+    Consumidor do pipeline com um WebDriver próprio (criado por iniciar_navegador) que
+    recebe os cookies do navegador principal, já liberado pelo Cloudflare, e abre cada
+    link de detalhe diretamente. Se o navegador cair, ele é recriado uma vez; depois
+    disso o worker se declara indisponível e o item volta para o navegador principal.
+    """
+
+    def __init__(self, numero, cookies, extrair_detalhes_processo, headless=True):
+        self.numero = numero
+        self.cookies = cookies
+        self.extrair_detalhes_processo = extrair_detalhes_processo
+        self.headless = headless
+        self.reinicios = 0
+        self.driver = None
+        self._iniciar()
+
+    def _iniciar(self):
+        with _lock_inicio:
+            self.driver = iniciar_navegador(headless=self.headless)
+        copiar_cookies(self.driver, self.cookies)
+        self.wait = WebDriverWait(self.driver, 30)
+        logging.info(f"🧵 Worker {self.numero}: navegador pronto.")
+
+    def _extrair(self, item):
+        aguardar_vez()
+        self.driver.get(item.href)
+        if "just a moment" in self.driver.title.lower():
+            aguardar_pos_challenge(self.driver, timeout=60)
+        return self.extrair_detalhes_processo(self.driver, self.wait, item.texto, item.data_autuacao)
+
+    def __call__(self, item):
+        try:
+            return self._extrair(item)
+        except WebDriverException as e:
+            logging.warning(f"⚠️ Worker {self.numero}: navegador falhou em {item.href}: {e}")
+            if self.reinicios >= MAX_REINICIOS_WORKER:
+                raise ConsumidorIndisponivel(f"limite de reinícios do worker {self.numero} atingido")
+            self.reinicios += 1
+            self.encerrar()
+            try:
+                self._iniciar()
+            except Exception as erro_inicio:
+                raise ConsumidorIndisponivel(f"não foi possível recriar o navegador: {erro_inicio}")
+            return self._extrair(item)
+
+    def encerrar(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+
+
+def criar_fabrica_workers(cookies, extrair_detalhes_processo, headless=True):
+    """Retorna a função criar_consumidor de executar_pipeline para um pool de navegadores."""
+    def criar_consumidor(numero):
+        return WorkerNavegador(numero, cookies, extrair_detalhes_processo, headless)
+    return criar_consumidor
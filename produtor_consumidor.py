@@ -0,0 +1,123 @@
+# produtor_consumidor.py
+
+import logging
+import queue
+import threading
+from collections import namedtuple
+from config import TAMANHO_FILA_TRABALHO
+
+# Item de trabalho gerado pela paginação e consumido pela extração de detalhes
+ItemTrabalho = namedtuple("ItemTrabalho", ["texto", "href", "data_autuacao", "pagina"])
+
+
+class ConsumidorIndisponivel(Exception):
+    """Lançada por um consumidor que não consegue mais processar itens (ex.: navegador caiu)."""
+
+
+def executar_pipeline(produtor, criar_consumidor, num_consumidores, tratar_pendente=None, tamanho_fila=TAMANHO_FILA_TRABALHO):
+    """
+    Executa a extração em produtor/consumidor: o produtor (ex.: a paginação) roda na thread
+    atual e coloca cada item numa fila limitada; num_consumidores threads retiram os itens
+    e extraem os detalhes em paralelo, enquanto o produtor continua avançando.
+
+    Args:
+        produtor: Iterável de itens de trabalho.
+        criar_consumidor: Função chamada uma vez por thread com o número do consumidor;
+            retorna uma função item -> resultado. Se o objeto retornado tiver um método
+            encerrar(), ele é chamado ao final.
+        num_consumidores: Número de threads consumidoras.
+        tratar_pendente: Função opcional chamada (na thread atual, depois do produtor)
+            para cada item que ficou sem consumidor vivo.
+        tamanho_fila: Limite da fila entre produtor e consumidores.
+
+    Returns:
+        list: Resultados não nulos, na ordem em que o produtor gerou os itens.
+    """
+    fila = queue.Queue(maxsize=tamanho_fila)
+    resultados = {}
+    pendentes = []
+    lock = threading.Lock()
+    vivos = [num_consumidores]
+
+    def morrer():
+        with lock:
+            vivos[0] -= 1
+
+    def trabalhar(numero):
+        try:
+            consumidor = criar_consumidor(numero)
+        except Exception as e:
+            logging.error(f"❌ Consumidor {numero}: falha ao iniciar: {e}")
+            morrer()
+            return
+        try:
+            while True:
+                tarefa = fila.get()
+                if tarefa is None:
+                    return
+                indice, item = tarefa
+                try:
+                    resultado = consumidor(item)
+                except ConsumidorIndisponivel as e:
+                    logging.error(f"❌ Consumidor {numero}: indisponível ({e}), encerrando.")
+                    with lock:
+                        pendentes.append(tarefa)
+                    morrer()
+                    return
+                except Exception as e:
+                    print(f"⚠️ Erro ao processar item {item}: {e}")
+                    resultado = None
+                with lock:
+                    resultados[indice] = resultado
+        finally:
+            encerrar = getattr(consumidor, "encerrar", None)
+            if encerrar:
+                try:
+                    encerrar()
+                except Exception as e:
+                    logging.warning(f"⚠️ Consumidor {numero}: erro ao encerrar: {e}")
+
+    def enfileirar(tarefa):
+        # Não bloqueia para sempre se todos os consumidores tiverem caído
+        while True:
+            with lock:
+                if vivos[0] <= 0:
+                    if tarefa is not None:
+                        pendentes.append(tarefa)
+                    return
+            try:
+                fila.put(tarefa, timeout=1)
+                return
+            except queue.Full:
+                continue
+
+    threads = [
+        threading.Thread(target=trabalhar, args=(i + 1,), name=f"consumidor-{i + 1}", daemon=True)
+        for i in range(num_consumidores)
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        for indice, item in enumerate(produtor):
+            enfileirar((indice, item))
+    finally:
+        for _ in threads:
+            enfileirar(None)
+        for thread in threads:
+            thread.join()
+
+    while True:
+        try:
+            tarefa = fila.get_nowait()
+        except queue.Empty:
+            break
+        if tarefa is not None:
+            pendentes.append(tarefa)
+
+    if pendentes:
+        logging.warning(f"⚠️ {len(pendentes)} itens ficaram sem consumidor disponível.")
+        for indice, item in sorted(pendentes, key=lambda t: t[0]):
+            resultados[indice] = tratar_pendente(item) if tratar_pendente else None
+
+    return [resultados[i] for i in sorted(resultados) if resultados[i]]
@@ -0,0 +1,316 @@
+# servidor_stj_local.py
+#
+# Servidor HTTP local que imita o sistema de processos do STJ para testes e benchmarks
+# sem rede: serve o formulário salvo em pagina_stj.html (com um script no lugar do
+# principal.js do site), uma lista sintética de resultados paginada e páginas de
+# detalhe, com latência configurável e, opcionalmente, a página "Just a moment..." do
+# Cloudflare. Para apontar o scraper para ele, use STJ_URL_BASE=http://127.0.0.1:<porta>.
+
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from orgaos_origem import interpretar_tabela_orgaos
+
+ARQUIVO_PAGINA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pagina_stj.html")
+CAMINHO_PESQUISA = "/processo/pesquisa/"
+CAMINHO_SCRIPT_PRINCIPAL = "/recursos/processo/pesquisa/script/principal.js"
+
+COOKIE_CLEARANCE = "cf_clearance"
+MAX_DIAS_INTERVALO = 100
+
+RELATORES = [
+    "MIN. ROGERIO SCHIETTI CRUZ", "MIN. SEBASTIÃO REIS JÚNIOR", "MIN. JOEL ILAN PACIORNIK",
+    "MIN. REYNALDO SOARES DA FONSECA", "MIN. RIBEIRO DANTAS", "MIN. ANTONIO SALDANHA PALHEIRO",
+]
+FASES = [
+    "CONCLUSOS PARA DECISÃO AO(À) MINISTRO(A) RELATOR(A)",
+    "AGUARDANDO JULGAMENTO",
+    "VISTA AO MINISTÉRIO PÚBLICO FEDERAL",
+    "DECISÃO PROFERIDA",
+]
+
+# Substitui o principal.js do site: expande a seção de órgão de origem, converte a
+# sigla digitada no código da tabela idOrgaosOrigemValores e submete o formulário
+SCRIPT_PRINCIPAL = """
+function quandoClicaMaisMenosBlocoJulgadorOrigemTipo() {
+    ['idFormularioExtendidoBlocoExternoJulgador', 'idFormularioExtendidoBlocoExternoOrigem',
+     'idFormularioExtendidoBlocoOrigem'].forEach(function (id) {
+        var e = document.getElementById(id);
+        if (e) { e.style.display = 'block'; }
+    });
+}
+function quandoClicaConsultar() {
+    var form = document.getElementById('idForm');
+    var selecionados = document.getElementById('idOrigemOrgaosSelecionados');
+    var sigla = (document.getElementById('idOrgaosOrigemCampoParaPesquisar').value || '').trim().toUpperCase();
+    if (!selecionados.value && sigla) {
+        var valores = document.getElementById('idOrgaosOrigemValores').value.split(',');
+        for (var i = 0; i + 1 < valores.length; i += 2) {
+            if (valores[i + 1].trim().toUpperCase().slice(-(sigla.length + 2)) === '(' + sigla + ')') {
+                selecionados.value = valores[i].trim();
+                break;
+            }
+        }
+    }
+    form.submit();
+}
+function quandoClicaMaisMenosBlocoData() {}
+function quandoPrecionaTeclaDataAutuacaoInicial() {}
+function quandoPrecionaTeclaDataAutuacaoFinal() {}
+function quandoDigitaParaPesquisarOrgaoOrigem() {}
+"""
+
+PAGINA_CHALLENGE = """<!DOCTYPE html>
+<html><head><title>Just a moment...</title></head>
+<body><p>Checking if the site connection is secure (cloudflare)</p>
+<script>
+setTimeout(function () {
+    document.cookie = "cf_clearance=local; path=/; max-age=3600";
+    location.reload();
+}, %d);
+</script></body></html>
+"""
+
+
+def _data(texto):
+    return datetime.strptime(texto, "%d/%m/%Y")
+
+
+class ServidorSTJLocal(ThreadingHTTPServer):
+    """
+    Servidor com os parâmetros da simulação. Cada dia pesquisado tem processos_por_dia
+    processos por órgão de origem (um em cada cinco é RHC, que o scraper ignora),
+    sempre os mesmos para a mesma data e órgão.
+
+    Args:
+        latencia: Segundos de espera antes de cada resposta.
+        challenge: Se True, quem não tiver o cookie cf_clearance recebe antes a
+            página "Just a moment...", que grava o cookie e recarrega após tempo_challenge.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, endereco, latencia=0.0, challenge=False, tempo_challenge=2.0,
+                 processos_por_dia=20, por_pagina=40):
+        super().__init__(endereco, _Manipulador)
+        self.latencia = latencia
+        self.challenge = challenge
+        self.tempo_challenge = tempo_challenge
+        self.processos_por_dia = processos_por_dia
+        self.por_pagina = por_pagina
+        with open(ARQUIVO_PAGINA, encoding="utf-8", errors="replace") as f:
+            self.pagina_formulario = f.read()
+        inicio = self.pagina_formulario.find('id="idOrgaosOrigemValores"')
+        valor = self.pagina_formulario[inicio:].split('value="', 1)[1].split('"', 1)[0]
+        self.siglas = {codigo: sigla for sigla, codigo in interpretar_tabela_orgaos(valor).items()}
+        # A pesquisa é reconhecida pelo mesmo valor do campo oculto "acao" da página salva
+        inicio = self.pagina_formulario.find('id="idAcao"')
+        self.acao_pesquisa = self.pagina_formulario[inicio:].split('value="', 1)[1].split('"', 1)[0]
+        self.requisicoes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url_base(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def contar_requisicao(self):
+        with self._lock:
+            self.requisicoes += 1
+
+    # ─── DADOS SINTÉTICOS ────────────────────────────────────────────
+    def processos(self, data_inicial, data_final, codigo):
+        """Registros (número de registro) dos processos do intervalo, em ordem de autuação."""
+        registros = []
+        dia = _data(data_inicial)
+        while dia <= _data(data_final):
+            registros.extend(f"{codigo}{dia:%Y%m%d}{indice:03d}" for indice in range(self.processos_por_dia))
+            dia += timedelta(days=1)
+        return registros
+
+    def processo(self, registro):
+        """Dados de um processo, derivados só do número de registro."""
+        codigo, dia, indice = registro[:4], datetime.strptime(registro[4:12], "%Y%m%d"), int(registro[12:])
+        aleatorio = random.Random(registro)
+        return {
+            "registro": registro,
+            "classe": "RHC" if indice % 5 == 4 else "HC",
+            "numero": aleatorio.randint(100000, 999999),
+            "sigla": self.siglas.get(codigo, codigo),
+            "relator": aleatorio.choice(RELATORES),
+            "fase": aleatorio.choice(FASES),
+            "autuacao": dia.strftime("%d/%m/%Y"),
+            "cnj": f"{aleatorio.randint(0, 9999999):07d}-{aleatorio.randint(0, 99):02d}.{dia.year}.8.09.{aleatorio.randint(0, 9999):04d}",
+        }
+
+    # ─── PÁGINAS ─────────────────────────────────────────────────────
+    def link_detalhe(self, registro):
+        return CAMINHO_PESQUISA + "?" + urlencode({
+            "aplicacao": "processos.ea", "tipoPesquisa": "tipoPesquisaNumeroRegistro", "termo": registro,
+        })
+
+    def pagina_lista(self, parametros, pagina):
+        data_inicial = parametros.get("dataAutuacaoInicial", "")
+        data_final = parametros.get("dataAutuacaoFinal", "") or data_inicial
+        codigo = parametros.get("origemOrgaosSelecionados", "").split(",")[0]
+        try:
+            dias = (_data(data_final) - _data(data_inicial)).days
+        except ValueError:
+            return self.pagina_mensagem("Data de autuação inválida.")
+        if dias < 0 or dias > MAX_DIAS_INTERVALO:
+            return self.pagina_mensagem(f"O intervalo de datas deve ter no máximo {MAX_DIAS_INTERVALO} dias.")
+
+        registros = self.processos(data_inicial, data_final, codigo) if codigo else []
+        if not registros:
+            return self.pagina_mensagem("Nenhum documento encontrado!")
+        if len(registros) == 1:
+            # Como no site: um único resultado abre direto o detalhe
+            return self.pagina_detalhe(registros[0])
+
+        inicio = (pagina - 1) * self.por_pagina
+        fim = min(inicio + self.por_pagina, len(registros))
+        blocos = []
+        for registro in registros[inicio:fim]:
+            p = self.processo(registro)
+            blocos.append(
+                '<div class="clsListaProcessoFormatoVerticalLinha">'
+                f'<div class="clsListaProcessoFormatoVerticalLinhaTitulo"><a href="{escape(self.link_detalhe(registro))}">'
+                f'{p["classe"]} {p["numero"]}</a> / {p["sigla"]}</div>'
+                f'<div>Autuado em {p["autuacao"]} · Relator(a): {escape(p["relator"])}</div>'
+                f'<div>Última fase: {escape(p["fase"])}</div>'
+                '</div>'
+            )
+
+        if fim < len(registros):
+            proximos = {chave: valor for chave, valor in parametros.items() if chave != "pagina"}
+            proximos["pagina"] = pagina + 1
+            proximo = f'<a class="clsBotaoPaginacaoProximo" href="{escape(CAMINHO_PESQUISA + "?" + urlencode(proximos))}">Próximo</a>'
+        else:
+            proximo = '<a class="clsBotaoPaginacaoProximo clsBotaoPaginacaoDesabilitado" href="javascript:void(0)">Próximo</a>'
+
+        return (
+            "<!DOCTYPE html><html><head><title>STJ - Consulta Processual</title></head><body>"
+            f'<div class="clsBlocoPaginacao"><span>Exibindo {inicio + 1}–{fim} de {len(registros)}</span> {proximo}</div>'
+            f'<div id="idBlocoResultados">{"".join(blocos)}</div>'
+            "</body></html>"
+        )
+
+    def pagina_mensagem(self, mensagem):
+        return (
+            "<!DOCTYPE html><html><head><title>STJ - Consulta Processual</title></head><body>"
+            f'<div class="clsMensagemLinha">{escape(mensagem)}</div></body></html>'
+        )
+
+    def pagina_detalhe(self, registro):
+        p = self.processo(registro)
+        link_cnj = CAMINHO_PESQUISA + "?" + urlencode({"tipoPesquisa": "tipoPesquisaNumeroUnico", "termo": p["cnj"]})
+
+        def linha(rotulo, texto):
+            return (
+                f'<div class="classDivLinhaDetalhes"><span class="classSpanDetalhesLabel">{rotulo}</span>'
+                f'<span class="classSpanDetalhesTexto">{texto}</span></div>'
+            )
+
+        return (
+            f'<!DOCTYPE html><html><head><title>STJ - {p["classe"]} {p["numero"]}</title></head><body>'
+            f'<div id="idDivDetalhes"><span id="idSpanClasseDescricao">{p["classe"]} nº {p["numero"]} / {p["sigla"]}</span>'
+            + linha("NÚMERO ÚNICO:", f'<a href="{escape(link_cnj)}">{p["cnj"]}</a>')
+            + linha("RELATOR(A):", escape(p["relator"]))
+            + linha("AUTUAÇÃO:", p["autuacao"])
+            + linha("ÚLTIMA FASE:", escape(p["fase"]))
+            + "</div></body></html>"
+        )
+
+
+class _Manipulador(BaseHTTPRequestHandler):
+
+    def log_message(self, formato, *args):
+        logging.debug("🧪 " + formato % args)
+
+    def _responder(self, status, corpo, tipo="text/html; charset=utf-8"):
+        dados = corpo.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def _liberado(self):
+        cookies = self.headers.get("Cookie") or ""
+        return any(c.strip().startswith(COOKIE_CLEARANCE + "=") for c in cookies.split(";"))
+
+    def _atender(self, parametros):
+        servidor = self.server
+        servidor.contar_requisicao()
+        if servidor.latencia:
+            time.sleep(servidor.latencia)
+
+        caminho = urlparse(self.path).path
+        if caminho == CAMINHO_SCRIPT_PRINCIPAL:
+            return self._responder(200, SCRIPT_PRINCIPAL, "application/javascript; charset=utf-8")
+        if caminho.rstrip("/") != CAMINHO_PESQUISA.rstrip("/"):
+            return self._responder(404, "")
+        if servidor.challenge and not self._liberado():
+            return self._responder(403, PAGINA_CHALLENGE % int(servidor.tempo_challenge * 1000))
+
+        if parametros.get("tipoPesquisa") == "tipoPesquisaNumeroRegistro":
+            return self._responder(200, servidor.pagina_detalhe(parametros.get("termo", "")))
+        if parametros.get("acao") == servidor.acao_pesquisa:
+            try:
+                pagina = max(1, int(parametros.get("pagina", "1")))
+            except ValueError:
+                pagina = 1
+            return self._responder(200, servidor.pagina_lista(parametros, pagina))
+        return self._responder(200, servidor.pagina_formulario)
+
+    def do_GET(self):
+        consulta = parse_qs(urlparse(self.path).query)
+        self._atender({chave: valores[-1] for chave, valores in consulta.items()})
+
+    def do_POST(self):
+        tamanho = int(self.headers.get("Content-Length") or 0)
+        corpo = parse_qs(self.rfile.read(tamanho).decode("utf-8"), keep_blank_values=True)
+        parametros = {chave: valores[-1] for chave, valores in parse_qs(urlparse(self.path).query).items()}
+        parametros.update({chave: valores[-1] for chave, valores in corpo.items()})
+        self._atender(parametros)
+
+
+def iniciar_servidor(porta=0, **opcoes):
+    """
+    Sobe o servidor em 127.0.0.1 numa thread em segundo plano (porta 0 = qualquer livre).
+
+    Args:
+        opcoes: Parâmetros de ServidorSTJLocal (latencia, challenge, processos_por_dia...).
+
+    Returns:
+        ServidorSTJLocal já atendendo; encerre com servidor.shutdown().
+    """
+    servidor = ServidorSTJLocal(("127.0.0.1", porta), **opcoes)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+# ─── CLI ─────────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    if len(sys.argv) > 1 and sys.argv[1] in ("-h", "--help"):
+        print("Uso: python servidor_stj_local.py [porta] [latência em segundos] [--challenge]")
+        sys.exit(0)
+
+    argumentos = [a for a in sys.argv[1:] if not a.startswith("--")]
+    porta = int(argumentos[0]) if argumentos else 8765
+    latencia = float(argumentos[1]) if len(argumentos) > 1 else 0.0
+    servidor = ServidorSTJLocal(("127.0.0.1", porta), latencia=latencia, challenge="--challenge" in sys.argv)
+    print(f"🧪 Servidor STJ local em {servidor.url_base} (latência {latencia}s, challenge {'sim' if servidor.challenge else 'não'})")
+    print(f"   Use: STJ_URL_BASE={servidor.url_base} python main.py DD/MM/AAAA")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        servidor.server_close()
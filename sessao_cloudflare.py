@@ -0,0 +1,92 @@
+# sessao_cloudflare.py
+
+import json
+import logging
+import os
+import time
+
+from navegador import copiar_cookies
+from config import ARQUIVO_SESSAO_CLOUDFLARE, VALIDADE_SESSAO_CLOUDFLARE
+
+# Cookie emitido pelo Cloudflare quando o desafio é resolvido
+COOKIE_CLEARANCE = "cf_clearance"
+
+
+def carregar_sessao():
+    """
+    Lê a sessão salva por uma execução anterior.
+
+    Returns:
+        dict com "cookies" e "user_agent", ou None se não houver sessão válida
+        (arquivo ausente, corrompido ou expirado).
+    """
+    try:
+        with open(ARQUIVO_SESSAO_CLOUDFLARE, encoding="utf-8") as f:
+            sessao = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logging.warning(f"⚠️ Sessão salva ilegível ({e}). Ignorando.")
+        descartar_sessao()
+        return None
+
+    if not sessao.get("cookies") or sessao.get("expira_em", 0) <= time.time():
+        logging.info("⌛ Sessão do Cloudflare salva expirou.")
+        descartar_sessao()
+        return None
+
+    return sessao
+
+
+def salvar_sessao(driver):
+    """
+    Salva cookies e User-Agent do navegador que acabou de passar pelo desafio.
+    A validade é a do cookie cf_clearance, limitada a VALIDADE_SESSAO_CLOUDFLARE.
+    """
+    try:
+        cookies = driver.get_cookies()
+        user_agent = driver.execute_script("return navigator.userAgent")
+    except Exception as e:
+        logging.warning(f"⚠️ Não foi possível ler a sessão do navegador: {e}")
+        return
+
+    agora = time.time()
+    expira_em = agora + VALIDADE_SESSAO_CLOUDFLARE
+    clearance = next((c for c in cookies if c["name"] == COOKIE_CLEARANCE), None)
+    if clearance and clearance.get("expiry"):
+        expira_em = min(expira_em, clearance["expiry"])
+
+    sessao = {
+        "user_agent": user_agent,
+        "cookies": cookies,
+        "salva_em": agora,
+        "expira_em": expira_em,
+    }
+
+    # Escrita atômica e legível só pelo dono: o arquivo contém cookies de sessão
+    os.makedirs(os.path.dirname(ARQUIVO_SESSAO_CLOUDFLARE) or ".", exist_ok=True)
+    temporario = f"{ARQUIVO_SESSAO_CLOUDFLARE}.{os.getpid()}.tmp"
+    with open(os.open(temporario, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w", encoding="utf-8") as f:
+        json.dump(sessao, f)
+    os.replace(temporario, ARQUIVO_SESSAO_CLOUDFLARE)
+    logging.info(f"💾 Sessão do Cloudflare salva ({len(cookies)} cookies, válida por {(expira_em - agora) / 60:.0f} min).")
+
+
+def descartar_sessao():
+    """Remove a sessão salva (ex.: quando o site voltou a exibir o desafio)."""
+    try:
+        os.remove(ARQUIVO_SESSAO_CLOUDFLARE)
+    except FileNotFoundError:
+        pass
+
+
+def aplicar_sessao(driver, sessao):
+    """
+    Injeta no navegador, antes do primeiro driver.get, os cookies e o User-Agent
+    de uma sessão salva.
+    """
+    if sessao.get("user_agent"):
+        atual = driver.execute_script("return navigator.userAgent")
+        if atual != sessao["user_agent"]:
+            driver.execute_cdp_cmd("Network.setUserAgentOverride", {"userAgent": sessao["user_agent"]})
+    copiar_cookies(driver, sessao["cookies"])
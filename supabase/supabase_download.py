@@ -1,6 +1,10 @@
 import os
 import requests
 import sys # Importar sys se for pegar args da linha de comando aqui
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from metricas import acrescentar_info_execucao
 
 def download_from_supabase(supabase_url, bucket_name, file_name, destination_path):
     """
@@ -57,4 +61,17 @@ if __name__ == "__main__":
     if len(sys.argv) != 5:
         print("Uso: python supabase_download.py <supabase_url> <bucket_name> <file_name> <destination_path>")
         sys.exit(1)
-    download_from_supabase(sys.argv[1], sys.argv[2], sys.argv[3], sys.argv[4])
+    inicio = time.perf_counter()
+    sucesso = False
+    try:
+        download_from_supabase(sys.argv[1], sys.argv[2], sys.argv[3], sys.argv[4])
+        sucesso = True
+    finally:
+        # Também registra o arquivo inexistente no bucket (sys.exit(0) dentro do download)
+        acrescentar_info_execucao("supabase", {
+            "operacao": "download",
+            "arquivo": sys.argv[3],
+            "sucesso": sucesso,
+            "segundos": round(time.perf_counter() - inicio, 3),
+            "bytes": os.path.getsize(sys.argv[4]) if os.path.isfile(sys.argv[4]) else 0,
+        })
@@ -4,6 +4,8 @@ import time
 import sys
 import logging
 from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from metricas import contar, contadores, acrescentar_info_execucao
 
 def upload_xlsx(filepath, filename_in_bucket, retries=3, delay=5):
     """
@@ -69,6 +71,7 @@ def upload_xlsx(filepath, filename_in_bucket, retries=3, delay=5):
             # Adicionar número da tentativa se não for a primeira
             if attempt > 0:
                 logging.info(f"⏳ Tentativa {attempt+1}/{retries}...")
+            contar("tentativas_upload_supabase")
             
             # Abrir e ler o arquivo
             with open(filepath, 'rb') as file:
@@ -192,7 +195,16 @@ if __name__ == "__main__":
         filepath = sys.argv[1]
         filename_in_bucket = sys.argv[2]
         
+        inicio = time.perf_counter()
         sucesso = upload_xlsx(filepath, filename_in_bucket)
+        acrescentar_info_execucao("supabase", {
+            "operacao": "upload",
+            "arquivo": filename_in_bucket,
+            "sucesso": sucesso,
+            "segundos": round(time.perf_counter() - inicio, 3),
+            "bytes": os.path.getsize(filepath) if os.path.isfile(filepath) else 0,
+            "tentativas": contadores().get("tentativas_upload_supabase", 0),
+        })
         sys.exit(0 if sucesso else 1)
         
     except ValueError as e:
@@ -0,0 +1,128 @@
+# tests/test_cache_detalhes.py
+#
+# Cache de detalhes em SQLite: validade (com relógio controlado), descarte dos
+# registros usados há mais tempo e assinatura dos blocos igual nos motores HTTP
+# e Selenium. Rodar da raiz do projeto: python -m unittest discover tests
+
+import os
+import tempfile
+import unittest
+
+from cache_detalhes import CacheDetalhes, assinatura_bloco
+from checkpoint import Checkpoint
+from motor_http import interpretar_pagina_lista
+
+DIRETORIO_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# innerText que o Chrome devolve para os blocos de HC de fixtures/lista_hc.html
+# (o que o SCRIPT_LINKS_HC do paginador lê como texto do bloco)
+INNER_TEXT_BLOCOS = [
+    "HC 1003456 / GO\n"
+    "Autuado em 01/10/2026 · Relator(a): MIN. ROGERIO SCHIETTI CRUZ\n"
+    "Última fase: CONCLUSOS PARA DECISÃO AO(À) MINISTRO(A) RELATOR(A)",
+    "HC 1003459 HC 1003459 / GO\n"
+    "Autuado em 01/10/2026 · Relator(a): MIN. SEBASTIÃO REIS JÚNIOR\n"
+    "Última fase: AGUARDANDO JULGAMENTO",
+]
+
+VALIDADE = 3600
+
+
+def resultado(numero):
+    return {"numero_processo": f"{numero} / GO", "relator": "Min. A", "situacao": "VISTA", "numero_cnj": "x", "data_autuacao": ""}
+
+
+class _Relogio:
+    def __init__(self, agora=1_000_000.0):
+        self.agora = agora
+
+    def __call__(self):
+        return self.agora
+
+
+class TestCacheDetalhes(unittest.TestCase):
+
+    def setUp(self):
+        self._pasta = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self._pasta.name, "detalhes.sqlite3")
+        self.relogio = _Relogio()
+        with open(os.path.join(DIRETORIO_FIXTURES, "lista_hc.html"), encoding="utf-8") as f:
+            self.lista = interpretar_pagina_lista(f.read())
+        self.itens = self.lista["itens"]
+        self.assinaturas_http = self.lista["assinaturas"]
+        self.assinaturas_selenium = {href: assinatura_bloco(texto) for (_, href), texto in zip(self.itens, INNER_TEXT_BLOCOS)}
+
+    def tearDown(self):
+        self._pasta.cleanup()
+
+    def abrir(self, **opcoes):
+        opcoes.setdefault("validade", VALIDADE)
+        return CacheDetalhes(self.caminho, relogio=self.relogio, **opcoes)
+
+    def gravar(self, itens, assinaturas, **opcoes):
+        """Simula uma execução que leu os detalhes de itens do site e os guardou no cache."""
+        cache = self.abrir(**opcoes)
+        cache.aproveitar(Checkpoint(), 1, itens, assinaturas, "")
+        for texto, href in itens:
+            cache.guardar(href, resultado(texto.split()[-1]))
+        return cache
+
+    def aproveitados(self, itens, assinaturas, **opcoes):
+        """Simula uma execução seguinte: quantos itens vêm do cache."""
+        return self.abrir(**opcoes).aproveitar(Checkpoint(), 1, itens, assinaturas, "01/10/2026")
+
+    def test_assinaturas_iguais_nos_dois_motores(self):
+        self.assertEqual(len(self.itens), 2)
+        self.assertEqual(self.assinaturas_http, self.assinaturas_selenium)
+
+    def test_gravado_via_http_e_lido_via_selenium(self):
+        self.gravar(self.itens, self.assinaturas_http)
+        self.assertEqual(self.aproveitados(self.itens, self.assinaturas_selenium), 2)
+
+    def test_gravado_via_selenium_e_lido_via_http(self):
+        self.gravar(self.itens, self.assinaturas_selenium)
+        self.assertEqual(self.aproveitados(self.itens, self.assinaturas_http), 2)
+
+    def test_bloco_alterado_nao_e_aproveitado(self):
+        self.gravar(self.itens, self.assinaturas_http)
+        alteradas = dict(self.assinaturas_selenium)
+        alteradas[self.itens[0][1]] = assinatura_bloco(INNER_TEXT_BLOCOS[0].replace("CONCLUSOS PARA DECISÃO", "BAIXA DEFINITIVA"))
+        self.assertEqual(self.aproveitados(self.itens, alteradas), 1)
+
+    def test_registro_aproveitado_recebe_data_e_vai_ao_checkpoint(self):
+        self.gravar(self.itens, self.assinaturas_http)
+        checkpoint = Checkpoint()
+        self.abrir().aproveitar(checkpoint, 1, self.itens, self.assinaturas_http, "01/10/2026")
+        aproveitado = checkpoint.resultado(self.itens[0][1])
+        self.assertEqual(aproveitado["numero_processo"], "1003456 / GO")
+        self.assertEqual(aproveitado["data_autuacao"], "01/10/2026")
+
+    def test_validade(self):
+        self.gravar(self.itens, self.assinaturas_http)
+        self.relogio.agora += VALIDADE - 1
+        self.assertEqual(self.aproveitados(self.itens, self.assinaturas_http), 2)
+        self.relogio.agora += 2
+        self.assertEqual(self.aproveitados(self.itens, self.assinaturas_http), 0)
+
+    def test_registros_usados_ha_mais_tempo_sao_descartados(self):
+        primeiro, segundo = self.itens
+        self.gravar([primeiro], self.assinaturas_http)
+        self.relogio.agora += 10
+        self.gravar([segundo], self.assinaturas_http)
+        self.relogio.agora += 10
+        # Usar o primeiro de novo o torna o mais recente
+        self.assertEqual(self.aproveitados([primeiro], self.assinaturas_http), 1)
+
+        # Acima de max_registros, a poda ao abrir o cache descarta o usado há mais tempo
+        self.relogio.agora += 10
+        self.assertEqual(self.aproveitados(self.itens, self.assinaturas_http, max_registros=1), 1)
+        self.assertEqual(self.aproveitados([primeiro], self.assinaturas_http), 1)
+        self.assertEqual(self.aproveitados([segundo], self.assinaturas_http), 0)
+
+    def test_validade_zero_desativa_o_cache(self):
+        self.gravar(self.itens, self.assinaturas_http)
+        self.assertEqual(self.aproveitados(self.itens, self.assinaturas_http, validade=0), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
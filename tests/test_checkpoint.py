@@ -0,0 +1,117 @@
+# tests/test_checkpoint.py
+#
+# Diário JSONL de uma busca em andamento: retomada, conclusão de páginas e
+# recuperação de um diário cortado no meio de uma escrita.
+# Rodar da raiz do projeto: python -m unittest discover tests
+
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import checkpoint
+from checkpoint import Checkpoint, abrir_checkpoint
+from config import VALIDADE_CHECKPOINT
+
+RESULTADO_A = {"numero_processo": "1003456 / GO", "relator": "Min. A"}
+RESULTADO_B = {"numero_processo": "1003457 / GO", "relator": "Min. B"}
+ITENS = [("HC 1003456", "/detalhe?termo=a"), ("HC 1003457", "/detalhe?termo=b")]
+
+
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self._pasta = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self._pasta.name, "checkpoints", "checkpoint_tjgo_01-10-2026_01-10-2026.jsonl")
+
+    def tearDown(self):
+        self._pasta.cleanup()
+
+    def ler_eventos(self):
+        with open(self.caminho, encoding="utf-8") as f:
+            return [json.loads(linha) for linha in f]
+
+    def test_hcs_extraidos_sao_retomados(self):
+        diario = Checkpoint(self.caminho)
+        diario.iniciar_pagina(1, ITENS)
+        diario.registrar_hc(1, ITENS[0][1], RESULTADO_A)
+
+        retomado = Checkpoint(self.caminho)
+        self.assertTrue(retomado.retomado)
+        self.assertEqual(retomado.resultado(ITENS[0][1]), RESULTADO_A)
+        self.assertEqual(retomado.pendentes(ITENS), [ITENS[1]])
+
+    def test_pagina_so_conclui_com_todos_os_hcs(self):
+        diario = Checkpoint(self.caminho)
+        diario.iniciar_pagina(1, ITENS)
+        diario.registrar_hc(1, ITENS[0][1], RESULTADO_A)
+        self.assertFalse(diario.pagina_concluida(1))
+        self.assertFalse(Checkpoint(self.caminho).pagina_concluida(1))
+
+        diario.registrar_hc(1, ITENS[1][1], RESULTADO_B)
+        self.assertTrue(diario.pagina_concluida(1))
+
+        retomado = Checkpoint(self.caminho)
+        self.assertTrue(retomado.pagina_concluida(1))
+        self.assertEqual(retomado.itens_pagina(1), ITENS)
+        self.assertEqual(retomado.resultados_pagina(1), [RESULTADO_A, RESULTADO_B])
+
+    def test_pagina_com_hcs_ja_extraidos_conclui_ao_iniciar(self):
+        diario = Checkpoint(self.caminho)
+        diario.registrar_hc(1, ITENS[0][1], RESULTADO_A)
+        diario.registrar_hc(1, ITENS[1][1], RESULTADO_B)
+        diario.iniciar_pagina(2, ITENS)
+        self.assertTrue(diario.pagina_concluida(2))
+
+    def test_ultima_linha_cortada_e_descartada(self):
+        diario = Checkpoint(self.caminho)
+        diario.iniciar_pagina(1, ITENS)
+        diario.registrar_hc(1, ITENS[0][1], RESULTADO_A)
+        # Interrupção no meio da gravação do segundo HC
+        linha = json.dumps({"tipo": "hc", "pagina": 1, "href": ITENS[1][1], "resultado": RESULTADO_B}, ensure_ascii=False)
+        with open(self.caminho, "a", encoding="utf-8") as f:
+            f.write(linha[: len(linha) // 2])
+
+        retomado = Checkpoint(self.caminho)
+        self.assertEqual(retomado.pendentes(ITENS), [ITENS[1]])
+        # O trecho cortado sai do arquivo antes de novos eventos serem acrescentados
+        retomado.iniciar_pagina(1, ITENS)
+        retomado.registrar_hc(1, ITENS[1][1], RESULTADO_B)
+        self.assertEqual([evento["tipo"] for evento in self.ler_eventos()], ["hc", "hc", "pagina"])
+        self.assertTrue(Checkpoint(self.caminho).pagina_concluida(1))
+
+    def test_diario_antigo_e_descartado(self):
+        Checkpoint(self.caminho).registrar_hc(1, ITENS[0][1], RESULTADO_A)
+        antigo = time.time() - VALIDADE_CHECKPOINT - 60
+        os.utime(self.caminho, (antigo, antigo))
+
+        self.assertFalse(Checkpoint(self.caminho).retomado)
+        self.assertFalse(os.path.exists(self.caminho))
+
+    def test_concluir_remove_o_diario(self):
+        diario = Checkpoint(self.caminho)
+        diario.registrar_hc(1, ITENS[0][1], RESULTADO_A)
+        diario.concluir()
+        self.assertFalse(os.path.exists(self.caminho))
+        self.assertFalse(Checkpoint(self.caminho).retomado)
+        diario.concluir()  # sem diário, não falha
+
+    def test_sem_caminho_funciona_so_em_memoria(self):
+        diario = Checkpoint()
+        diario.iniciar_pagina(1, ITENS[:1])
+        diario.registrar_hc(1, ITENS[0][1], RESULTADO_A)
+        self.assertTrue(diario.pagina_concluida(1))
+        diario.concluir()
+
+    def test_abrir_checkpoint_por_datas_e_orgao(self):
+        with mock.patch.object(checkpoint, "DIRETORIO_CACHE", self._pasta.name):
+            abrir_checkpoint("01/10/2026", "01/10/2026", "TJGO").registrar_hc(1, ITENS[0][1], RESULTADO_A)
+            self.assertTrue(abrir_checkpoint("01/10/2026", "01/10/2026", "TJGO").retomado)
+            self.assertFalse(abrir_checkpoint("01/10/2026", "01/10/2026", "TJDF").retomado)
+            self.assertFalse(abrir_checkpoint("01/10/2026", "02/10/2026", "TJGO").retomado)
+
+
+if __name__ == "__main__":
+    unittest.main()
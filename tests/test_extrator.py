@@ -0,0 +1,84 @@
+# tests/test_extrator.py
+#
+# Leitura da página de detalhes de um HC a partir de páginas salvas, sem navegador
+# e sem rede. Rodar da raiz do projeto: python -m unittest discover tests
+
+import os
+import unittest
+
+from extrator import (
+    CNJ_PADRAO, RELATOR_PADRAO, SITUACAO_PADRAO, extrair_detalhes_html, interpretar_detalhes,
+)
+
+DIRETORIO_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+# Página do formulário de pesquisa salva do site, que não é de detalhes
+PAGINA_FORMULARIO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pagina_stj.html")
+
+
+def ler_pagina(caminho):
+    with open(caminho, encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def ler_fixture(nome):
+    return ler_pagina(os.path.join(DIRETORIO_FIXTURES, nome))
+
+
+class TestInterpretarDetalhes(unittest.TestCase):
+
+    def test_pagina_completa(self):
+        campos = interpretar_detalhes(ler_fixture("detalhe_hc.html"))
+        self.assertEqual(campos["numero_processo"], "1003456 / GO (2026/0412345-7)")
+        self.assertEqual(campos["relator"], "Min. ROGERIO SCHIETTI CRUZ - SEXTA TURMA")
+        self.assertEqual(
+            campos["situacao"],
+            "03/10/2026 (14:32) CONCLUSOS PARA DECISÃO AO(À) MINISTRO(A) ROGERIO SCHIETTI CRUZ (RELATOR)",
+        )
+        self.assertEqual(campos["numero_cnj"], "0412345-15.2026.8.09.0000")
+
+    def test_data_de_autuacao(self):
+        self.assertEqual(interpretar_detalhes(ler_fixture("detalhe_hc.html"))["data_autuacao"], "01/10/2026")
+
+    def test_campos_ausentes_voltam_none(self):
+        campos = interpretar_detalhes(ler_fixture("detalhe_hc_incompleto.html"))
+        self.assertEqual(campos["numero_processo"], "1003456 / GO (2026/0412345-7)")
+        self.assertIsNone(campos["relator"])
+        self.assertIsNone(campos["situacao"])
+        self.assertIsNone(campos["numero_cnj"])
+        self.assertEqual(campos["data_autuacao"], "01/10/2026")
+
+    def test_pagina_que_nao_e_de_detalhes(self):
+        self.assertIsNone(interpretar_detalhes(ler_pagina(PAGINA_FORMULARIO))["numero_processo"])
+
+
+class TestExtrairDetalhesHtml(unittest.TestCase):
+
+    def test_pagina_completa(self):
+        self.assertEqual(extrair_detalhes_html(ler_fixture("detalhe_hc.html"), "HC 1003456", "01/10/2026"), {
+            "numero_cnj": "0412345-15.2026.8.09.0000",
+            "numero_processo": "1003456 / GO (2026/0412345-7)",
+            "relator": "Min. ROGERIO SCHIETTI CRUZ - SEXTA TURMA",
+            "situacao": "03/10/2026 (14:32) CONCLUSOS PARA DECISÃO AO(À) MINISTRO(A) ROGERIO SCHIETTI CRUZ (RELATOR)",
+            "data_autuacao": "01/10/2026",
+        })
+
+    def test_campos_ausentes_recebem_padroes(self):
+        resultado = extrair_detalhes_html(ler_fixture("detalhe_hc_incompleto.html"), "HC 1003456", "01/10/2026")
+        self.assertEqual(resultado["relator"], RELATOR_PADRAO)
+        self.assertEqual(resultado["situacao"], SITUACAO_PADRAO)
+        self.assertEqual(resultado["numero_cnj"], CNJ_PADRAO)
+
+    def test_data_de_autuacao_da_pagina_quando_nao_informada(self):
+        # Busca por intervalo: a data vem do rótulo AUTUAÇÃO da própria página
+        self.assertEqual(extrair_detalhes_html(ler_fixture("detalhe_hc.html"))["data_autuacao"], "01/10/2026")
+
+    def test_data_de_autuacao_informada_prevalece(self):
+        self.assertEqual(extrair_detalhes_html(ler_fixture("detalhe_hc.html"), data_autuacao="02/10/2026")["data_autuacao"], "02/10/2026")
+
+    def test_pagina_que_nao_e_de_detalhes(self):
+        self.assertIsNone(extrair_detalhes_html(ler_pagina(PAGINA_FORMULARIO)))
+        self.assertIsNone(extrair_detalhes_html("<html><body><p>Nenhum documento encontrado!</p></body></html>"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+# tests/test_instrumentacao.py
+#
+# Local de chamada atribuído às esperas, pausas e comandos do WebDriver perfilados:
+# deve ser o código que esperou, não os ganchos do projeto no meio do caminho.
+# Rodar da raiz do projeto: python -m unittest discover tests
+
+import os
+import unittest
+from unittest import mock
+
+from selenium.webdriver.support.wait import WebDriverWait
+
+import instrumentacao
+from config import TAXA_MAXIMA_REQUISICOES
+from utils import taxa
+
+ARQUIVO_TESTE = os.path.join("tests", "test_instrumentacao.py")
+
+
+class _DriverFalso:
+    """Driver mínimo: só o execute, por onde o gancho de instrumentar_comandos passa."""
+
+    def execute(self, comando, parametros=None):
+        return {"value": None}
+
+
+class TestLocalChamada(unittest.TestCase):
+
+    def setUp(self):
+        instrumentacao.zerar()
+
+    def assertLocalDoTeste(self, local, funcao):
+        self.assertTrue(local.startswith(ARQUIVO_TESTE + ":"), local)
+        self.assertTrue(local.endswith(f"({funcao})"), local)
+
+    def test_webdriverwait_until(self):
+        instrumentacao.perfilar_esperas()
+        WebDriverWait(_DriverFalso(), 1, poll_frequency=0.01).until(lambda driver: True)
+
+        esperas = instrumentacao.relatorio_esperas()["esperas"]
+        self.assertEqual(len(esperas), 1)
+        self.assertLocalDoTeste(esperas[0]["local"], "test_webdriverwait_until")
+        self.assertEqual(esperas[0]["sucessos"], 1)
+
+    def test_comando_dentro_de_espera_perfilada(self):
+        instrumentacao.perfilar_esperas()
+        driver = instrumentacao.instrumentar_comandos(_DriverFalso())
+
+        def condicao(d):
+            d.execute("findElement")
+            return True
+
+        WebDriverWait(driver, 1, poll_frequency=0.01).until(condicao)
+
+        locais = instrumentacao.relatorio_comandos()["por_local"]
+        self.assertEqual(len(locais), 1)
+        self.assertLocalDoTeste(locais[0]["local"], "condicao")
+
+    def test_dormir(self):
+        with mock.patch.object(instrumentacao, "PERFILAR_ESPERAS", True):
+            instrumentacao.dormir(0)
+
+        pausas = instrumentacao.relatorio_esperas()["pausas"]
+        self.assertEqual(len(pausas), 1)
+        self.assertLocalDoTeste(pausas[0]["local"], "test_dormir")
+
+    def test_pausa_do_limite_de_taxa(self):
+        taxa.configurar_taxa(1000)
+        try:
+            with mock.patch.object(instrumentacao, "PERFILAR_ESPERAS", True):
+                taxa.aguardar_vez()
+                taxa.aguardar_vez()
+        finally:
+            taxa.configurar_taxa(TAXA_MAXIMA_REQUISICOES)
+
+        pausas = instrumentacao.relatorio_esperas()["pausas"]
+        self.assertEqual(len(pausas), 1)
+        self.assertLocalDoTeste(pausas[0]["local"], "test_pausa_do_limite_de_taxa")
+
+
+if __name__ == "__main__":
+    unittest.main()
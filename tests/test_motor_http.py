@@ -0,0 +1,147 @@
+# tests/test_motor_http.py
+#
+# Motor HTTP a partir de páginas salvas, sem rede: campos do formulário de
+# pesquisa, links HC da lista de resultados e pesquisa de resultado único que
+# cai direto na página de detalhes. Rodar da raiz do projeto: python -m unittest discover tests
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+from urllib.parse import urljoin
+
+import motor_http
+import orgaos_origem
+from cache_detalhes import CacheDetalhes
+from config import URL_PESQUISA
+from motor_http import (
+    _ParserFormulario, interpretar_pagina_lista, navegar_paginas_e_extrair_http, obter_detalhe_http, pesquisar_http,
+)
+from orgaos_origem import interpretar_tabela_orgaos
+
+DIRETORIO_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+# Página do formulário de pesquisa salva do site
+PAGINA_FORMULARIO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pagina_stj.html")
+
+URL_SITE = "https://processo.stj.jus.br/processo/pesquisa/"
+ACAO = "pushconsultarprocessoconsultalimitenaoatendidasjaincluidas"
+
+
+def ler_pagina(caminho):
+    with open(caminho, encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def ler_fixture(nome):
+    return ler_pagina(os.path.join(DIRETORIO_FIXTURES, nome))
+
+
+class _Resposta:
+    def __init__(self, html, url):
+        self.text = html
+        self.content = html.encode("utf-8")
+        self.url = url
+        self.status_code = 200
+
+
+class _SessaoFalsa:
+    """Devolve páginas salvas no lugar do site e guarda as requisições feitas."""
+
+    def __init__(self, *paginas):
+        self.paginas = list(paginas)
+        self.requisicoes = []
+
+    def request(self, metodo, url, **kwargs):
+        self.requisicoes.append((metodo, url, kwargs))
+        pagina = self.paginas.pop(0)
+        if isinstance(pagina, Exception):
+            raise pagina
+        return _Resposta(pagina, url)
+
+
+class TestFormulario(unittest.TestCase):
+
+    def setUp(self):
+        self.parser = _ParserFormulario()
+        self.parser.feed(ler_pagina(PAGINA_FORMULARIO))
+
+    def test_campos_ocultos(self):
+        self.assertEqual(self.parser.action, "/processo/pesquisa/")
+        self.assertEqual(self.parser.campos["aplicacao"], "processos.ea")
+        self.assertEqual(self.parser.campos["acao"], ACAO)
+        self.assertEqual(self.parser.campos["dataAutuacaoInicial"], "")
+
+    def test_tabela_de_orgaos(self):
+        self.assertEqual(interpretar_tabela_orgaos(self.parser.tabela_orgaos)["TJGO"], "0360")
+
+    def test_pesquisa_submete_o_formulario_da_pagina(self):
+        sessao = _SessaoFalsa(ler_pagina(PAGINA_FORMULARIO), ler_fixture("lista_hc.html"))
+        with tempfile.TemporaryDirectory() as pasta, \
+                mock.patch.object(orgaos_origem, "_tabela", None), \
+                mock.patch.object(orgaos_origem, "ARQUIVO_TABELA_ORGAOS", os.path.join(pasta, "orgaos_origem.json")):
+            html, url = pesquisar_http(sessao, "01/10/2026", "01/10/2026", "TJGO")
+
+        self.assertIn("HC 1003456", html)
+        metodo, url_action, kwargs = sessao.requisicoes[1]
+        self.assertEqual(metodo, "POST")
+        self.assertEqual(url_action, urljoin(URL_PESQUISA, "/processo/pesquisa/"))
+        campos = kwargs["data"]
+        self.assertEqual(campos["acao"], ACAO)
+        self.assertEqual(campos["dataAutuacaoInicial"], "01/10/2026")
+        self.assertEqual(campos["dataAutuacaoFinal"], "01/10/2026")
+        self.assertEqual(campos["origemOrgaosSelecionados"], "0360")
+
+
+class TestPaginaLista(unittest.TestCase):
+
+    def setUp(self):
+        self.info = interpretar_pagina_lista(ler_fixture("lista_hc.html"))
+
+    def test_links_hc(self):
+        termos = [href.rsplit("termo=", 1)[1] for _, href in self.info["itens"]]
+        self.assertEqual([texto for texto, _ in self.info["itens"]], ["HC 1003456", "HC 1003459"])
+        # RHC e link javascript:ProcessoDetalhes() ficam de fora
+        self.assertEqual(termos, ["202604123457", "202604123459"])
+        self.assertEqual(self.info["blocos"], 3)
+        self.assertEqual(set(self.info["assinaturas"]), {href for _, href in self.info["itens"]})
+
+    def test_total_e_proximo(self):
+        self.assertEqual(self.info["total"], 45)
+        self.assertEqual(self.info["por_pagina"], 3)
+        self.assertIn("pagina=2", self.info["proximo"]["href"])
+        self.assertFalse(self.info["detalhe_direto"])
+
+
+class TestResultadoUnico(unittest.TestCase):
+
+    def test_pagina_de_detalhe_direta(self):
+        html = ler_fixture("detalhe_hc.html")
+        info = interpretar_pagina_lista(html)
+        self.assertTrue(info["detalhe_direto"])
+        self.assertEqual(info["itens"], [])
+        self.assertEqual(info["blocos"], 0)
+
+        with tempfile.TemporaryDirectory() as pasta:
+            cache = CacheDetalhes(os.path.join(pasta, "detalhes.sqlite3"))
+            with mock.patch.object(motor_http, "obter_cache_detalhes", return_value=cache):
+                resultados, relatorio, total, previstas, processadas = navegar_paginas_e_extrair_http(
+                    _SessaoFalsa(), html, URL_SITE, "01/10/2026"
+                )
+
+        self.assertEqual(len(resultados), 1)
+        self.assertEqual(resultados[0]["data_autuacao"], "01/10/2026")
+        self.assertEqual((total, previstas, processadas), (1, 1, 1))
+        self.assertIn("página de detalhe única", relatorio[0])
+
+
+class TestDetalhe(unittest.TestCase):
+
+    def test_falha_no_detalhe_vai_para_o_log(self):
+        sessao = _SessaoFalsa(ConnectionError("conexão recusada"))
+        with self.assertLogs(level="WARNING") as log:
+            self.assertIsNone(obter_detalhe_http(sessao, "HC 1003456", URL_SITE + "?termo=x", "01/10/2026"))
+        self.assertIn("conexão recusada", log.output[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
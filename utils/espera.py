@@ -0,0 +1,37 @@
+# utils/espera.py
+import time
+
+from instrumentacao import espera_perfilada
+
+
+@espera_perfilada
+def aguardar_ate(condicao, timeout, intervalo_inicial=0.1, intervalo_maximo=2.0, fator=1.5):
+    """
+    Consulta condicao() até ela retornar um valor verdadeiro ou o tempo estourar.
+    O intervalo entre consultas começa curto e cresce até intervalo_maximo, de modo
+    que a espera termina logo depois da mudança de estado, sem pausas fixas.
+    Exceções lançadas por condicao() contam como "ainda não".
+
+    Args:
+        condicao: Função sem argumentos.
+        timeout: Tempo máximo de espera, em segundos.
+
+    Returns:
+        tuple: (valor retornado pela condição ou None se estourou, segundos decorridos)
+    """
+    inicio = time.monotonic()
+    limite = inicio + timeout
+    intervalo = intervalo_inicial
+
+    while True:
+        try:
+            valor = condicao()
+        except Exception:
+            valor = None
+        agora = time.monotonic()
+        if valor:
+            return valor, agora - inicio
+        if agora >= limite:
+            return None, agora - inicio
+        time.sleep(min(intervalo, limite - agora))
+        intervalo = min(intervalo * fator, intervalo_maximo)
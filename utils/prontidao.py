@@ -0,0 +1,17 @@
+# utils/prontidao.py
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+
+# Elemento que indica que cada tipo de página já tem no DOM o que o scraper lê. Com
+# page_load_strategy "eager" (ver ESTRATEGIA_CARREGAMENTO), driver.get não espera
+# imagens, CSS e scripts externos: quem navega espera por estes seletores.
+FORMULARIO = (By.ID, "idDataAutuacaoInicial")
+RESULTADOS = (By.CSS_SELECTOR, ".clsListaProcessoFormatoVerticalLinha, .clsMensagemLinha")
+DETALHE = (By.ID, "idSpanClasseDescricao")
+# Depois de pesquisar, o site mostra a lista, a mensagem ou direto o detalhe (1 resultado)
+POS_PESQUISA = (By.CSS_SELECTOR, ".clsListaProcessoFormatoVerticalLinha, .clsMensagemLinha, #idSpanClasseDescricao")
+
+
+def pronta(localizador):
+    """Condição para WebDriverWait: o elemento do localizador já está no DOM."""
+    return EC.presence_of_element_located(localizador)
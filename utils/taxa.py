@@ -0,0 +1,43 @@
+# utils/taxa.py
+import multiprocessing
+import time
+
+from config import TAXA_MAXIMA_REQUISICOES
+from instrumentacao import dormir
+
+# Instante (time.time) a partir do qual a próxima requisição pode sair. É um
+# multiprocessing.Value para que threads e processos filhos dividam a mesma cota.
+_proximo = None
+_intervalo = 0.0
+
+
+def configurar_taxa(requisicoes_por_segundo, proximo_compartilhado=None):
+    """
+    Define a taxa máxima de requisições ao STJ. Com 0 (ou None) não há limite.
+
+    Args:
+        requisicoes_por_segundo: Taxa máxima somando todas as threads/processos.
+        proximo_compartilhado: multiprocessing.Value("d") criado pelo processo pai,
+            para que vários processos respeitem a mesma taxa global.
+    """
+    global _proximo, _intervalo
+    if not requisicoes_por_segundo:
+        _proximo = None
+        return
+    _intervalo = 1.0 / requisicoes_por_segundo
+    _proximo = proximo_compartilhado if proximo_compartilhado is not None else multiprocessing.Value("d", 0.0)
+
+
+def aguardar_vez():
+    """Bloqueia até a próxima requisição poder ser feita sem passar da taxa configurada."""
+    if _proximo is None:
+        return
+    with _proximo.get_lock():
+        agora = time.time()
+        vez = max(agora, _proximo.value)
+        _proximo.value = vez + _intervalo
+    if vez > agora:
+        dormir(vez - agora)
+
+
+configurar_taxa(TAXA_MAXIMA_REQUISICOES)